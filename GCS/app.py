@@ -1,5 +1,6 @@
 import sys
 import os
+import math
 
 # --- PATH CONFIGURATION ---
 # 1. Get the absolute path of the current file (app.py)
@@ -20,19 +21,19 @@ if target_path not in sys.path:
 
 # --- IMPORT ---
 # Now Python can find 'main_mission.py' as if it were in the same folder
-# Ensure the function name matches exactly what is in your file (run_mission vs run_msission)
+# (mission_runtime imports run_sky_guards_mission from it, in its own thread, so the
+# heavy mavsdk / NumPy imports do not hold up the web server)
 try:
-    from main_mission import run_sky_guards_mission
-    print("Successfully imported run_mission logic!")
+    from mission_runtime import MissionRuntime, RuntimeUnavailable
+    from telemetry_stream import TelemetryBroadcaster
+    from mission_jobs import MODES as MISSION_MODES
+    print("Successfully imported the mission runtime!")
 except ImportError as e:
-    print(f"Error importing mission script: {e}")
+    print(f"Error importing the mission runtime: {e}")
     print(f"I tried looking in: {target_path}")
+    sys.exit(1)
 
-import threading
-import asyncio
-from flask import Flask, render_template, request, jsonify
-
-# Make sure main_mission.py is in the same folder or properly referenced
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 
 app = Flask(__name__)
 
@@ -40,31 +41,88 @@ app = Flask(__name__)
 def index():
     return render_template('index.html')
 
-# Helper function to run async code in a separate thread
-def start_mission_thread(coordinates):
-    # Create a new event loop for this thread
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    # Run the mission
-    loop.run_until_complete(run_sky_guards_mission(coordinates))
-    loop.close()
+# One persistent asyncio runtime: connects the swarm once and runs every mission
+runtime = MissionRuntime()
+
+# Live swarm state for the map (one sampler, many browser clients)
+broadcaster = TelemetryBroadcaster(runtime, rate_hz=10)
+
+@app.errorhandler(RuntimeUnavailable)
+def runtime_unavailable(e):
+    return jsonify({"status": "error", "message": str(e)}), 503
 
 @app.route('/deploy', methods=['POST'])
 def deploy_swarm():
     data = request.get_json()
     coordinates = data.get('coordinates')
+    # "preempt" (default): replace the running mission now, "queue": fly after it
+    mode = data.get('mode', 'preempt')
+    # Optional: sweep every sector with passes this many meters apart instead of hovering
+    sweep_spacing_m = data.get('sweep_spacing_m')
     
-    if not coordinates or len(coordinates) != 4:
-        return jsonify({"status": "error", "message": "Please draw exactly 4 points (Square/Rectangle)."}), 400
+    if not coordinates or len(coordinates) < 3:
+        return jsonify({"status": "error", "message": "Please draw a polygon with at least 3 points."}), 400
+    if mode not in MISSION_MODES:
+        return jsonify({"status": "error", "message": f"Unknown mode '{mode}'."}), 400
+    if sweep_spacing_m is not None:
+        try:
+            sweep_spacing_m = float(sweep_spacing_m)
+        except (TypeError, ValueError):
+            sweep_spacing_m = float('nan')
+        if not math.isfinite(sweep_spacing_m) or sweep_spacing_m <= 0:
+            return jsonify({"status": "error", "message": "sweep_spacing_m must be a positive number of meters."}), 400
 
-    print(f"Deploying Swarm to {len(coordinates)} targets...")
+    print(f"Deploying Swarm over a {len(coordinates)}-point area ({mode})...")
 
-    # 2. LAUNCH MISSION IN BACKGROUND
+    # 2. HAND THE MISSION TO THE RUNTIME
     # This lets the web server respond "Success" immediately while drones fly
-    mission_thread = threading.Thread(target=start_mission_thread, args=(coordinates,))
-    mission_thread.start()
+    runtime.start()
+    job = runtime.submit(coordinates, mode, sweep_spacing_m)
+
+    return jsonify({"status": "success", "message": "Swarm deployed to the area sectors!", "job": job.status()})
+
+@app.route('/missions')
+def list_missions():
+    runtime.start()
+    return jsonify(runtime.missions())
+
+@app.route('/missions/<job_id>')
+def mission_status(job_id):
+    runtime.start()
+    job = runtime.job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": f"No mission {job_id}."}), 404
+    return jsonify(job)
+
+@app.route('/missions/<job_id>/cancel', methods=['POST'])
+def cancel_mission(job_id):
+    runtime.start()
+    if not runtime.cancel(job_id):
+        job = runtime.job(job_id)
+        if job is None:
+            return jsonify({"status": "error", "message": f"No mission {job_id}."}), 404
+        return jsonify({"status": "error", "message": f"Mission {job_id} is already {job['state']}."}), 409
+    return jsonify({"status": "success", "message": f"Mission {job_id} cancelled.", "job": runtime.job(job_id)})
+
+@app.route('/status')
+def swarm_status():
+    return jsonify(runtime.status())
 
-    return jsonify({"status": "success", "message": "Swarm deployed to corners!"})
+@app.route('/telemetry/stream')
+def telemetry_stream():
+    # Server-Sent Events; ?hz=N asks for a lower update rate than the 10 Hz sampler
+    hz = request.args.get('hz', type=float)
+    if not broadcaster.valid_hz(hz):
+        return jsonify({"status": "error", "message": "hz must be a positive number."}), 400
+    if broadcaster.at_capacity():
+        return jsonify({"status": "error", "message": "Too many telemetry clients."}), 503
+    response = Response(stream_with_context(broadcaster.stream(hz)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Connect the swarm while the web UI comes up
+    runtime.start()
+    # No reloader: it would import this file twice and start a second runtime
+    app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Mission job queue of the GCS runtime.
+
+Every /deploy becomes a MissionJob with its own ID. Only one mission flies
+the swarm at a time:
+    - mode "queue":   the job waits until the running one (and any queued
+                      before it) has finished
+    - mode "preempt": the running mission is cancelled right away and the new
+                      one starts next; the drones are re-tasked from wherever
+                      they are (fly_to_gps() skips the takeoff when in the air)
+
+A cancelled job with nothing to replace it calls on_idle (the runtime makes
+the swarm hold position there). Everything here runs on the runtime loop;
+MissionRuntime wraps it for the Flask thread.
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict, deque
+
+MODES = ("preempt", "queue")
+FINISHED = ("done", "failed", "cancelled", "preempted")
+
+
+class MissionJob:
+    """One submitted mission and what happened to it."""
+
+    def __init__(self, coordinates, mode="preempt", sweep_spacing_m=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mission mode {mode!r} (use one of {MODES})")
+        self.id = uuid.uuid4().hex[:8]
+        self.coordinates = coordinates
+        self.mode = mode
+        self.sweep_spacing_m = sweep_spacing_m  # None: hover at the sector centers
+        self.state = "queued"  # -> running -> done / failed / cancelled / preempted
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.task = None
+
+    def status(self):
+        """Plain dict for /missions and /status."""
+        return {
+            "id": self.id,
+            "mode": self.mode,
+            "state": self.state,
+            "points": len(self.coordinates),
+            "sweep_spacing_m": self.sweep_spacing_m,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class MissionScheduler:
+    """Runs MissionJobs one at a time on the current loop (queue / preempt / cancel)."""
+
+    def __init__(self, run, on_idle=None, history=50):
+        """
+        Args:
+            run: async callable(job) that flies one mission.
+            on_idle: async callable() awaited when a running job is cancelled and no
+                other job is waiting (e.g. hold the swarm where it is).
+            history (int): Finished jobs kept for /missions.
+        """
+        self.run = run
+        self.on_idle = on_idle
+        self.history = history
+        self.jobs = OrderedDict()  # id -> MissionJob, oldest first
+        self.pending = deque()
+        self.current = None
+        self._wakeup = asyncio.Event()
+
+    # --- COMMANDS ---
+    def submit(self, job):
+        """Queues a job, or starts it next and cancels the running one (mode "preempt")."""
+        self.jobs[job.id] = job
+        if job.mode == "preempt":
+            self.pending.appendleft(job)
+            if self._running(self.current):
+                print(f"[Missions] Job {job.id} preempts running job {self.current.id}")
+                self._stop_current("preempted")
+        else:
+            self.pending.append(job)
+        print(f"[Missions] Job {job.id} submitted ({job.mode}, {len(self.pending)} waiting)")
+        self._prune()
+        self._wakeup.set()
+        return job
+
+    def cancel(self, job_id):
+        """Cancels a queued or running job. Returns False if it is unknown or already over."""
+        job = self.jobs.get(job_id)
+        if job is None or job.state in FINISHED:
+            return False
+        if job is self.current and job.task.done():
+            # Finished just now, the job loop has not picked it up yet: report what really happened
+            self._record(job)
+            return False
+        if job is self.current:
+            print(f"[Missions] Cancelling running job {job.id}")
+            self._stop_current("cancelled")
+        else:
+            self.pending.remove(job)
+            self._finish(job, "cancelled")
+            print(f"[Missions] Cancelled queued job {job.id}")
+        return True
+
+    def abort(self, error):
+        """Fails every queued job (e.g. the runtime could not connect the swarm)."""
+        while self.pending:
+            job = self.pending.popleft()
+            self._finish(job, "failed", error)
+            print(f"[Missions] Job {job.id} failed: {error}")
+
+    def _running(self, job):
+        return job is not None and job.task is not None and not job.task.done()
+
+    def _stop_current(self, state):
+        # The job loop sees the task end and records the final state
+        self.current.state = state
+        self.current.task.cancel()
+
+    def _finish(self, job, state, error=None):
+        job.state = state
+        job.error = error
+        job.finished = time.time()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.state in FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self.jobs[job_id]
+
+    # --- JOB LOOP ---
+    async def run_forever(self):
+        while True:
+            while not self.pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            job = self.current = self.pending.popleft()
+            job.state = "running"
+            job.started = time.time()
+            print(f"[Missions] Job {job.id} started")
+            job.task = asyncio.ensure_future(self.run(job))
+
+            # Wait for the mission to end (including its own clean-up when cancelled)
+            await asyncio.wait([job.task])
+            self.current = None
+            self._record(job)
+
+            if job.state == "cancelled" and not self.pending and self.on_idle is not None:
+                try:
+                    await self.on_idle()
+                except Exception as e:
+                    print(f"[Missions] Idle action failed: {type(e).__name__}: {e}")
+            self._prune()
+
+    def _record(self, job):
+        """Final state of a job whose task is over (once; cancel() may get there first)."""
+        if job.finished is not None:
+            return
+        if job.task.cancelled():
+            self._finish(job, job.state if job.state in FINISHED else "cancelled")
+        elif job.task.exception() is not None:
+            e = job.task.exception()
+            self._finish(job, "failed", f"{type(e).__name__}: {e}")
+        else:
+            self._finish(job, "done")
+        print(f"[Missions] Job {job.id} {job.state} after {job.finished - job.started:.0f}s"
+              + (f": {job.error}" if job.error else ""))
+
+    # --- READING ---
+    def get(self, job_id):
+        job = self.jobs.get(job_id)
+        return job.status() if job is not None else None
+
+    def status(self):
+        return {
+            "current": self.current.id if self.current is not None else None,
+            "queued": [job.id for job in self.pending],
+            "jobs": [job.status() for job in reversed(list(self.jobs.values()))],
+        }
@@ -0,0 +1,326 @@
+import asyncio
+import atexit
+import concurrent.futures
+import os
+import sys
+import threading
+import time
+
+# app.py puts scripts/missions/drawn_polygon_mission on sys.path; the shared
+# mission modules are one level up
+MISSIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "missions")
+if MISSIONS_DIR not in sys.path:
+    sys.path.append(MISSIONS_DIR)
+
+# Only light modules at import time, so the Flask UI comes up at once. mavsdk /
+# gRPC, NumPy and the planners are imported by the runtime thread (_main), after
+# the mavsdk_server pool has been started
+from swarm_roster import load_roster
+from server_pool import MavsdkServerPool, enabled as server_pool_enabled
+from mission_jobs import MissionJob, MissionScheduler
+
+# Drones that failed the startup connect are retried this often (and on every deploy);
+# the pooled mavsdk_servers are health-checked (and respawned) at the same pace
+RETRY_INTERVAL_S = 30
+RETRY_CONNECT_TIMEOUT_S = 30
+
+
+class RuntimeUnavailable(RuntimeError):
+    """The runtime cannot serve a request: it failed to start, or its loop did not answer in time."""
+
+
+class MissionRuntime:
+    """
+    One long-lived asyncio loop for the whole GCS.
+
+    It runs in a daemon thread started together with the Flask app, connects
+    the swarm ONCE and then keeps the agents (and their telemetry hubs) alive.
+    Flask handlers hand new missions over with submit(), which is thread-safe,
+    so a re-deploy skips the whole connect + GPS lock handshake. Missions run
+    one at a time as MissionJobs (queued or preempting, see mission_jobs).
+
+    With shards > 0 (or $SWARM_SHARDS) the drones themselves run in that many
+    worker processes (see sharded_swarm) and this loop only holds RemoteAgents.
+
+    Drones that fail the connect are retried in the background; the ones that
+    come up join the swarm before the next mission (or at once when idle). A
+    pooled server that dies is respawned and its drone re-attached to it.
+
+    Every drone's mavsdk_server is started first thing, from a pool (unless
+    server_pool=False or $SWARM_SERVER_POOL=0), so the servers discover their
+    vehicles while everything else loads.
+    """
+
+    def __init__(self, roster=None, shards=None, server_pool=None):
+        self.roster = roster  # None -> load_roster() default file
+        self.shards = int(os.environ.get("SWARM_SHARDS", 0)) if shards is None else shards
+        use_pool = server_pool_enabled() if server_pool is None else server_pool
+        self.pool = MavsdkServerPool() if use_pool else None
+        self.sharded = None  # ShardedSwarm when self.shards > 0
+        self.store = None  # SwarmStateStore every drone's telemetry is mirrored into
+        self.swarm = []
+        self.failed = []
+        self._joined = []  # reconnected agents waiting to be merged into self.swarm
+        self._dropped = False  # drones left self.swarm: the monitors need a rebuild
+        self._roster_ids = []  # drone ids in roster order
+        self.monitor = None  # ArrivalMonitor of the connected swarm (progress for /status)
+        self.separation = None  # SeparationMonitor of the connected swarm
+        self._phases_exported = None  # time.monotonic() of the last phase log export
+        self.profiler = None  # LoopProfiler of the runtime loop when SWARM_PROFILE is set
+        self.loop = None
+        self.error = None  # why the runtime task (_main) died, if it did
+
+        self._thread = None
+        self._main_task = None
+        self.scheduler = None  # MissionScheduler, created on the runtime loop
+        self._started = threading.Event()
+        self.ready = threading.Event()  # set once the swarm connect phase is over
+        # The runtime thread is a daemon: free the shared memory when the GCS exits
+        atexit.register(self.shutdown)
+
+    # --- FLASK THREAD SIDE ---
+    def start(self):
+        """Starts the runtime thread (no-op if already running)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="mission-runtime", daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def submit(self, coordinates, mode="preempt", sweep_spacing_m=None):
+        """
+        Starts (mode "preempt") or queues (mode "queue") a mission for the drawn
+        polygon. Safe to call from any thread. Returns the MissionJob.
+
+        With sweep_spacing_m the drones sweep their sectors (coverage passes that
+        far apart) instead of hovering at the sector centers.
+        """
+        if self.error is not None:
+            raise RuntimeUnavailable(f"Mission runtime failed: {self.error}")
+        job = MissionJob(coordinates, mode, sweep_spacing_m)
+        self._call(self.scheduler.submit, job)
+        return job
+
+    def cancel(self, job_id):
+        """Cancels a queued or running mission. Returns False if it is not active."""
+        return self._call(self.scheduler.cancel, job_id)
+
+    def job(self, job_id):
+        """Status dict of one mission (None if unknown)."""
+        return self._call(self.scheduler.get, job_id)
+
+    def missions(self):
+        return self._call(self.scheduler.status)
+
+    def shutdown(self, timeout=2.0):
+        """Stops the runtime loop and frees the shared-memory state store (idempotent)."""
+        if self.loop is not None and self._thread is not None and self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+        self._close_store()
+
+    def _close_store(self):
+        store, self.store = self.store, None
+        if store is None:
+            return
+        for agent in list(self.swarm) + self._joined + [agent for agent, _ in self.failed]:
+            telemetry = getattr(agent, "telemetry", None)
+            if getattr(telemetry, "store", None) is store:
+                telemetry.store = None
+        store.close()
+
+    def _call(self, func, *args, timeout=5.0):
+        """Runs func(*args) on the runtime loop and returns its result."""
+        if self.loop is None:
+            raise RuntimeError("Mission runtime is not started")
+
+        async def call():
+            return func(*args)
+        try:
+            return asyncio.run_coroutine_threadsafe(call(), self.loop).result(timeout)
+        except concurrent.futures.TimeoutError:
+            raise RuntimeUnavailable(f"Mission runtime did not answer within {timeout:.0f}s") from None
+
+    def status(self):
+        # Runs on the Flask thread: only report the mission modules once the runtime
+        # thread has loaded them, instead of importing NumPy & co. here
+        phase_timing = sys.modules.get("phase_timing")
+        plan_cache = sys.modules.get("plan_cache")
+
+        return {
+            "ready": self.ready.is_set(),
+            "error": self.error,
+            "connected": [agent.id for agent in self.swarm],
+            "failed": [agent.id for agent, _ in self.failed],
+            "missions": self.missions() if self.loop is not None else None,
+            "arrivals": self.monitor.status() if self.monitor is not None else [],
+            "separation": self.separation.status() if self.separation is not None else None,
+            "phases": phase_timing.PHASE_LOG.summary() if phase_timing is not None else {},
+            "profile": self.profiler.summary() if self.profiler is not None else None,
+            "shards": self.sharded.status() if self.sharded is not None else None,
+            "state_store": self.store.name if self.store is not None else None,
+            "plan_cache": plan_cache.PLAN_CACHE.stats() if plan_cache is not None else None,
+            "server_pool": self.pool.status() if self.pool is not None else None,
+        }
+
+    # --- RUNTIME THREAD SIDE ---
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.scheduler = MissionScheduler(self._run_job, on_idle=self._hold_swarm)
+        self._main_task = self.loop.create_task(self._main())
+        self._main_task.add_done_callback(self._main_done)
+        self._started.set()
+        self.loop.run_forever()
+
+    def _main_done(self, task):
+        if task.cancelled() or task.exception() is None:
+            return
+        e = task.exception()
+        self.error = f"{type(e).__name__}: {e}"
+        print(f"[Runtime] Mission runtime failed: {self.error}")
+        # Nothing will ever run the missions that were waiting for the swarm
+        self.scheduler.abort(self.error)
+
+    async def _main(self):
+        roster = self.roster if self.roster is not None else load_roster()
+        if self.pool is not None:
+            roster = self.pool.start(roster)
+
+        from swarm_roster import build_swarm, connect_swarm
+        from arrival_monitor import ArrivalMonitor
+        from separation_monitor import SeparationMonitor
+        from loop_profiler import LoopProfiler, enabled as profiling_enabled
+        from sharded_swarm import ShardedSwarm
+        from state_store import SwarmStateStore
+
+        if profiling_enabled():
+            self.profiler = LoopProfiler()
+            self.profiler.start()
+        self._roster_ids = [d["id"] for d in roster]
+        print("[Runtime] Connecting swarm (once for the lifetime of the GCS)...")
+        # Shared-memory state of every drone (other threads/processes attach by name)
+        self.store = SwarmStateStore.create([d["id"] for d in roster])
+        try:
+            if self.shards > 0:
+                self.sharded = ShardedSwarm(roster, shards=self.shards, store_name=self.store.name)
+                self.swarm, self.failed = await self.sharded.start()
+            else:
+                swarm = build_swarm(roster)
+                for agent in swarm:
+                    agent.telemetry.attach_store(self.store)
+                self.swarm, self.failed = await connect_swarm(swarm)
+            self.monitor = ArrivalMonitor(self.swarm, report_every_s=10)
+            self.monitor.start()
+            self.separation = SeparationMonitor(self.swarm)
+            self.separation.start()
+            self.ready.set()
+            watchdog = asyncio.ensure_future(self._watchdog_loop())
+
+            # Missions submitted while connecting waited in the scheduler
+            try:
+                await self.scheduler.run_forever()
+            finally:
+                watchdog.cancel()
+        finally:
+            self._close_store()
+
+    async def _watchdog_loop(self):
+        """
+        Respawns dead pooled servers (re-attaching their drones) and retries the
+        drones that did not connect (e.g. a slow SITL).
+        """
+        while True:
+            await asyncio.sleep(RETRY_INTERVAL_S)
+            try:
+                if self.pool is not None:
+                    await self._reattach(self.pool.restart_dead())
+                await self._reconnect_failed()
+                if self.scheduler.current is None:
+                    await self._merge_joined()
+            except Exception as e:
+                print(f"[Runtime] Watchdog error: {type(e).__name__}: {e}")
+
+    async def _reattach(self, drone_ids):
+        """Reconnects the connected drones whose mavsdk_server was respawned (failed ones are retried anyway)."""
+        agents = [agent for agent in self.swarm + self._joined if agent.id in drone_ids]
+        if not agents:
+            return
+        print(f"[Runtime] Re-attaching drones {[agent.id for agent in agents]} to their respawned servers...")
+        if self.sharded is not None:
+            connected, failed = await self.sharded.reconnect(agents, timeout=RETRY_CONNECT_TIMEOUT_S, force=True)
+        else:
+            from swarm_roster import connect_swarm
+            for agent in agents:
+                await agent.telemetry.stop()  # its streams died with the old server
+            connected, failed = await connect_swarm(agents, timeout=RETRY_CONNECT_TIMEOUT_S)
+        if failed:
+            lost = {agent.id for agent, _ in failed}
+            self.swarm = [agent for agent in self.swarm if agent.id not in lost]
+            self._joined = [agent for agent in self._joined if agent.id not in lost]
+            self.failed += failed
+            self._dropped = True
+
+    def _retry_candidates(self):
+        # A pooled server that ran out of restarts has nothing to connect to
+        if self.pool is None:
+            return [agent for agent, _ in self.failed]
+        return [agent for agent, _ in self.failed
+                if agent.id not in self.pool.servers or self.pool.alive(agent.id)]
+
+    async def _reconnect_failed(self):
+        agents = self._retry_candidates()
+        if not agents:
+            return
+        print(f"[Runtime] Retrying {len(agents)} drones that failed to connect...")
+        if self.sharded is not None:
+            connected, failed = await self.sharded.reconnect(agents, timeout=RETRY_CONNECT_TIMEOUT_S)
+        else:
+            from swarm_roster import connect_swarm
+            connected, failed = await connect_swarm(agents, timeout=RETRY_CONNECT_TIMEOUT_S)
+        retried = {agent.id for agent in agents}
+        self.failed = [(agent, reason) for agent, reason in self.failed if agent.id not in retried] + failed
+        self._joined += connected
+
+    async def _merge_joined(self):
+        """Adds the reconnected drones to the swarm and restarts the monitors over it (also after drops)."""
+        from arrival_monitor import ArrivalMonitor
+        from separation_monitor import SeparationMonitor
+
+        joined, self._joined = self._joined, []
+        if not joined and not self._dropped:
+            return
+        self._dropped = False
+        order = {drone_id: i for i, drone_id in enumerate(self._roster_ids)}
+        self.swarm = sorted(self.swarm + joined, key=lambda agent: order[agent.id])
+        print(f"[Runtime] Drones {[agent.id for agent in joined]} joined the swarm "
+              f"({len(self.swarm)}/{len(self._roster_ids)} connected)")
+        # Both monitors size their state to the swarm they were built with
+        await self.monitor.stop()
+        await self.separation.stop()
+        self.monitor = ArrivalMonitor(self.swarm, report_every_s=10)
+        self.monitor.start()
+        self.separation = SeparationMonitor(self.swarm)
+        self.separation.start()
+
+    async def _run_job(self, job):
+        from main_mission import run_sky_guards_mission
+        from phase_timing import PHASE_LOG, default_log_path
+
+        await self._merge_joined()
+        try:
+            await run_sky_guards_mission(job.coordinates, swarm=self.swarm, monitor=self.monitor,
+                                         sweep_spacing_m=job.sweep_spacing_m)
+        finally:
+            # One phase log per mission (the connect phases go into the first one). Sharded
+            # drones keep their marks in the worker processes: no empty files for those
+            PHASE_LOG.export(default_log_path(), since=self._phases_exported, skip_empty=True)
+            self._phases_exported = time.monotonic()
+            if self.profiler is not None:
+                self.profiler.report()
+
+    async def _hold_swarm(self):
+        """A mission was cancelled and nothing replaces it: stop every drone in the air where it is."""
+        flying = [agent for agent in self.swarm if agent.telemetry.in_air]
+        print(f"[Runtime] Holding {len(flying)} airborne drones in place")
+        await asyncio.gather(*[agent.hold() for agent in flying])
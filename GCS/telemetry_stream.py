@@ -0,0 +1,181 @@
+import json
+import math
+import threading
+import time
+
+# Fields pushed to the map, and how many decimals are worth sending for each.
+# Rounding keeps hovering drones from producing a "change" on every sample.
+STREAM_FIELDS = {
+    "lat": 7,
+    "lon": 7,
+    "rel_alt": 1,
+    "abs_alt": 1,
+    "flight_mode": None,
+    "armed": None,
+    "in_air": None,
+}
+
+
+class TelemetryBroadcaster:
+    """
+    Server-Sent Events fan-out of the swarm state for the GCS map.
+
+    ONE sampler thread reads the runtime's shared-memory state store (or the
+    agents' TelemetryHub snapshots without one; no extra MAVSDK streams) at
+    `rate_hz` and publishes a frame. Every browser client
+    then gets its own generator that:
+      - is rate limited to the hz it asked for (clamped to rate_hz), always
+        skipping to the newest frame instead of queueing old ones,
+      - only receives the fields that changed since ITS last message (delta encoding).
+    """
+
+    def __init__(self, runtime, rate_hz=10, max_clients=32, keepalive_s=15):
+        self.runtime = runtime
+        self.rate_hz = rate_hz
+        self.max_clients = max_clients
+        self.keepalive_s = keepalive_s
+
+        self._frame = {}  # drone id -> {field: value}
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._clients = 0
+        self._thread = None
+
+    # --- SAMPLER ---
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._sample_loop, name="telemetry-sampler", daemon=True)
+        self._thread.start()
+
+    def _sample_loop(self):
+        period = 1.0 / self.rate_hz
+        next_tick = time.monotonic()
+        last_error = None
+        while True:
+            try:
+                self._sample()
+                last_error = None
+            except Exception as e:
+                # Keep sampling (e.g. the store was closed under us); report each new error once
+                error = f"{type(e).__name__}: {e}"
+                if error != last_error:
+                    print(f"[Telemetry] Sampler error: {error}")
+                last_error = error
+
+            next_tick = max(next_tick + period, time.monotonic() - period)
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+
+    def _sample(self):
+        swarm = list(self.runtime.swarm)
+        store = getattr(self.runtime, "store", None)
+        if store is not None:
+            # One consistent copy of every column instead of a dict per drone
+            connected = {agent.id for agent in swarm}
+            snapshots = [s for s in store.to_dicts() if s["id"] in connected]
+        else:
+            snapshots = [agent.telemetry.snapshot() for agent in swarm]
+        frame = {str(s["id"]): _quantize(s) for s in snapshots}
+        with self._cond:
+            if frame != self._frame:
+                self._frame = frame
+                self._seq += 1
+                self._cond.notify_all()
+
+    # --- CLIENTS ---
+    @property
+    def client_count(self):
+        return self._clients
+
+    def at_capacity(self):
+        """True when max_clients streams are open (new ones are turned away with a 503)."""
+        return self._clients >= self.max_clients
+
+    @staticmethod
+    def valid_hz(hz):
+        return hz is None or (math.isfinite(hz) and hz > 0)
+
+    def _acquire_client(self):
+        with self._cond:
+            if self._clients >= self.max_clients:
+                return False
+            self._clients += 1
+            return True
+
+    def stream(self, hz=None):
+        """
+        SSE generator for one client.
+
+        The first event is the full state ('snapshot'); after that only
+        'delta' events: {"drones": {id: {changed fields}}, "gone": [ids]}.
+        The client slot is taken when the generator starts and freed when it is
+        closed, so a response that is never read holds no slot. If all slots
+        were taken in the meantime, a single 'busy' event is sent instead.
+        """
+        if not self.valid_hz(hz):
+            raise ValueError(f"hz must be a positive number, got {hz!r}")
+        hz = self.rate_hz if hz is None else min(max(hz, 0.2), self.rate_hz)
+        min_interval = 1.0 / hz
+        sent = {}  # what THIS client has seen: drone id -> {field: value}
+        seen_seq = -1
+        last_send = 0.0
+
+        if not self._acquire_client():
+            yield "event: busy\ndata: {}\n\n"
+            return
+        try:
+            self.start()
+            while True:
+                # Downsampling: never send faster than this client's hz
+                wait = last_send + min_interval - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+
+                # Only decide under the lock: never yield (write to the socket) while holding it
+                with self._cond:
+                    if self._seq == seen_seq:
+                        self._cond.wait(timeout=self.keepalive_s)
+                    keepalive = self._seq == seen_seq
+                    seen_seq = self._seq
+                    frame = self._frame
+                if keepalive:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if not sent:
+                    event, payload = "snapshot", {"drones": frame}
+                else:
+                    event, payload = "delta", _delta(sent, frame)
+                    if not payload["drones"] and not payload["gone"]:
+                        continue
+
+                sent = frame
+                last_send = time.monotonic()
+                yield f"event: {event}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+        finally:
+            with self._cond:
+                self._clients -= 1
+
+
+def _quantize(snapshot):
+    state = {}
+    for field, decimals in STREAM_FIELDS.items():
+        value = snapshot.get(field)
+        if decimals is not None and value is not None:
+            value = round(value, decimals)
+        state[field] = value
+    return state
+
+
+def _delta(old, new):
+    drones = {}
+    for drone_id, state in new.items():
+        previous = old.get(drone_id)
+        if previous is None:
+            drones[drone_id] = state
+            continue
+        changed = {k: v for k, v in state.items() if previous.get(k) != v}
+        if changed:
+            drones[drone_id] = changed
+    gone = [drone_id for drone_id in old if drone_id not in new]
+    return {"drones": drones, "gone": gone}
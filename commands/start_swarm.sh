@@ -1,5 +1,14 @@
 #!/bin/bash
 
+# Usage: ./start_swarm.sh [COUNT] [BASE_UDP_PORT] [QGCS_ADDRESS]
+#   COUNT          Number of drones (default 4)
+#   BASE_UDP_PORT  MAVSDK port of drone 1; drone i uses BASE+i (default 14540)
+#   QGCS_ADDRESS   Windows/QGCS address; drone i sends to port 14550+i (default 172.30.224.1)
+# Must match scripts/missions/swarm_roster.json (count + base_udp_port).
+COUNT=${1:-4}
+BASE_UDP_PORT=${2:-14540}
+QGCS_ADDRESS=${3:-172.30.224.1}
+
 # Function to kill all background processes when you press Ctrl+C
 cleanup() {
     echo "Stopping all swarm instances..."
@@ -9,19 +18,14 @@ cleanup() {
 # Trap the interrupt signal (Ctrl+C)
 trap cleanup SIGINT
 
-echo "Starting Swarm..."
-
-# Drone 1 (Instance 0)
-sim_vehicle.py -v Copter --console -I0 -L KFUPM --sysid 1 --out=udp:127.0.0.1:14540 --out=udp:172.30.224.1:14550 --no-rebuild &
-
-# Drone 2 (Instance 1)
-sim_vehicle.py -v Copter --console -I1 -L KFUPM --sysid 2 --out=udp:127.0.0.1:14541 --out=udp:172.30.224.1:14551 --no-rebuild &
-
-# Drone 3 (Instance 2)
-sim_vehicle.py -v Copter --console -I2 -L KFUPM --sysid 3 --out=udp:127.0.0.1:14542 --out=udp:172.30.224.1:14552 --no-rebuild &
+echo "Starting Swarm of $COUNT drones..."
 
-# Drone 4 (Instance 3)
-sim_vehicle.py -v Copter --console -I3 -L KFUPM --sysid 4 --out=udp:127.0.0.1:14543 --out=udp:172.30.224.1:14553 --no-rebuild &
+for ((i = 0; i < COUNT; i++)); do
+    # Drone i+1 (Instance i)
+    sim_vehicle.py -v Copter --console -I$i -L KFUPM --sysid $((i + 1)) \
+        --out=udp:127.0.0.1:$((BASE_UDP_PORT + i)) \
+        --out=udp:$QGCS_ADDRESS:$((14550 + i)) --no-rebuild &
+done
 
 # Keep the script running to maintain the processes
 wait
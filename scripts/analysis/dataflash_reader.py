@@ -0,0 +1,249 @@
+"""
+Fast reader for ArduPilot dataflash logs (logs/0000NNNN.BIN).
+
+The file is memory-mapped, the FMT records are parsed once and the message
+boundaries are found with NumPy (no Python loop over records). Any message type
+can then be pulled out as a NumPy structured array in one vectorized gather:
+
+    log = DataflashLog("logs/00000021.BIN")
+    gps = log.messages("GPS")          # structured array, one row per GPS record
+    gps["Lat"], gps["Alt"], gps["TimeUS"]
+"""
+import argparse
+import glob
+import os
+
+import numpy as np
+
+HEAD1 = 0xA3
+HEAD2 = 0x95
+HEADER_LEN = 3          # HEAD1, HEAD2, msg type
+FMT_TYPE = 128
+FMT_LEN = 89
+
+# Dataflash format characters -> NumPy types (all little endian, packed)
+FORMAT_TYPES = {
+    "a": ("<i2", (32,)),
+    "b": "i1",
+    "B": "u1",
+    "h": "<i2",
+    "H": "<u2",
+    "i": "<i4",
+    "I": "<u4",
+    "f": "<f4",
+    "d": "<f8",
+    "n": "S4",
+    "N": "S16",
+    "Z": "S64",
+    "c": "<i2",   # * 0.01
+    "C": "<u2",   # * 0.01
+    "e": "<i4",   # * 0.01
+    "E": "<u4",   # * 0.01
+    "L": "<i4",   # lat/lon * 1e-7
+    "M": "u1",    # flight mode
+    "q": "<i8",
+    "Q": "<u8",
+}
+FORMAT_SCALE = {"c": 0.01, "C": 0.01, "e": 0.01, "E": 0.01, "L": 1e-7}
+
+_FMT_DTYPE = np.dtype([
+    ("type", "u1"), ("length", "u1"), ("name", "S4"), ("format", "S16"), ("columns", "S64"),
+])
+
+
+class MessageFormat:
+    """One FMT record: message id, total length and the payload dtype."""
+
+    def __init__(self, type_id, length, name, fmt, columns):
+        self.type_id = type_id
+        self.length = length
+        self.name = name
+        self.format = fmt
+        self.columns = columns
+
+        fields = []
+        for i, ch in enumerate(fmt):
+            column = columns[i] if i < len(columns) and columns[i] else f"field{i}"
+            spec = FORMAT_TYPES[ch]
+            fields.append((column, *spec) if isinstance(spec, tuple) else (column, spec))
+        self.dtype = np.dtype(fields)  # packed: no alignment padding, like the C struct
+        self.scales = {columns[i]: FORMAT_SCALE[ch] for i, ch in enumerate(fmt)
+                       if ch in FORMAT_SCALE and i < len(columns)}
+
+    def __repr__(self):
+        return f"MessageFormat({self.name}, id={self.type_id}, len={self.length}, fmt={self.format})"
+
+
+class DataflashLog:
+    """
+    A memory-mapped .BIN log.
+
+    Constructing it scans the whole file once (vectorized) to find every
+    message start; messages() then only touches the bytes of the wanted type.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        self.formats = {}     # type id -> MessageFormat
+        self.by_name = {}     # name -> MessageFormat
+        self.offsets = None   # start offset of every message, in file order
+        self.types = None     # message type of every message, in file order
+        self._scan()
+
+    # --- SCANNING ---
+    def _scan(self):
+        d = self.data
+        if len(d) < HEADER_LEN:
+            self.offsets = np.zeros(0, dtype=np.int64)
+            self.types = np.zeros(0, dtype=np.uint8)
+            return
+
+        # 1. Every position that LOOKS like a message header
+        cand = np.flatnonzero((d[:-2] == HEAD1) & (d[1:-1] == HEAD2)).astype(np.int64)
+        cand_types = d[cand + 2]
+
+        # 2. FMT records have a fixed size, so they can be parsed before anything else
+        self._parse_formats(cand[(cand_types == FMT_TYPE) & (cand + FMT_LEN <= len(d))])
+
+        # 3. Follow the length chain from the first header (see follow_chain)
+        lengths = np.zeros(256, dtype=np.int64)
+        for fmt in self.formats.values():
+            lengths[fmt.type_id] = fmt.length
+        msg_len = lengths[cand_types]
+        ok = (msg_len > 0) & (cand + msg_len <= len(d))
+        cand, cand_types, msg_len = cand[ok], cand_types[ok], msg_len[ok]
+
+        on_path = follow_chain(cand, cand + msg_len)
+        self.offsets = cand[on_path]
+        self.types = cand_types[on_path]
+
+    def _parse_formats(self, offsets):
+        if len(offsets) == 0:
+            return
+        rows = self.data[offsets[:, None] + HEADER_LEN + np.arange(FMT_LEN - HEADER_LEN)]
+        records = np.ascontiguousarray(rows).view(_FMT_DTYPE).ravel()
+        for rec in records:
+            try:
+                name = rec["name"].decode("ascii")
+                fmt = rec["format"].decode("ascii")
+                columns = rec["columns"].decode("ascii").split(",") if rec["columns"] else []
+            except UnicodeDecodeError:
+                continue  # a3 95 80 inside some payload, not a real FMT
+            if not name.isprintable() or any(ch not in FORMAT_TYPES for ch in fmt):
+                continue
+            fmt_obj = MessageFormat(int(rec["type"]), int(rec["length"]), name, fmt, columns)
+            if fmt_obj.dtype.itemsize != fmt_obj.length - HEADER_LEN:
+                continue
+            self.formats[fmt_obj.type_id] = fmt_obj
+            self.by_name[name] = fmt_obj
+
+    # --- READING ---
+    def message_names(self):
+        return sorted(self.by_name)
+
+    def counts(self):
+        """Number of records per message name."""
+        ids, n = np.unique(self.types, return_counts=True)
+        return {self.formats[int(i)].name: int(c) for i, c in zip(ids, n) if int(i) in self.formats}
+
+    def messages(self, name, scale=False):
+        """
+        All records of one message type as a NumPy structured array.
+
+        Args:
+            name (str): Message name, e.g. "GPS", "BARO", "ATT", "CTUN".
+            scale (bool): Convert scaled integer fields (centi-units, lat/lon*1e7)
+                to float64 in real units. Off by default to keep the raw on-disk layout.
+        """
+        fmt = self.by_name[name]
+        offsets = self.offsets[self.types == fmt.type_id]
+        payload_len = fmt.length - HEADER_LEN
+
+        # One gather for the whole type: (n_records, payload_len) bytes -> structured rows
+        rows = self.data[offsets[:, None] + HEADER_LEN + np.arange(payload_len)]
+        records = np.ascontiguousarray(rows).view(fmt.dtype).ravel()
+
+        if not scale or not fmt.scales:
+            return records
+
+        scaled_dtype = np.dtype([
+            (field, "<f8") if field in fmt.scales else (field, records.dtype.fields[field][0])
+            for field in records.dtype.names
+        ])
+        out = np.empty(len(records), dtype=scaled_dtype)
+        for field in records.dtype.names:
+            out[field] = records[field] * fmt.scales[field] if field in fmt.scales else records[field]
+        return out
+
+    def close(self):
+        # np.memmap closes the file when the last reference goes away
+        self.data = None
+
+
+def follow_chain(starts, ends):
+    """
+    Finds which candidate headers are real message starts.
+
+    A real message ends exactly where the next one starts, so starting from the
+    first candidate we follow start -> end pointers. If nothing starts at the
+    end of a message (corrupt bytes), the pointer goes to the next candidate
+    after it instead, which is the same resync the ArduPilot tools do.
+    The walk uses pointer doubling: O(n log n) array ops, no per-record Python loop.
+    """
+    n = len(starts)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+
+    # next_idx[i] = first candidate starting at/after the end of candidate i (n = none)
+    next_idx = np.searchsorted(starts, ends)
+    next_idx = np.append(next_idx, n)  # sentinel node n points to itself
+
+    reached = np.zeros(n + 1, dtype=bool)
+    reached[0] = True
+    jump = next_idx
+    # After round k, 'reached' holds every node within 2**k steps of the first one
+    while True:
+        grown = reached.copy()
+        grown[jump[reached]] = True
+        if np.array_equal(grown, reached):
+            break
+        reached = grown
+        jump = jump[jump]
+    return reached[:n]
+
+
+def load_many(paths, name, scale=False):
+    """Extracts one message type from many logs. Returns {path: structured array}."""
+    results = {}
+    for path in paths:
+        log = DataflashLog(path)
+        if name in log.by_name:
+            results[path] = log.messages(name, scale=scale)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect ArduPilot dataflash .BIN logs.")
+    parser.add_argument("logs", nargs="*", help="Log files (default: logs/*.BIN)")
+    parser.add_argument("--type", help="Message type to extract, e.g. GPS")
+    parser.add_argument("--rows", type=int, default=5, help="Rows to print per log")
+    args = parser.parse_args()
+
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    paths = args.logs or sorted(glob.glob(os.path.join(project_root, "logs", "*.BIN")))
+
+    for path in paths:
+        log = DataflashLog(path)
+        print(f"--- {os.path.basename(path)}: {len(log.offsets)} messages, {len(log.formats)} formats ---")
+        if args.type:
+            if args.type not in log.by_name:
+                print(f"No {args.type} messages")
+                continue
+            records = log.messages(args.type, scale=True)
+            print(f"{args.type}: {len(records)} records, fields: {', '.join(records.dtype.names)}")
+            for row in records[:args.rows]:
+                print(row)
+        else:
+            for name, count in sorted(log.counts().items(), key=lambda kv: -kv[1]):
+                print(f"{name:6s} {count}")
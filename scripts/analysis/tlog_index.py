@@ -0,0 +1,254 @@
+"""
+Random-access index for MAVLink telemetry logs (mav.tlog, mav.tlog.raw).
+
+A .tlog is a stream of [8-byte big-endian timestamp in us][MAVLink packet].
+The file is scanned ONCE (vectorized, memory-mapped) into an index of
+(time, offset, length, msg id, sysid, compid) that is saved next to the log
+as <log>.idx.npy. After that:
+
+    tlog = TlogIndex("mav.tlog")
+    i = tlog.seek_time(t_us)                        # O(log n)
+    rows = tlog.select(msgid=33, sysid=2)           # GLOBAL_POSITION_INT of drone 2
+    for t_us, packet in tlog.iter_packets(msgid=33, start=t0, end=t1):
+        ...
+
+Packets are only read from disk when iterated. If the log grew since the index
+was saved, only the new tail is scanned and appended.
+"""
+import argparse
+import os
+
+import numpy as np
+
+from dataflash_reader import follow_chain
+
+MAVLINK_V1_STX = 0xFE
+MAVLINK_V2_STX = 0xFD
+TIMESTAMP_LEN = 8
+
+# Timestamps outside this window are treated as "not a record start" (2000-01-01 .. 2100-01-01)
+MIN_TIMESTAMP_US = 946684800 * 10**6
+MAX_TIMESTAMP_US = 4102444800 * 10**6
+
+INDEX_DTYPE = np.dtype([
+    ("time_us", "<u8"),   # tlog timestamp (0 for .raw logs)
+    ("offset", "<i8"),    # start of the MAVLink packet in the file
+    ("length", "<u2"),    # packet length in bytes (STX .. CRC/signature)
+    ("msgid", "<u4"),
+    ("sysid", "u1"),
+    ("compid", "u1"),
+])
+
+
+def scan_packets(data, start=0, timestamped=True):
+    """
+    Finds every MAVLink packet in data[start:] (a uint8 array / memmap).
+
+    Returns:
+        np.ndarray of INDEX_DTYPE, in file order.
+    """
+    d = data[start:]
+    prefix = TIMESTAMP_LEN if timestamped else 0
+    n = len(d)
+    if n < prefix + 8:
+        return np.zeros(0, dtype=INDEX_DTYPE)
+
+    # 1. Every STX byte that could start a packet
+    stx = np.flatnonzero((d == MAVLINK_V1_STX) | (d == MAVLINK_V2_STX)).astype(np.int64)
+    stx = stx[(stx >= prefix) & (stx + 12 <= n)]
+    is_v2 = d[stx] == MAVLINK_V2_STX
+    payload_len = d[stx + 1].astype(np.int64)
+
+    incompat = np.where(is_v2, d[stx + 2], 0).astype(np.int64)
+    length = np.where(is_v2, 12 + payload_len + np.where(incompat & 0x01, 13, 0), 8 + payload_len)
+    ok = (stx + length <= n) & ((incompat & ~0x01) == 0)
+
+    # 2. A record starts with a plausible timestamp (tlog) before the STX
+    if timestamped:
+        ts_bytes = d[(stx[:, None] - TIMESTAMP_LEN) + np.arange(TIMESTAMP_LEN)]
+        time_us = np.ascontiguousarray(ts_bytes).view(">u8").ravel().astype(np.uint64)
+        ok &= (time_us >= MIN_TIMESTAMP_US) & (time_us <= MAX_TIMESTAMP_US)
+    else:
+        time_us = np.zeros(len(stx), dtype=np.uint64)
+
+    stx, is_v2, length, time_us = stx[ok], is_v2[ok], length[ok], time_us[ok]
+
+    # 3. Keep the chain of records that follow each other back to back
+    on_path = follow_chain(stx - prefix, stx + length)
+    stx, is_v2, length, time_us = stx[on_path], is_v2[on_path], length[on_path], time_us[on_path]
+
+    index = np.zeros(len(stx), dtype=INDEX_DTYPE)
+    index["time_us"] = time_us
+    index["offset"] = stx + start
+    index["length"] = length
+    # Header layout: v1 = STX len seq sys comp msgid, v2 = STX len incompat compat seq sys comp msgid[3]
+    index["sysid"] = np.where(is_v2, d[stx + 5], d[stx + 3])
+    index["compid"] = np.where(is_v2, d[stx + 6], d[stx + 4])
+    msgid_v2 = (d[stx + 7].astype(np.uint32)
+                | (d[stx + 8].astype(np.uint32) << 8)
+                | (d[stx + 9].astype(np.uint32) << 16))
+    index["msgid"] = np.where(is_v2, msgid_v2, d[stx + 5])
+    return index
+
+
+class TlogIndex:
+    """Indexed, memory-mapped view of one telemetry log."""
+
+    def __init__(self, path, timestamped=None, rebuild=False, save=True):
+        """
+        Args:
+            path (str): The .tlog (or raw MAVLink .raw) file.
+            timestamped (bool): Records carry the 8-byte tlog timestamp.
+                Default: True unless the file ends with '.raw'.
+            rebuild (bool): Ignore an existing sidecar index.
+            save (bool): Write/refresh the sidecar <path>.idx.npy.
+        """
+        self.path = path
+        self.timestamped = (not path.endswith(".raw")) if timestamped is None else timestamped
+        self.index_path = path + ".idx.npy"
+        self.data = np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) else np.zeros(0, np.uint8)
+
+        self.index = None if rebuild else self._load_sidecar()
+        if self.index is None:
+            self.index = scan_packets(self.data, 0, self.timestamped)
+            changed = True
+        else:
+            changed = self._extend()
+        if save and changed:
+            np.save(self.index_path, self.index)
+
+        self._sorted = bool(np.all(np.diff(self.index["time_us"].astype(np.int64)) >= 0))
+        self._time_order = None if self._sorted else np.argsort(self.index["time_us"], kind="stable")
+
+    def _load_sidecar(self):
+        """Returns the saved index if it still describes this file, else None."""
+        if not os.path.exists(self.index_path):
+            return None
+        try:
+            index = np.load(self.index_path, mmap_mode="r")
+        except (ValueError, OSError):
+            return None
+        if index.dtype != INDEX_DTYPE:
+            return None
+        if len(index):
+            # Logs only grow; if the last indexed packet is not where we left it,
+            # the file was truncated or replaced
+            last = index[-1]
+            offset = int(last["offset"])
+            if offset + int(last["length"]) > len(self.data):
+                return None
+            if self.data[offset] not in (MAVLINK_V1_STX, MAVLINK_V2_STX):
+                return None
+            if self.timestamped:
+                stamp = self.data[offset - TIMESTAMP_LEN:offset].tobytes()
+                if int.from_bytes(stamp, "big") != int(last["time_us"]):
+                    return None
+        return index
+
+    def _extend(self):
+        """Scans only the bytes written after the last indexed packet. Returns True if it grew."""
+        end = int(self.index["offset"][-1]) + int(self.index["length"][-1]) if len(self.index) else 0
+        if end >= len(self.data):
+            return False
+        tail = scan_packets(self.data, end, self.timestamped)
+        if not len(tail):
+            return False
+        self.index = np.concatenate([np.asarray(self.index), tail])
+        return True
+
+    # --- QUERIES ---
+    def __len__(self):
+        return len(self.index)
+
+    def time_range(self):
+        """(first, last) timestamp in us."""
+        if not len(self.index):
+            return None
+        t = self.index["time_us"]
+        return int(t.min()), int(t.max())
+
+    def seek_time(self, time_us):
+        """Index of the first packet at or after time_us, in time order. O(log n)."""
+        self._require_time()
+        if self._sorted:
+            return int(np.searchsorted(self.index["time_us"], time_us, side="left"))
+        return int(np.searchsorted(self.index["time_us"][self._time_order], time_us, side="left"))
+
+    def select(self, msgid=None, sysid=None, compid=None, start=None, end=None):
+        """
+        Index rows matching every given filter (vectorized, nothing is read from the log).
+
+        Args:
+            msgid (int or list): MAVLink message id(s).
+            sysid (int or list): System id(s) (one per drone).
+            start, end (int): Time window in us, [start, end).
+        """
+        rows = self.index
+        if start is not None or end is not None:
+            self._require_time()
+            if self._sorted:
+                lo = 0 if start is None else self.seek_time(start)
+                hi = len(rows) if end is None else self.seek_time(end)
+                rows = rows[lo:hi]
+            else:
+                t = rows["time_us"]
+                mask = np.ones(len(rows), dtype=bool)
+                if start is not None:
+                    mask &= t >= start
+                if end is not None:
+                    mask &= t < end
+                rows = rows[mask]
+
+        mask = np.ones(len(rows), dtype=bool)
+        for field, value in (("msgid", msgid), ("sysid", sysid), ("compid", compid)):
+            if value is not None:
+                mask &= np.isin(rows[field], np.atleast_1d(value))
+        return rows[mask]
+
+    def packet(self, row):
+        """Raw MAVLink bytes of one index row."""
+        offset = int(row["offset"])
+        return self.data[offset:offset + int(row["length"])].tobytes()
+
+    def iter_packets(self, msgid=None, sysid=None, compid=None, start=None, end=None):
+        """Streams (time_us, packet bytes) for the matching rows, reading lazily from the log."""
+        for row in self.select(msgid, sysid, compid, start, end):
+            yield int(row["time_us"]), self.packet(row)
+
+    def counts(self, field="msgid"):
+        """Number of packets per msgid (or per 'sysid' / 'compid')."""
+        values, n = np.unique(self.index[field], return_counts=True)
+        return {int(v): int(c) for v, c in zip(values, n)}
+
+    def _require_time(self):
+        if not self.timestamped:
+            raise ValueError(f"{self.path} has no timestamps (raw MAVLink log)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index and query MAVLink .tlog files.")
+    parser.add_argument("tlog", help="Path to the .tlog (or .raw) file")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the saved index")
+    parser.add_argument("--msgid", type=int, help="Only this message id")
+    parser.add_argument("--sysid", type=int, help="Only this system id")
+    parser.add_argument("--start", type=float, help="Seconds from the first packet")
+    parser.add_argument("--end", type=float, help="Seconds from the first packet")
+    args = parser.parse_args()
+
+    tlog = TlogIndex(args.tlog, rebuild=args.rebuild)
+    print(f"{args.tlog}: {len(tlog)} packets")
+    print(f"Systems: {tlog.counts('sysid')}")
+
+    if args.msgid is None and args.sysid is None and args.start is None and args.end is None:
+        print(f"Messages: {tlog.counts()}")
+    else:
+        start = end = None
+        if tlog.timestamped and (args.start is not None or args.end is not None):
+            t0 = tlog.time_range()[0]
+            start = None if args.start is None else t0 + int(args.start * 1e6)
+            end = None if args.end is None else t0 + int(args.end * 1e6)
+        rows = tlog.select(msgid=args.msgid, sysid=args.sysid, start=start, end=end)
+        print(f"{len(rows)} matching packets")
+        for row in rows[:10]:
+            print(f"  t={int(row['time_us'])} msgid={int(row['msgid'])} sysid={int(row['sysid'])} "
+                  f"offset={int(row['offset'])} len={int(row['length'])}")
@@ -0,0 +1,272 @@
+"""
+Benchmarks for the mission planning and telemetry paths.
+
+    python scripts/benchmarks/bench_mission.py                 # full run, JSON to stdout
+    python scripts/benchmarks/bench_mission.py --quick --out bench_output.json
+
+Every result is one JSON record {"name", "params", "repeat", "min_s", "median_s",
+"mean_s", "max_s"} plus a header with the git revision, so two runs can be
+diffed to catch regressions between releases.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+# Same sys.path setup as the mission scripts
+current_dir = os.path.dirname(os.path.abspath(__file__))
+missions_dir = os.path.join(os.path.dirname(current_dir), "missions")
+sys.path.append(missions_dir)
+sys.path.append(os.path.join(missions_dir, "center_sector_mission"))
+
+import numpy as np
+
+from arrival_monitor import ArrivalMonitor
+from drone_agent import DroneAgent
+from mission_manager import MissionManager
+from partition_func import get_ned_distance, get_sub_sector_centers
+from phase_timing import PHASE_LOG
+from plan_cache import PlanCache
+from separation_monitor import close_pairs
+from standin_vehicle import StandInSystem
+from telemetry_hub import TelemetryHub
+
+KFUPM_HOME = (26.308079, 50.146278)
+KFUPM_AREA = [
+    (26.308079, 50.146278),
+    (26.308642, 50.147220),
+    (26.309173, 50.146842),
+    (26.308620, 50.145891),
+]
+
+SWARM_SIZES = (4, 16, 64)
+GRID_SIZES = (2, 5, 10, 25, 50, 100)
+
+
+def _timeit(func, repeat):
+    """Runs func() `repeat` times (stdout silenced, the planners print a lot)."""
+    samples = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _record(name, params, samples):
+    return {
+        "name": name,
+        "params": params,
+        "repeat": len(samples),
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "max_s": max(samples),
+    }
+
+
+# --- PLANNING ---
+def bench_planning(grid_sizes, repeat):
+    results = []
+    manager = MissionManager(*KFUPM_HOME)
+    cached = MissionManager(*KFUPM_HOME, cache=PlanCache(cache_dir=None))
+    for n in grid_sizes:
+        results.append(_record("get_sub_sector_centers", {"grid": f"{n}x{n}"},
+                               _timeit(lambda: get_sub_sector_centers(100, 100, n, n), repeat)))
+        results.append(_record("MissionManager.process_area", {"sectors": n * n},
+                               _timeit(lambda: manager.process_area(KFUPM_AREA, n_sectors=n * n), repeat)))
+        with contextlib.redirect_stdout(io.StringIO()):  # warm the cache, then time the hits
+            cached.process_area(KFUPM_AREA, n_sectors=n * n)
+        results.append(_record("MissionManager.process_area.cached", {"sectors": n * n},
+                               _timeit(lambda: cached.process_area(KFUPM_AREA, n_sectors=n * n), repeat)))
+
+        # get_ned_distance: one call per point (old usage) vs one call for the whole grid
+        rng = np.random.default_rng(0)
+        lats = KFUPM_HOME[0] + rng.random(n * n) * 1e-3
+        lons = KFUPM_HOME[1] + rng.random(n * n) * 1e-3
+        results.append(_record("get_ned_distance.per_point", {"points": n * n}, _timeit(
+            lambda: [get_ned_distance(la, lo, 0, *KFUPM_HOME, 0) for la, lo in zip(lats, lons)], repeat)))
+        results.append(_record("get_ned_distance.batch", {"points": n * n}, _timeit(
+            lambda: get_ned_distance(lats, lons, 0, *KFUPM_HOME, 0), repeat)))
+    return results
+
+
+# --- ARRIVAL CHECK ---
+def _approach_stream(updates, target):
+    """Position stream that walks from 100 m south of the target onto it, as fast as possible."""
+    async def stream():
+        for i in range(updates + 1):
+            frac = 1.0 - i / updates
+            yield SimpleNamespace(latitude_deg=target[0] - frac * 9e-4, longitude_deg=target[1],
+                                  absolute_altitude_m=25.0, relative_altitude_m=25.0)
+            await asyncio.sleep(0)
+        await asyncio.sleep(3600)
+    return stream
+
+
+async def _arrival_run(swarm_size, updates):
+    hubs = []
+    for i in range(swarm_size):
+        telemetry = SimpleNamespace(position=_approach_stream(updates, KFUPM_HOME))
+        hub = TelemetryHub(SimpleNamespace(telemetry=telemetry), i)
+        hub.STREAMS = ("position",)
+        hubs.append(hub)
+
+    for hub in hubs:
+        hub.start()
+    await asyncio.gather(*[hub.wait_until_near(*KFUPM_HOME, radius_m=3.0) for hub in hubs])
+    for hub in hubs:
+        await hub.stop()
+
+
+def _monitor_ticks(swarm_size, ticks):
+    """ArrivalMonitor.tick() for a whole swarm of (static) positions."""
+    rng = np.random.default_rng(0)
+    swarm = []
+    for i in range(swarm_size):
+        position = SimpleNamespace(latitude_deg=KFUPM_HOME[0] + rng.random() * 1e-3,
+                                   longitude_deg=KFUPM_HOME[1] + rng.random() * 1e-3)
+        swarm.append(SimpleNamespace(id=i, telemetry=SimpleNamespace(position=position)))
+    monitor = ArrivalMonitor(swarm)
+    for agent in swarm:
+        monitor.set_target(agent.id, *KFUPM_HOME)
+    for k in range(ticks):
+        monitor.tick(now=k * 0.2)
+
+
+def bench_arrival(swarm_sizes, repeat, updates=200):
+    results = []
+    for n in swarm_sizes:
+        samples = _timeit(lambda: asyncio.run(_arrival_run(n, updates)), repeat)
+        record = _record("arrival_check", {"drones": n, "updates_per_drone": updates}, samples)
+        record["per_update_us"] = record["median_s"] / (n * updates) * 1e6
+        results.append(record)
+
+        samples = _timeit(lambda: _monitor_ticks(n, updates), repeat)
+        record = _record("arrival_monitor.tick", {"drones": n, "ticks": updates}, samples)
+        record["per_tick_us"] = record["median_s"] / updates * 1e6
+        results.append(record)
+    return results
+
+
+# --- SEPARATION ---
+def _all_pairs(points, radius):
+    """Reference: the plain all-pairs check the grid hash replaces."""
+    close = []
+    for a in range(len(points)):
+        for b in range(a + 1, len(points)):
+            d = float(np.linalg.norm(points[a] - points[b]))
+            if d < radius:
+                close.append((a, b, d))
+    return close
+
+
+def bench_separation(swarm_sizes, repeat, ticks=10):
+    """One separation tick for a swarm spread over the mission area at 20-35 m."""
+    results = []
+    rng = np.random.default_rng(0)
+    for n in swarm_sizes:
+        points = rng.random((n, 3)) * [400.0, 400.0, 15.0] - [200.0, 200.0, 35.0]
+        params = {"drones": n, "ticks": ticks, "min_separation_m": 5.0}
+        for name, check in (("separation.grid", close_pairs), ("separation.all_pairs", _all_pairs)):
+            samples = _timeit(lambda: [check(points, 5.0) for _ in range(ticks)], repeat)
+            record = _record(name, params, samples)
+            record["per_tick_us"] = record["median_s"] / ticks * 1e6
+            results.append(record)
+    return results
+
+
+# --- AGENT PIPELINE (stand-in vehicles) ---
+async def _pipeline_run(swarm_size, time_scale, phases):
+    agents = []
+    for i in range(swarm_size):
+        agent = DroneAgent(i + 1, f"standin://{i}", mavsdk_port=0)
+        agent.drone = StandInSystem(time_scale=time_scale, gps_delay=0.5)
+        agent.telemetry = TelemetryHub(agent.drone, agent.id)
+        agents.append(agent)
+
+    async def timed(name, coros):
+        start = time.perf_counter()
+        await asyncio.gather(*coros)
+        phases.setdefault(name, []).append(time.perf_counter() - start)
+
+    await timed("connect", [a.connect() for a in agents])
+    await timed("arm_and_takeoff", [a.arm_and_takeoff(10.0) for a in agents])
+    await timed("land", [a.land() for a in agents])
+    for agent in agents:
+        await agent.telemetry.stop()
+
+
+def bench_pipeline(swarm_sizes, repeat, time_scale=10.0):
+    results = []
+    for n in swarm_sizes:
+        phases = {}
+        PHASE_LOG.clear()
+        total = _timeit(lambda: asyncio.run(_pipeline_run(n, time_scale, phases)), repeat)
+        params = {"drones": n, "time_scale": time_scale}
+        results.append(_record("agent_pipeline.total", params, total))
+        for name, samples in phases.items():
+            results.append(_record(f"agent_pipeline.{name}", params, samples))
+        # Per-drone lifecycle phases (time since connect / arm_and_takeoff started)
+        for name in PHASE_LOG.summary():
+            samples = PHASE_LOG.samples(name).tolist()
+            results.append(_record(f"agent_phase.{name}", params, samples))
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=current_dir,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark planning and telemetry paths.")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes, fewer repeats")
+    parser.add_argument("--repeat", type=int, help="Repeats per benchmark")
+    parser.add_argument("--only", choices=["planning", "arrival", "separation", "pipeline"], action="append",
+                        help="Run only these groups (can repeat)")
+    parser.add_argument("--out", help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    swarm_sizes = SWARM_SIZES[:2] if args.quick else SWARM_SIZES
+    grid_sizes = GRID_SIZES[:3] if args.quick else GRID_SIZES
+    repeat = args.repeat or (3 if args.quick else 5)
+    groups = args.only or ["planning", "arrival", "separation", "pipeline"]
+
+    results = []
+    if "planning" in groups:
+        results += bench_planning(grid_sizes, repeat)
+    if "arrival" in groups:
+        results += bench_arrival(swarm_sizes, repeat)
+    if "separation" in groups:
+        results += bench_separation(swarm_sizes + (256,), repeat)
+    if "pipeline" in groups:
+        results += bench_pipeline(swarm_sizes, max(1, repeat // 2))
+
+    report = {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+        for r in results:
+            print(f"{r['name']:32s} {json.dumps(r['params']):40s} median {r['median_s'] * 1000:10.3f} ms")
+    else:
+        print(text)
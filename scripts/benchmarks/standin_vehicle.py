@@ -0,0 +1,173 @@
+"""
+In-process stand-in for mavsdk.System, used by the benchmarks.
+
+It implements only the calls DroneAgent / TelemetryHub make (connect,
+connection_state, the telemetry streams, arm/takeoff/goto/land) with very
+simple kinematics, so the agent pipeline can be timed for 64+ drones
+without any SITL or mavsdk_server processes.
+"""
+import asyncio
+import math
+import time
+from types import SimpleNamespace
+
+from geodesy import R_EARTH_M
+
+
+class StandInVehicle:
+    """Shared state + kinematics of one fake copter."""
+
+    def __init__(self, lat=26.308079, lon=50.146278, abs_alt=10.0, climb_rate=5.0, speed=10.0,
+                 rate_hz=20, connect_delay=0.0, gps_delay=0.0, time_scale=1.0):
+        """
+        Args:
+            climb_rate, speed (float): m/s vertical / horizontal.
+            rate_hz (int): Telemetry rate of every stream.
+            connect_delay, gps_delay (float): Seconds before heartbeat / GPS lock.
+            time_scale (float): >1 runs the vehicle faster than real time.
+        """
+        self.lat, self.lon = lat, lon
+        self.home_abs_alt = abs_alt
+        self.rel_alt = 0.0
+        self.velocity = (0.0, 0.0, 0.0)  # NED m/s over the last step
+        self.target_alt = 0.0
+        self.target = None
+        self.armed = False
+        self.in_air = False
+        self.landing = False
+        self.climb_rate = climb_rate * time_scale
+        self.speed = speed * time_scale
+        self.period = 1.0 / rate_hz
+        self.connect_delay = connect_delay / time_scale
+        self.gps_delay = gps_delay / time_scale
+        self.started = None
+        self.flight_mode = "HOLD"
+
+    def _step(self, dt):
+        lat, lon, rel_alt = self.lat, self.lon, self.rel_alt
+        self._move(dt)
+        if dt > 0:
+            self.velocity = (math.radians(self.lat - lat) * R_EARTH_M / dt,
+                             math.radians(self.lon - lon) * R_EARTH_M * math.cos(math.radians(lat)) / dt,
+                             (rel_alt - self.rel_alt) / dt)
+
+    def _move(self, dt):
+        if self.landing:
+            self.rel_alt = max(0.0, self.rel_alt - self.climb_rate * dt)
+            if self.rel_alt == 0.0:
+                self.in_air = False
+                self.landing = False
+        elif self.in_air and self.rel_alt < self.target_alt:
+            self.rel_alt = min(self.target_alt, self.rel_alt + self.climb_rate * dt)
+
+        if self.target is not None and self.in_air:
+            t_lat, t_lon = self.target
+            north = math.radians(t_lat - self.lat) * R_EARTH_M
+            east = math.radians(t_lon - self.lon) * R_EARTH_M * math.cos(math.radians(self.lat))
+            dist = math.hypot(north, east)
+            step = min(dist, self.speed * dt)
+            if dist > 1e-6:
+                self.lat += math.degrees(step * north / dist / R_EARTH_M)
+                self.lon += math.degrees(step * east / dist / (R_EARTH_M * math.cos(math.radians(self.lat))))
+
+    def gps_ok(self):
+        return self.started is not None and time.monotonic() - self.started >= self.gps_delay
+
+
+class _Core:
+    def __init__(self, vehicle):
+        self._v = vehicle
+
+    async def connection_state(self):
+        await asyncio.sleep(self._v.connect_delay)
+        yield SimpleNamespace(is_connected=True)
+
+
+class _Telemetry:
+    def __init__(self, vehicle):
+        self._v = vehicle
+
+    async def _ticks(self, make, step=False):
+        last = time.monotonic()
+        while True:
+            now = time.monotonic()
+            if step:  # the position stream drives the kinematics
+                self._v._step(now - last)
+            last = now
+            yield make()
+            await asyncio.sleep(self._v.period)
+
+    def _position(self):
+        v = self._v
+        return SimpleNamespace(latitude_deg=v.lat, longitude_deg=v.lon,
+                               absolute_altitude_m=v.home_abs_alt + v.rel_alt, relative_altitude_m=v.rel_alt)
+
+    def _velocity(self):
+        vn, ve, vd = self._v.velocity
+        return SimpleNamespace(north_m_s=vn, east_m_s=ve, down_m_s=vd)
+
+    def _health(self):
+        ok = self._v.gps_ok()
+        return SimpleNamespace(is_global_position_ok=ok, is_home_position_ok=ok, is_armable=ok)
+
+    def health(self):
+        return self._ticks(self._health)
+
+    def position(self):
+        return self._ticks(self._position, step=True)
+
+    def velocity_ned(self):
+        return self._ticks(self._velocity)
+
+    def in_air(self):
+        return self._ticks(lambda: self._v.in_air)
+
+    def armed(self):
+        return self._ticks(lambda: self._v.armed)
+
+    def flight_mode(self):
+        return self._ticks(lambda: self._v.flight_mode)
+
+
+class _Action:
+    def __init__(self, vehicle):
+        self._v = vehicle
+
+    async def arm(self):
+        self._v.armed = True
+
+    async def disarm(self):
+        self._v.armed = False
+
+    async def set_takeoff_altitude(self, altitude):
+        self._v.target_alt = altitude
+
+    async def takeoff(self):
+        self._v.in_air = True
+        self._v.flight_mode = "TAKEOFF"
+
+    async def goto_location(self, lat, lon, alt, yaw):
+        self._v.target = (lat, lon)
+        self._v.flight_mode = "HOLD"
+
+    async def hold(self):
+        self._v.target = None
+        self._v.flight_mode = "HOLD"
+
+    async def land(self):
+        self._v.landing = True
+        self._v.target = None
+        self._v.flight_mode = "LAND"
+
+
+class StandInSystem:
+    """Drop-in for mavsdk.System(port=...) backed by a StandInVehicle."""
+
+    def __init__(self, vehicle=None, **vehicle_kwargs):
+        self.vehicle = vehicle or StandInVehicle(**vehicle_kwargs)
+        self.core = _Core(self.vehicle)
+        self.telemetry = _Telemetry(self.vehicle)
+        self.action = _Action(self.vehicle)
+
+    async def connect(self, system_address=None):
+        self.vehicle.started = time.monotonic()
@@ -0,0 +1,219 @@
+"""
+Swarm-wide arrival monitor.
+
+One task samples every drone's cached position (from its TelemetryHub) a few
+times per second and computes ALL target distances in one vectorized call.
+Per drone it fires:
+    - "arrived": within radius_m of its target (latched until a new target)
+    - "stalled": no progress for stall_after_s (cleared when it moves again)
+and predicts an ETA from the recent (smoothed) closing speed.
+
+    monitor = ArrivalMonitor(swarm)
+    monitor.set_target(drone.id, lat, lon)
+    monitor.start()
+    await monitor.wait_all(timeout=120)
+"""
+import asyncio
+import math
+import time
+
+import numpy as np
+
+from geodesy import distance_m
+
+
+class ArrivalMonitor:
+    """Tracks every drone of a swarm against its current target."""
+
+    def __init__(self, swarm, radius_m=3.0, rate_hz=5.0, stall_after_s=10.0, progress_m=1.0,
+                 speed_window_s=3.0, report_every_s=None, on_arrived=None, on_stalled=None):
+        """
+        Args:
+            swarm (list): DroneAgents (anything with .id and .telemetry.position).
+            radius_m (float): Arrival radius.
+            rate_hz (float): Checks per second.
+            stall_after_s (float): Stalled if the distance has not dropped by
+                progress_m within this time.
+            speed_window_s (float): Time constant of the smoothed closing speed (for the ETA).
+            report_every_s (float): Print a one-line progress summary this often (None = never).
+            on_arrived, on_stalled (callable): Called with the agent when the event fires.
+        """
+        self.agents = list(swarm)
+        self.ids = [agent.id for agent in self.agents]
+        self._row = {drone_id: i for i, drone_id in enumerate(self.ids)}
+        self.radius_m = radius_m
+        self.period = 1.0 / rate_hz
+        self.stall_after_s = stall_after_s
+        self.progress_m = progress_m
+        self.report_every_s = report_every_s
+        self.on_arrived = on_arrived
+        self.on_stalled = on_stalled
+
+        n = len(self.agents)
+        self.target = np.full((n, 2), np.nan)
+        self.distance = np.full(n, np.inf)
+        self.eta = np.full(n, np.inf)
+        self.is_arrived = np.zeros(n, dtype=bool)
+        self.is_stalled = np.zeros(n, dtype=bool)
+        self._best = np.full(n, np.inf)       # closest distance so far
+        self._best_t = np.zeros(n)            # when that progress was made
+
+        # Smoothed closing speed (m/s toward the target) for the ETA
+        self.speed_window_s = speed_window_s
+        self.closing_speed = np.full(n, np.nan)
+        self._prev_d = np.full(n, np.nan)
+        self._prev_t = None
+
+        self.arrived = {drone_id: asyncio.Event() for drone_id in self.ids}
+        self.stalled = {drone_id: asyncio.Event() for drone_id in self.ids}
+        self._task = None
+        self._last_report = 0.0
+
+    # --- TARGETS ---
+    def set_target(self, drone_id, lat, lon):
+        """(Re)targets one drone; resets its arrived/stalled state."""
+        i = self._row[drone_id]
+        self.target[i] = (lat, lon)
+        self.is_arrived[i] = False
+        self.is_stalled[i] = False
+        self._best[i] = np.inf
+        self._best_t[i] = time.monotonic()
+        self._prev_d[i] = np.nan
+        self.closing_speed[i] = np.nan
+        self.arrived[drone_id].clear()
+        self.stalled[drone_id].clear()
+
+    def clear_target(self, drone_id):
+        i = self._row[drone_id]
+        self.target[i] = np.nan
+        self.is_arrived[i] = False
+        self.is_stalled[i] = False
+        self.arrived[drone_id].clear()
+        self.stalled[drone_id].clear()
+
+    # --- LIFECYCLE ---
+    def start(self):
+        """Starts the monitoring task (no-op if it is running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            self.tick()
+            await asyncio.sleep(self.period)
+
+    # --- ONE CHECK FOR THE WHOLE SWARM ---
+    def tick(self, now=None):
+        """Updates distances, ETAs and events for every drone at once."""
+        now = time.monotonic() if now is None else now
+        pos = np.full((len(self.agents), 2), np.nan)
+        for i, agent in enumerate(self.agents):
+            p = agent.telemetry.position
+            if p is not None:
+                pos[i] = (p.latitude_deg, p.longitude_deg)
+
+        active = ~np.isnan(self.target[:, 0]) & ~np.isnan(pos[:, 0])
+        dist = np.full(len(self.agents), np.inf)
+        if active.any():
+            dist[active] = distance_m(pos[active, 0], pos[active, 1],
+                                      self.target[active, 0], self.target[active, 1])
+        self.distance = dist
+
+        # Closing speed (exponentially smoothed over speed_window_s) -> ETA
+        dt = None if self._prev_t is None else now - self._prev_t
+        if dt:
+            with np.errstate(invalid="ignore"):
+                speed = (self._prev_d - dist) / dt
+            alpha = 1.0 - math.exp(-dt / self.speed_window_s)
+            fresh = np.isnan(self.closing_speed)
+            smoothed = np.where(fresh, speed, self.closing_speed + alpha * (speed - self.closing_speed))
+            self.closing_speed = np.where(active & np.isfinite(speed), smoothed, self.closing_speed)
+        self._prev_d = np.where(active, dist, np.nan)
+        self._prev_t = now
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.eta = np.where(self.closing_speed > 0.1, dist / self.closing_speed, np.inf)
+        self.eta[self.is_arrived] = 0.0
+
+        # Progress bookkeeping for stall detection
+        progressed = active & (dist < self._best - self.progress_m)
+        self._best[progressed] = dist[progressed]
+        self._best_t[progressed] = now
+
+        newly_arrived = active & ~self.is_arrived & (dist <= self.radius_m)
+        stalled_now = active & ~self.is_arrived & ~newly_arrived & (now - self._best_t > self.stall_after_s)
+        newly_stalled = stalled_now & ~self.is_stalled
+        recovered = self.is_stalled & ~stalled_now
+
+        self.is_arrived |= newly_arrived
+        self.is_stalled = stalled_now
+
+        for i in np.flatnonzero(newly_arrived):
+            agent = self.agents[i]
+            print(f"[Arrival] Drone {agent.id} arrived ({dist[i]:.1f} m from target)")
+            self.arrived[agent.id].set()
+            phases = getattr(agent, "phases", None)
+            if phases is not None:
+                phases.mark("transit")
+            if self.on_arrived is not None:
+                self.on_arrived(agent)
+        for i in np.flatnonzero(newly_stalled):
+            agent = self.agents[i]
+            print(f"[Arrival] Drone {agent.id} STALLED {dist[i]:.1f} m from target")
+            self.stalled[agent.id].set()
+            if self.on_stalled is not None:
+                self.on_stalled(agent)
+        for i in np.flatnonzero(recovered):
+            self.stalled[self.ids[i]].clear()
+
+        if self.report_every_s is not None and now - self._last_report >= self.report_every_s:
+            self._last_report = now
+            self._report()
+
+    def _report(self):
+        tracked = ~np.isnan(self.target[:, 0])
+        if not tracked.any():
+            return
+        moving = tracked & ~self.is_arrived & ~self.is_stalled
+        etas = self.eta[moving]
+        etas = etas[np.isfinite(etas)]
+        eta_text = f"{etas.max():.0f}s" if len(etas) else "unknown"
+        print(f"[Arrival] {int(self.is_arrived[tracked].sum())}/{int(tracked.sum())} arrived, "
+              f"{int(self.is_stalled.sum())} stalled, slowest ETA {eta_text}")
+
+    # --- WAITING / READING ---
+    async def wait_all(self, drone_ids=None, timeout=None):
+        """
+        Waits until every given drone (default: every drone with a target) has arrived.
+        Raises asyncio.TimeoutError after timeout seconds.
+        """
+        if drone_ids is None:
+            drone_ids = [self.ids[i] for i in np.flatnonzero(~np.isnan(self.target[:, 0]))]
+        events = [self.arrived[drone_id].wait() for drone_id in drone_ids]
+        await asyncio.wait_for(asyncio.gather(*events), timeout)
+
+    def pending(self):
+        """Ids of drones with a target that have not arrived yet."""
+        waiting = ~np.isnan(self.target[:, 0]) & ~self.is_arrived
+        return [self.ids[i] for i in np.flatnonzero(waiting)]
+
+    def status(self):
+        """Per-drone progress as plain dicts (for prints and the GCS)."""
+        result = []
+        for i, drone_id in enumerate(self.ids):
+            if np.isnan(self.target[i, 0]):
+                continue
+            result.append({
+                "id": drone_id,
+                "target": (float(self.target[i, 0]), float(self.target[i, 1])),
+                "distance_m": None if math.isinf(self.distance[i]) else round(float(self.distance[i]), 1),
+                "eta_s": None if math.isinf(self.eta[i]) else round(float(self.eta[i]), 1),
+                "arrived": bool(self.is_arrived[i]),
+                "stalled": bool(self.is_stalled[i]),
+            })
+        return result
@@ -1,5 +1,8 @@
+import argparse
 import asyncio
 
+import numpy as np
+
 import sys
 import os
 
@@ -12,16 +15,35 @@ parent_dir = os.path.dirname(current_dir)
 # 3. Add the parent folder to the system path
 sys.path.append(parent_dir)
 
-from drone_agent import DroneAgent  # Your drone class
+from swarm_roster import load_roster, build_swarm, connect_swarm  # Your drone roster
+from target_assignment import assign_swarm  # Who flies where
+from drone_agent import altitude_layer  # One cruise altitude per drone
+from arrival_monitor import ArrivalMonitor  # Arrived / stalled / ETA for the whole swarm
+from separation_monitor import SeparationMonitor  # Drone-to-drone distance check
+from phase_timing import PHASE_LOG, default_log_path  # Per-phase latency marks
+from loop_profiler import profiled  # Loop lag / task profiling (SWARM_PROFILE=1)
 from mission_manager import MissionManager # Your math brain
+from coverage_planner import build_mission_plan, upload_missions  # Sector sweeps
+from terrain import TerrainDatabase  # Ground height for the sweeps
+from plan_cache import PLAN_CACHE, plan_key  # Reuse plans of areas seen before
+
+ARRIVAL_TIMEOUT_S = 180
+MIN_SEPARATION_M = 5.0
+COVERAGE_TIMEOUT_S = 900
 
-async def run_sky_guards_mission():
+async def run_sky_guards_mission(sweep_spacing_m=None):
+    """
+    Args:
+        sweep_spacing_m (float): If set, every drone flies a lawnmower coverage of its
+            sector (passes this far apart, uploaded as one mission) instead of hovering
+            at the sector center.
+    """
     print("--- 🛡️ SKY GUARDS MISSION START 🛡️ ---")
 
     # 1. Setup the Mission Manager (The Brain)
     #    We set Home to KFUPM Stadium
     kfupm_home = (26.308079, 50.146278)
-    manager = MissionManager(kfupm_home[0], kfupm_home[1])
+    manager = MissionManager(kfupm_home[0], kfupm_home[1], cache=PLAN_CACHE)
 
     # 2. Define the Area to Protect (The User Input)
     #    In a real app, this comes from mouse clicks. 
@@ -33,51 +55,63 @@ async def run_sky_guards_mission():
         (26.308620, 50.145891)  # Top-Left   (North + ~100m)
     ]
 
-    # 3. Calculate Targets (The Math)
-    #    This now returns GPS coordinates thanks to your update
+    # 3. Initialize the Swarm (The Hardware)
+    print("\n[Swarm] Connecting to the Drones in the roster...")
+    swarm = build_swarm(load_roster())
+
+    # Connect to all of them at once (bounded, with a timeout per drone)
+    swarm, failed = await connect_swarm(swarm)
+    if not swarm:
+        print("[Swarm] No drones connected. Aborting mission.")
+        return
+
+    # Watch drone-to-drone separation for the whole flight
+    separation = SeparationMonitor(swarm, min_separation_m=MIN_SEPARATION_M)
+    separation.start()
+
+    # 4. Calculate Targets (The Math)
+    #    One equal-area sector per connected drone
     print("\n[Manager] Calculating Sector Targets...")
-    targets_gps = manager.process_area(area_polygon)
-    
-    # 4. Initialize the Swarm (The Hardware)
-    print("\n[Swarm] Connecting to 4 Drones...")
-    swarm = [
-        # Sector 1: Bottom-Left
-        DroneAgent(1, "udpin://127.0.0.1:14540", mavsdk_port=50051),
-        
-        # Sector 2: Bottom-Right
-        DroneAgent(2, "udpin://127.0.0.1:14541", mavsdk_port=50052),
-        
-        # Sector 3: Top-Right
-        DroneAgent(3, "udpin://127.0.0.1:14542", mavsdk_port=50053),
-        
-        # Sector 4: Top-Left
-        DroneAgent(4, "udpin://127.0.0.1:14543", mavsdk_port=50054)
-    ]
-        
-    # Connect to all 4 simultaneously
-    await asyncio.gather(*[d.connect() for d in swarm])
+    targets_gps = manager.process_area(area_polygon, n_sectors=len(swarm))
 
     # 5. EXECUTION: Assign Targets to Drones
     print("\n[Mission] Deploying Swarm to Protection Sectors...")
     
+    # Match drones to targets from where they are now, so nobody crosses the
+    # whole area and the slowest transit is as short as possible
+    pairs = assign_swarm(swarm, targets_gps, objective="max")
+
+    if sweep_spacing_m is not None:
+        await run_coverage(manager, pairs, sweep_spacing_m)
+        print("--- Returning to Base (Landing) ---")
+        await asyncio.gather(*[d.land() for d in swarm])
+        await separation.stop()
+        return
+
     tasks = []
-    
-    # Loop through our drones and assign each one a target
-    for i, drone in enumerate(swarm):
-        # Safety check: Do we have enough targets?
-        if i < len(targets_gps):
-            target_lat, target_lon = targets_gps[i]
-            
-            print(f" -> Assigning Drone {drone.id} to Sector {i+1}")
-            print(f"    Target: Lat {target_lat:.6f}, Lon {target_lon:.6f}")
-            
-            # Create a task for this drone to fly to that GPS spot
-            # We assume you added 'fly_to_gps' to DroneAgent!
-            tasks.append(drone.fly_to_gps(target_lat, target_lon, altitude=25))
-            
-    # Execute all flights simultaneously
+    for layer, (drone, j) in enumerate(pairs):
+        target_lat, target_lon = targets_gps[j]
+        print(f" -> Assigning Drone {drone.id} to Sector {j+1}")
+        print(f"    Target: Lat {target_lat:.6f}, Lon {target_lon:.6f}")
+
+        # Create a task for this drone to fly to that GPS spot. Every drone cruises
+        # on its own altitude layer, so the whole swarm can launch at once
+        tasks.append(drone.fly_to_gps(target_lat, target_lon, altitude=altitude_layer(layer, 25)))
+
+    # Execute all flights simultaneously (returns once every goto is issued)
     await asyncio.gather(*tasks)
-    
+
+    # 6. Track the whole swarm in one loop until every drone is on station
+    monitor = ArrivalMonitor(swarm, report_every_s=5)
+    for drone, j in pairs:
+        monitor.set_target(drone.id, *targets_gps[j])
+    monitor.start()
+    try:
+        await monitor.wait_all([drone.id for drone, _ in pairs], timeout=ARRIVAL_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        print(f"[Mission] Still not on station after {ARRIVAL_TIMEOUT_S}s: drones {monitor.pending()}")
+    await monitor.stop()
+
     print("\n--- Mission Accomplished: Drones are holding position ---")
     # Keep the script running so we can watch them hover
     await asyncio.sleep(20)
@@ -85,10 +119,53 @@ async def run_sky_guards_mission():
     # Optional: Land everyone at the end
     print("--- Returning to Base (Landing) ---")
     await asyncio.gather(*[d.land() for d in swarm])
+    await separation.stop()
+
+async def run_coverage(manager, pairs, spacing_m):
+    """Flies every drone over its whole sector: one bulk mission upload per drone, all at once."""
+    sweeps = manager.plan_sweeps(spacing_m)
+
+    # Hold each layer's height above the GROUND along the sweep (falls back to
+    # a flat altitude where there is no terrain tile)
+    #    (one batch lookup for every waypoint of every sector)
+    every = np.vstack([np.asarray(sweep).reshape(-1, 2) for sweep in sweeps])
+    home = (manager.home_lat, manager.home_lon)
+    terrain = TerrainDatabase()
+    # The flat fallback depends on which tiles exist: they are part of the key
+    key = plan_key("terrain", home=home, sweeps=manager.sweeps_key, tiles=terrain.tiles_version())
+    ground_offset = np.asarray(PLAN_CACHE.get_or_compute(
+        key, lambda: terrain.relative_altitudes(every[:, 0], every[:, 1], agl=0.0, home=home)))
+    starts = np.cumsum([0] + [len(sweep) for sweep in sweeps])
+    plans = []
+    for layer, (drone, j) in enumerate(pairs):
+        altitudes = ground_offset[starts[j]:starts[j + 1]] + altitude_layer(layer, 25)
+        plans.append((drone, build_mission_plan(sweeps[j], altitudes)))
+
+    # Upload every drone's complete sweep concurrently, before anyone takes off
+    uploaded = await upload_missions(plans)
+    layers = {drone.id: layer for layer, (drone, _) in enumerate(pairs)}
+
+    # Launch together, then wait for the last sweep to finish
+    started = await asyncio.gather(*[drone.fly_mission(altitude_layer(layers[drone.id], 25)) for drone in uploaded])
+    flying = [drone for drone, ok in zip(uploaded, started) if ok]
+    try:
+        await asyncio.wait_for(asyncio.gather(*[drone.wait_mission_finished() for drone in flying]),
+                               COVERAGE_TIMEOUT_S)
+        print("\n--- Coverage Complete: every sector swept ---")
+    except asyncio.TimeoutError:
+        print(f"[Mission] Coverage still running after {COVERAGE_TIMEOUT_S}s")
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send one drone to the center of every sector.")
+    parser.add_argument("--sweep-spacing", type=float, metavar="M",
+                        help="Sweep every sector with lawnmower passes M meters apart instead of hovering")
+    args = parser.parse_args()
 
-    asyncio.run(run_sky_guards_mission())
+    asyncio.run(profiled(run_sky_guards_mission(sweep_spacing_m=args.sweep_spacing)))
+    # Where the sortie time went (p50/p99 per phase), kept for comparing flights
+    PHASE_LOG.print_summary()
+    PHASE_LOG.export(default_log_path())
 
 
 
@@ -1,4 +1,4 @@
-import pymap3d as pm
+import numpy as np
 import sys
 import os
 
@@ -11,56 +11,92 @@ parent_dir = os.path.dirname(current_dir)
 # 3. Add the parent folder to the system path
 sys.path.append(parent_dir)
 
-from partition_func import get_ned_distance, get_sub_sector_centers
+from geodesy import local_frame
+from polygon_partition import partition_gps
+from coverage_planner import boustrophedon
+from plan_cache import plan_key, normalize_polygon
 
 class MissionManager:
-    def __init__(self, home_lat, home_lon, home_alt=0):
+    def __init__(self, home_lat, home_lon, home_alt=0, cache=None):
+        """
+        Args:
+            cache (PlanCache): Reuse sectors / sweeps computed before for the same
+                area, home and drone count (None = always compute).
+        """
         self.home_lat = home_lat
         self.home_lon = home_lon
         self.home_alt = home_alt
+        self.cache = cache
+        self.area_key = None  # plan_cache keys of the last process_area() / plan_sweeps() calls
+        self.sweeps_key = None
+        # ECEF origin + rotation matrix of Home, computed once for all conversions
+        self.frame = local_frame(home_lat, home_lon, home_alt)
         self.swarm_targets = [] 
+        self.swarm_sectors = []  # GPS outline of every sector, same order as swarm_targets
+        self.sector_outlines = []  # The same outlines in local meters (ENU from Home)
 
-    def process_area(self, corners_gps):
+    def process_area(self, corners_gps, n_sectors=4):
         """
-        1. Converts GPS Polygon -> Local Meters
-        2. Divides area into sectors
-        3. Converts Sector Centers -> Back to GPS for the drones
+        1. Converts the GPS Polygon (any simple polygon, >= 3 points) -> Local Meters
+        2. Divides it into n_sectors sectors of equal area
+        3. Converts Sector Centers (and outlines) -> Back to GPS for the drones
         """
         print(f"--- Processing Mission Area ---")
-        
-        # 1. Convert GPS Polygon corners to Local Meters (NED)
-        bl_lat, bl_lon = corners_gps[0]
-        tr_lat, tr_lon = corners_gps[2]
-        
-        x_min, y_min = get_ned_distance(bl_lat, bl_lon, 0, self.home_lat, self.home_lon, self.home_alt)
-        x_max, y_max = get_ned_distance(tr_lat, tr_lon, 0, self.home_lat, self.home_lon, self.home_alt)
-        
-        width_meters = y_max - y_min
-        height_meters = x_max - x_min
-        
-        print(f"Area Dimensions: {width_meters:.1f}m Wide x {height_meters:.1f}m High")
 
-        # 2. Partition Logic
-        local_centers = get_sub_sector_centers(width_meters, height_meters, n_rows=2, n_cols=2)
-        
-        # 3. Convert Centers BACK to GPS (The new part)
-        self.swarm_targets = []
-        for (cx, cy) in local_centers:
-            # Calculate absolute distance from Home
-            abs_n = x_min + cx 
-            abs_e = y_min + cy
-            
-            # Convert Cnters Meters -> Lat/Lon
-            t_lat, t_lon, t_alt = pm.ned2geodetic(
-                abs_n, abs_e, 0, # North, East, Down (0)
-                self.home_lat, self.home_lon, self.home_alt
-            )
-            
-            self.swarm_targets.append((t_lat, t_lon))
-            
+        home = (self.home_lat, self.home_lon)
+        self.area_key = plan_key("sectors", polygon=corners_gps, home=home, home_alt=self.home_alt,
+                                 drones=n_sectors)
+        if self.cache is not None:
+            plan = self.cache.get_or_compute(self.area_key, lambda: self._plan_sectors(corners_gps, n_sectors))
+        else:
+            plan = self._plan_sectors(corners_gps, n_sectors)
+        self.swarm_targets = [tuple(target) for target in plan["targets"]]
+        self.swarm_sectors = [[tuple(p) for p in outline] for outline in plan["sectors"]]
+        self.sector_outlines = [np.asarray(outline, dtype=float) for outline in plan["outlines"]]
+
         print("\n--- Mission Targets Calculated (GPS) ---")
         for i, (lat, lon) in enumerate(self.swarm_targets):
             print(f"Target {i+1}: Lat={lat:.6f}, Lon={lon:.6f}")
-            
+
         return self.swarm_targets
-    
+
+    def _plan_sectors(self, corners_gps, n_sectors):
+        """The actual partition (normalised polygon, so a cached plan matches its key exactly)."""
+        # Equal-area sectors (every drone gets the same amount of work), in Home's local frame
+        sectors = partition_gps(normalize_polygon(corners_gps), n_sectors, frame=self.frame)
+        print(f"Area: {sum(s['area'] for s in sectors):.0f} m^2 -> {len(sectors)} sectors "
+              f"of {sectors[0]['area']:.0f} m^2")
+        return {
+            "targets": [s["center"] for s in sectors],
+            "sectors": [s["outline"] for s in sectors],
+            "outlines": [s["local_outline"] for s in sectors],
+        }
+
+    def plan_sweeps(self, spacing_m=10.0):
+        """
+        Lawnmower coverage of every sector from the last process_area() call.
+
+        Returns:
+            list: one [(lat, lon), ...] waypoint list per sector (same order as swarm_targets).
+        """
+        self.sweeps_key = plan_key("sweeps", area=self.area_key, spacing_m=spacing_m)
+        if self.cache is not None and self.area_key is not None:
+            sweeps = self.cache.get_or_compute(self.sweeps_key, lambda: self._plan_sweeps(spacing_m))
+            return [[tuple(p) for p in sweep] for sweep in sweeps]
+        return self._plan_sweeps(spacing_m)
+
+    def _plan_sweeps(self, spacing_m):
+        sweeps = [boustrophedon(outline, spacing_m) for outline in self.sector_outlines]
+        if not sweeps:
+            return []
+
+        # Convert every waypoint of every sector in one call
+        every_xy = np.vstack(sweeps)
+        lat, lon, _ = self.frame.enu2geodetic(every_xy[:, 0], every_xy[:, 1], 0)
+        result = []
+        pos = 0
+        for sweep in sweeps:
+            result.append(list(zip(lat[pos:pos + len(sweep)].tolist(), lon[pos:pos + len(sweep)].tolist())))
+            pos += len(sweep)
+        print(f"[Manager] Coverage: {sum(len(s) for s in sweeps)} waypoints, {spacing_m:.0f}m passes")
+        return result
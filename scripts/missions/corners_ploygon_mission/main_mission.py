@@ -14,7 +14,16 @@ parent_dir = os.path.dirname(current_dir)
 # 3. Add the parent folder to the system path
 sys.path.append(parent_dir)
 
-from drone_agent import DroneAgent  # Your drone class
+from swarm_roster import load_roster, build_swarm, connect_swarm  # Your drone roster
+from target_assignment import assign_swarm  # Who flies where
+from drone_agent import altitude_layer  # One cruise altitude per drone
+from arrival_monitor import ArrivalMonitor  # Arrived / stalled / ETA for the whole swarm
+from separation_monitor import SeparationMonitor  # Drone-to-drone distance check
+from phase_timing import PHASE_LOG, default_log_path  # Per-phase latency marks
+from loop_profiler import profiled  # Loop lag / task profiling (SWARM_PROFILE=1)
+
+ARRIVAL_TIMEOUT_S = 180
+MIN_SEPARATION_M = 5.0
 
 
 ## --- MISSION FUN. --- ###
@@ -35,57 +44,71 @@ async def run_sky_guards_mission():
 
     
     # 3. Initialize the Swarm (The Hardware)
-    print("\n[Swarm] Connecting to 4 Drones...")
-    swarm = [
-        # Sector 1: Bottom-Left
-        DroneAgent(1, "udpin://127.0.0.1:14540", mavsdk_port=50051),
-        
-        # Sector 2: Bottom-Right
-        DroneAgent(2, "udpin://127.0.0.1:14541", mavsdk_port=50052),
-        
-        # Sector 3: Top-Right
-        DroneAgent(3, "udpin://127.0.0.1:14542", mavsdk_port=50053),
-        
-        # Sector 4: Top-Left
-        DroneAgent(4, "udpin://127.0.0.1:14543", mavsdk_port=50054)
-    ]
-        
+    print("\n[Swarm] Connecting to the Drones in the roster...")
+    swarm = build_swarm(load_roster())
 
-    # Connect to all 4 simultaneously
-    await asyncio.gather(*[d.connect() for d in swarm])
+    # Connect to all of them at once (bounded, with a timeout per drone)
+    swarm, failed = await connect_swarm(swarm)
+    if not swarm:
+        print("[Swarm] No drones connected. Aborting mission.")
+        return
+
+    # Watch drone-to-drone separation for the whole flight
+    separation = SeparationMonitor(swarm, min_separation_m=MIN_SEPARATION_M)
+    separation.start()
 
     # 4. EXECUTION: Assign Targets to Drones
     print("\n[Mission] Deploying Swarm to Protection Sectors...")
     
+    # Match drones to targets from where they are now, so nobody crosses the
+    # whole area and the slowest transit is as short as possible
+    pairs = assign_swarm(swarm, targets_gps, objective="max")
+    if len(swarm) > len(targets_gps):
+        idle = sorted(set(drone.id for drone in swarm) - set(drone.id for drone, _ in pairs))
+        print(f"[Mission] Only {len(targets_gps)} corners: drones {idle} stay on the ground")
+    flying = [drone for drone, _ in pairs]
+
     tasks = []
-    
-    # Loop through our drones and assign each one a target
-    for i, drone in enumerate(swarm):
-        # Safety check: Do we have enough targets?
-        if i < len(targets_gps):
-            target_lat, target_lon = targets_gps[i]
-            
-            print(f" -> Assigning Drone {drone.id} to Sector {i+1}")
-            print(f"    Target: Lat {target_lat:.6f}, Lon {target_lon:.6f}")
-            
-            # Create a task for this drone to fly to that GPS spot
-            # We assume you added 'fly_to_gps' to DroneAgent!
-            tasks.append(drone.fly_to_gps(target_lat, target_lon, altitude=25, yaw=0))
-            
-    # Execute all flights simultaneously
-    await asyncio.gather(*tasks)
-    
-    print("\n--- Mission Accomplished: Drones are holding position ---")
-    # Keep the script running so we can watch them hover
-    await asyncio.sleep(20)
-    
-    # Optional: Land everyone at the end
-    print("--- Returning to Base (Landing) ---")
-    await asyncio.gather(*[d.land() for d in swarm])
+    for layer, (drone, j) in enumerate(pairs):
+        target_lat, target_lon = targets_gps[j]
+        print(f" -> Assigning Drone {drone.id} to Sector {j+1}")
+        print(f"    Target: Lat {target_lat:.6f}, Lon {target_lon:.6f}")
+
+        # Create a task for this drone to fly to that GPS spot. Every drone cruises
+        # on its own altitude layer, so the whole swarm can launch at once
+        tasks.append(drone.fly_to_gps(target_lat, target_lon, altitude=altitude_layer(layer, 25), yaw=0))
+
+    try:
+        # Execute all flights simultaneously (returns once every goto is issued)
+        await asyncio.gather(*tasks)
+
+        # 5. Track the whole swarm in one loop until every drone is on station
+        monitor = ArrivalMonitor(swarm, report_every_s=5)
+        for drone, j in pairs:
+            monitor.set_target(drone.id, *targets_gps[j])
+        monitor.start()
+        try:
+            await monitor.wait_all([drone.id for drone in flying], timeout=ARRIVAL_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            print(f"[Mission] Still not on station after {ARRIVAL_TIMEOUT_S}s: drones {monitor.pending()}")
+        await monitor.stop()
+
+        print("\n--- Mission Accomplished: Drones are holding position ---")
+        # Keep the script running so we can watch them hover
+        await asyncio.sleep(20)
+
+        # Optional: Land everyone at the end
+        print("--- Returning to Base (Landing) ---")
+        await asyncio.gather(*[d.land() for d in flying])
+    finally:
+        await separation.stop()
 
 if __name__ == "__main__":
 
-    asyncio.run(run_sky_guards_mission())
+    asyncio.run(profiled(run_sky_guards_mission()))
+    # Where the sortie time went (p50/p99 per phase), kept for comparing flights
+    PHASE_LOG.print_summary()
+    PHASE_LOG.export(default_log_path())
 
 
 
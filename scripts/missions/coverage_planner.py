@@ -0,0 +1,135 @@
+"""
+Coverage sweeps ("lawnmower" / boustrophedon) for the mission sectors.
+
+Each sector outline is turned into back-and-forth passes along its long
+axis, `spacing_m` apart, and the whole list is sent to the drone as ONE
+MAVSDK mission upload instead of one goto_location round trip per point.
+Uploads for the whole swarm run concurrently:
+
+    plan = build_mission_plan(sweep_gps(outline, spacing_m=10), altitude=25)
+    uploaded = await upload_missions([(drone, plan), ...])
+"""
+import asyncio
+import math
+
+import numpy as np
+from mavsdk.mission import MissionItem, MissionPlan
+
+from geodesy import local_frame
+from polygon_partition import principal_angle
+
+
+def boustrophedon(polygon_xy, spacing_m, angle=None, margin_m=None):
+    """
+    Back-and-forth sweep waypoints over a polygon.
+
+    Args:
+        polygon_xy: (M, 2) vertices in local meters (x = East, y = North).
+        spacing_m (float): Distance between passes (sensor footprint width).
+        angle (float): Pass direction (rad from East); default: the polygon's long axis.
+        margin_m (float): Inset from the outline (default: spacing_m / 2).
+
+    Returns:
+        np.ndarray (K, 2): waypoints in flight order (start and end of every pass).
+    """
+    poly = np.asarray(polygon_xy, dtype=float).reshape(-1, 2)
+    if len(poly) > 1 and np.allclose(poly[0], poly[-1]):
+        poly = poly[:-1]
+    if len(poly) < 3:
+        raise ValueError("Need a polygon with at least 3 points")
+    if spacing_m <= 0:
+        raise ValueError("spacing_m must be > 0")
+    margin_m = spacing_m / 2 if margin_m is None else margin_m
+    angle = principal_angle(poly) if angle is None else angle
+
+    # 1. Rotate so the passes run along x
+    cos_a, sin_a = math.cos(angle), math.sin(angle)
+    to_local = np.array([[cos_a, sin_a], [-sin_a, cos_a]])
+    rot = poly @ to_local.T
+
+    # 2. One pass every spacing_m across y
+    y_min, y_max = rot[:, 1].min() + margin_m, rot[:, 1].max() - margin_m
+    if y_max <= y_min:
+        ys = np.array([0.5 * (rot[:, 1].min() + rot[:, 1].max())])
+    else:
+        n_passes = int(math.floor((y_max - y_min) / spacing_m)) + 1
+        ys = y_min + (y_max - y_min - (n_passes - 1) * spacing_m) / 2 + np.arange(n_passes) * spacing_m
+
+    # 3. Where every pass crosses every edge (passes x edges at once)
+    x1, y1 = rot[:, 0], rot[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    line = ys[:, None]
+    hits = ((y1 <= line) & (line < y2)) | ((y2 <= line) & (line < y1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xs = np.where(hits, x1 + (line - y1) * (x2 - x1) / (y2 - y1), np.nan)
+
+    has_hits = hits.any(axis=1)
+    ys, xs = ys[has_hits], xs[has_hits]
+    if not len(ys):
+        return np.zeros((0, 2))
+    start = np.nanmin(xs, axis=1) + margin_m
+    end = np.nanmax(xs, axis=1) - margin_m
+    short = start > end
+    start[short] = end[short] = 0.5 * (start[short] + end[short])  # narrower than 2 margins: one point
+
+    # 4. Alternate direction on every other pass, then rotate back
+    flip = np.arange(len(ys)) % 2 == 1
+    start, end = np.where(flip, end, start), np.where(flip, start, end)
+    waypoints = np.stack([np.column_stack([start, ys]), np.column_stack([end, ys])], axis=1).reshape(-1, 2)
+    keep = np.r_[True, np.abs(np.diff(waypoints, axis=0)).max(axis=1) > 1e-6]  # no repeated points
+    return waypoints[keep] @ to_local
+
+
+def sweep_gps(outline_gps, spacing_m, angle=None, margin_m=None):
+    """boustrophedon() for a [(lat, lon), ...] outline. Returns [(lat, lon), ...]."""
+    pts = np.asarray(outline_gps, dtype=float).reshape(-1, 2)
+    frame = local_frame(float(pts[0, 0]), float(pts[0, 1]), 0.0)
+    east, north, _ = frame.geodetic2enu(pts[:, 0], pts[:, 1], 0.0)
+    waypoints = boustrophedon(np.column_stack([east, north]), spacing_m, angle, margin_m)
+    if not len(waypoints):
+        return []
+    lat, lon, _ = frame.enu2geodetic(waypoints[:, 0], waypoints[:, 1], 0.0)
+    return list(zip(lat.tolist(), lon.tolist()))
+
+
+def build_mission_plan(waypoints_gps, altitude, speed_m_s=5.0, acceptance_radius_m=2.0):
+    """
+    MAVSDK MissionPlan for a waypoint list.
+
+    Args:
+        waypoints_gps: [(lat, lon), ...] in flight order.
+        altitude (float or sequence): Relative altitude (m) of every waypoint, or one
+            per waypoint (e.g. terrain.relative_altitudes() for terrain following).
+        speed_m_s (float): Cruise speed between waypoints.
+    """
+    nan = float("nan")
+    altitudes = np.broadcast_to(np.asarray(altitude, dtype=float), (len(waypoints_gps),))
+    items = [
+        MissionItem(lat, lon, float(alt), speed_m_s, True, nan, nan, MissionItem.CameraAction.NONE,
+                    nan, nan, acceptance_radius_m, nan, nan, MissionItem.VehicleAction.NONE)
+        for (lat, lon), alt in zip(waypoints_gps, altitudes)
+    ]
+    return MissionPlan(items)
+
+
+async def upload_missions(pairs, max_concurrent=8):
+    """
+    Uploads one mission per drone, all drones at once (bounded).
+
+    Args:
+        pairs: [(DroneAgent, MissionPlan), ...]
+
+    Returns:
+        list: the agents whose upload succeeded.
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def _upload(agent, plan):
+        async with semaphore:
+            return await agent.upload_mission(plan)
+
+    results = await asyncio.gather(*[_upload(agent, plan) for agent, plan in pairs])
+    uploaded = [agent for (agent, _), ok in zip(pairs, results) if ok]
+    print(f"[Coverage] Uploaded {len(uploaded)}/{len(pairs)} missions "
+          f"({sum(len(plan.mission_items) for _, plan in pairs)} waypoints)")
+    return uploaded
@@ -14,78 +14,140 @@ parent_dir = os.path.dirname(current_dir)
 # 3. Add the parent folder to the system path
 sys.path.append(parent_dir)
 
-from drone_agent import DroneAgent  # Your drone class
+from swarm_roster import load_roster, build_swarm, connect_swarm  # Your drone roster
+from target_assignment import assign_swarm  # Who flies where
+from drone_agent import altitude_layer  # One cruise altitude per drone
+from arrival_monitor import ArrivalMonitor  # Arrived / stalled / ETA for the whole swarm
+from phase_timing import PHASE_LOG, default_log_path  # Per-phase latency marks
+from loop_profiler import profiled  # Loop lag / task profiling (SWARM_PROFILE=1)
+from polygon_partition import partition_gps  # Equal-area sectors
+from coverage_planner import sweep_gps, build_mission_plan, upload_missions  # Sector sweeps
+from plan_cache import PLAN_CACHE, plan_key, normalize_polygon  # Reuse plans of areas seen before
+
+ARRIVAL_TIMEOUT_S = 180
+COVERAGE_TIMEOUT_S = 900
 
 
 ## --- MISSION FUN. --- ###
-async def run_sky_guards_mission(locations):
+async def run_sky_guards_mission(locations, swarm=None, monitor=None, sweep_spacing_m=None):
+    """
+    Args:
+        locations (list): The [Lat, Lon] points of the polygon drawn in the GCS (3 or more).
+        swarm (list): Already connected DroneAgents (e.g. kept alive by the GCS runtime).
+            If None, the roster is loaded and connected here.
+        monitor (ArrivalMonitor): Running monitor of that swarm (e.g. the GCS one, so
+            /status shows the progress). If None, one is created for this mission.
+        sweep_spacing_m (float): If set, every drone flies a lawnmower coverage of its
+            sector (passes this far apart, uploaded as one mission) instead of hovering
+            at the sector center.
+    """
     print("--- 🛡️ SKY GUARDS MISSION START 🛡️ ---")
 
     # 1. Setup the Mission Manager (The Brain)
     #    We set Home to KFUPM Stadium
     kfupm_home = (26.308079, 50.146278)
 
-    # 2. Define the Area to Protect (The User Input)
-    targets_gps = [
-        locations[0], # [Lat, Lon], # Bottom-Left (Home)
-        locations[1], # Bottom-Right 
-        locations[2], # Top-Right  
-        locations[3]  # Top-Left
-    ]
+    # 2. Initialize the Swarm (The Hardware), unless the caller already has it connected
+    if swarm is None:
+        print("\n[Swarm] Connecting to the Drones in the roster...")
+        swarm = build_swarm(load_roster())
 
-    
-    # 3. Initialize the Swarm (The Hardware)
-    print("\n[Swarm] Connecting to 4 Drones...")
-    swarm = [
-        # Sector 1: Bottom-Left
-        DroneAgent(1, "udpin://127.0.0.1:14540", mavsdk_port=50051),
-        
-        # Sector 2: Bottom-Right
-        DroneAgent(2, "udpin://127.0.0.1:14541", mavsdk_port=50052),
-        
-        # Sector 3: Top-Right
-        DroneAgent(3, "udpin://127.0.0.1:14542", mavsdk_port=50053),
-        
-        # Sector 4: Top-Left
-        DroneAgent(4, "udpin://127.0.0.1:14543", mavsdk_port=50054)
-    ]
-        
-
-    # Connect to all 4 simultaneously
-    await asyncio.gather(*[d.connect() for d in swarm])
+        # Connect to all of them at once (bounded, with a timeout per drone)
+        swarm, failed = await connect_swarm(swarm)
+    if not swarm:
+        print("[Swarm] No drones connected. Aborting mission.")
+        return
+
+    # 3. Split the drawn area into one equal-area sector per drone (The Math)
+    #    (the same area drawn again, from any corner, reuses the cached sectors)
+    key = plan_key("partition", polygon=locations, home=kfupm_home, drones=len(swarm))
+    sectors = PLAN_CACHE.get_or_compute(
+        key, lambda: partition_gps(normalize_polygon(locations), len(swarm), home=kfupm_home))
+    targets_gps = [sector["center"] for sector in sectors]
 
     # 4. EXECUTION: Assign Targets to Drones
     print("\n[Mission] Deploying Swarm to Protection Sectors...")
     
-    tasks = []
-    
-    # Loop through our drones and assign each one a target
-    for i, drone in enumerate(swarm):
-        # Safety check: Do we have enough targets?
-        if i < len(targets_gps):
-            target_lat, target_lon = targets_gps[i]
-            
-            print(f" -> Assigning Drone {drone.id} to Sector {i+1}")
-            print(f"    Target: Lat {target_lat:.6f}, Lon {target_lon:.6f}")
-            
-            # Create a task for this drone to fly to that GPS spot
-            # We assume you added 'fly_to_gps' to DroneAgent!
-            tasks.append(drone.fly_to_gps(target_lat, target_lon, altitude=25, yaw=0))
-            
-    # Execute all flights simultaneously
-    await asyncio.gather(*tasks)
-    
-    print("\n--- Mission Accomplished: Drones are holding position ---")
-    # Keep the script running so we can watch them hover
-    await asyncio.sleep(20)
-    
-    # Optional: Land everyone at the end
-    print("--- Returning to Base (Landing) ---")
-    await asyncio.gather(*[d.land() for d in swarm])
+    # Match drones to targets from where they are now, so nobody crosses the
+    # whole area and the slowest transit is as short as possible
+    pairs = assign_swarm(swarm, targets_gps, objective="max")
+
+    own_monitor = monitor is None
+    if own_monitor:
+        monitor = ArrivalMonitor(swarm, report_every_s=5)
+        monitor.start()
+    try:
+        if sweep_spacing_m is not None:
+            await run_coverage(sectors, pairs, sweep_spacing_m, key)
+        else:
+            tasks = []
+            for layer, (drone, j) in enumerate(pairs):
+                target_lat, target_lon = targets_gps[j]
+                print(f" -> Assigning Drone {drone.id} to Sector {j+1}")
+                print(f"    Target: Lat {target_lat:.6f}, Lon {target_lon:.6f}")
+
+                # Create a task for this drone to fly to that GPS spot. Every drone cruises
+                # on its own altitude layer, so the whole swarm can launch at once
+                tasks.append(drone.fly_to_gps(target_lat, target_lon, altitude=altitude_layer(layer, 25), yaw=0))
+
+            # Execute all flights simultaneously (returns once every goto is issued)
+            await asyncio.gather(*tasks)
+
+            # 5. Track the whole swarm in one loop until every drone is on station
+            for drone, j in pairs:
+                monitor.set_target(drone.id, *targets_gps[j])
+            try:
+                await monitor.wait_all([drone.id for drone, _ in pairs], timeout=ARRIVAL_TIMEOUT_S)
+            except asyncio.TimeoutError:
+                print(f"[Mission] Still not on station after {ARRIVAL_TIMEOUT_S}s: drones {monitor.pending()}")
+
+            print("\n--- Mission Accomplished: Drones are holding position ---")
+            # Keep the script running so we can watch them hover
+            await asyncio.sleep(20)
+
+        # Optional: Land everyone at the end
+        print("--- Returning to Base (Landing) ---")
+        for drone, _ in pairs:
+            monitor.clear_target(drone.id)
+        await asyncio.gather(*[d.land() for d in swarm])
+    except asyncio.CancelledError:
+        # Cancelled / preempted (GCS job queue): drop this mission's targets and leave
+        # the drones where they are, so the next mission re-tasks them from there
+        print("[Mission] Cancelled: drones keep their current position")
+        for drone, _ in pairs:
+            monitor.clear_target(drone.id)
+        raise
+    finally:
+        if own_monitor:
+            await monitor.stop()
+
+async def run_coverage(sectors, pairs, spacing_m, area_key):
+    """Flies every drone over its whole sector: one bulk mission upload per drone, all at once."""
+    key = plan_key("sweeps", area=area_key, spacing_m=spacing_m)
+    sweeps = PLAN_CACHE.get_or_compute(key, lambda: [sweep_gps(sector["outline"], spacing_m) for sector in sectors])
+
+    # Upload every drone's complete sweep concurrently, before anyone takes off
+    layers = {drone.id: layer for layer, (drone, _) in enumerate(pairs)}
+    plans = [(drone, build_mission_plan(sweeps[j], altitude_layer(layers[drone.id], 25)))
+             for drone, j in pairs if sweeps[j]]
+    uploaded = await upload_missions(plans)
+
+    # Launch together, then wait for the last sweep to finish
+    started = await asyncio.gather(*[drone.fly_mission(altitude_layer(layers[drone.id], 25)) for drone in uploaded])
+    flying = [drone for drone, ok in zip(uploaded, started) if ok]
+    try:
+        await asyncio.wait_for(asyncio.gather(*[drone.wait_mission_finished() for drone in flying]),
+                               COVERAGE_TIMEOUT_S)
+        print("\n--- Coverage Complete: every sector swept ---")
+    except asyncio.TimeoutError:
+        print(f"[Mission] Coverage still running after {COVERAGE_TIMEOUT_S}s")
 
 if __name__ == "__main__":
 
-    asyncio.run(run_sky_guards_mission())
+    asyncio.run(profiled(run_sky_guards_mission()))
+    # Where the sortie time went (p50/p99 per phase), kept for comparing flights
+    PHASE_LOG.print_summary()
+    PHASE_LOG.export(default_log_path())
 
 
 
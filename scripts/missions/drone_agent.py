@@ -1,40 +1,80 @@
 import asyncio
 from mavsdk import System
 from mavsdk.action import ActionError # Import this to catch errors
+from mavsdk.mission import MissionError
+from telemetry_hub import TelemetryHub
+from phase_timing import PhaseTimer
+
+# Pipelined launch: start the transit once the drone is this high (m, relative)
+SAFE_TRANSIT_ALT_M = 5.0
+# Vertical spacing between the cruise altitudes of drones launched together
+LAYER_SPACING_M = 3.0
+ARM_TIMEOUT_S = 10.0
+
+
+def altitude_layer(index, base_altitude, spacing=LAYER_SPACING_M):
+    """Cruise altitude of the index-th drone of a swarm launch (one layer per drone)."""
+    return base_altitude + index * spacing
+
 
 class DroneAgent:
-    def __init__(self, drone_id, address, mavsdk_port):
+    def __init__(self, drone_id, address, mavsdk_port, mavsdk_server_address=None):
         self.id = drone_id
         self.address = address
-        # Port for the MAVSDK server instance
-        self.drone = System(port=mavsdk_port)
+        # Port for the MAVSDK server instance. With an address, the agent attaches to a
+        # server that is already running (see server_pool) instead of starting its own
+        self.drone = System(mavsdk_server_address=mavsdk_server_address, port=mavsdk_port)
+        # One shared telemetry cache per drone (streams are opened once, in connect)
+        self.telemetry = TelemetryHub(self.drone, drone_id)
+        # Monotonic timestamps of every lifecycle phase (see phase_timing.PHASE_LOG)
+        self.phases = PhaseTimer(drone_id)
+        self._climb_watch = None
 
-    async def connect(self):
+    async def connect(self, wait_gps=True):
+        self._stop_climb_watch()  # (re)connect: a climb of the old link is not followed anymore
         print(f"[Drone {self.id}] Connecting to {self.address}...")
+        self.phases.begin("link")
         await self.drone.connect(system_address=self.address)
+        self.phases.mark("connect")
 
         print(f"[Drone {self.id}] Waiting for connection...")
         async for state in self.drone.core.connection_state():
             if state.is_connected:
+                self.phases.mark("heartbeat")
                 print(f"[Drone {self.id}] --- CONNECTED! ---")
                 break
         
+        # Subscribe to the telemetry streams once; every later wait reads from this cache
+        self.telemetry.start()
+
         # We wait for GPS here to ensure the drone knows where it is before we ask anything else
+        if not wait_gps:
+            return
         print(f"[Drone {self.id}] Waiting for GPS Lock...")
-        async for health in self.drone.telemetry.health():
-            if health.is_global_position_ok and health.is_home_position_ok:
-                print(f"[Drone {self.id}] GPS Locked.")
-                break
+        await self.telemetry.wait_for_gps()
+        self.phases.mark("gps_lock")
+        print(f"[Drone {self.id}] GPS Locked.")
+
+    async def arm_and_takeoff(self, target_altitude, wait_altitude=None):
+        """
+        Arms, takes off and waits for the climb.
 
-    async def arm_and_takeoff(self, target_altitude):
+        Args:
+            target_altitude (float): Takeoff altitude (m, relative to home).
+            wait_altitude (float): Return once this altitude is passed instead of
+                waiting for ~target_altitude (pipelined launch: transit starts while climbing).
+
+        Returns:
+            bool: False if arming or takeoff failed.
+        """
         # 1. CRITICAL: Wait until the drone says it is "Armable"
         #    (Prevents "ActionError: Failed" if Gyros are still calibrating)
+        self.phases.begin("sortie", restart=False)
+        self._stop_climb_watch()
         print(f"[Drone {self.id}] Waiting for system to be armable...")
-        async for health in self.drone.telemetry.health():
-            if health.is_armable:
-                print(f"[Drone {self.id}] System is ready to arm.")
-                break
-            await asyncio.sleep(1)
+        await self.telemetry.wait_until_armable()
+        self.phases.mark("armable")
+        print(f"[Drone {self.id}] System is ready to arm.")
 
         # 2. Arm
         print(f"[Drone {self.id}] Arming...")
@@ -42,10 +82,16 @@ class DroneAgent:
             await self.drone.action.arm()
         except ActionError as e:
             print(f"[Drone {self.id}] ARMING FAILED: {e}")
-            return
+            return False
+
+        # 3. Wait until the vehicle REPORTS armed (instead of a fixed spin-up sleep)
+        try:
+            await self.telemetry.wait_for_armed(True, timeout=ARM_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            print(f"[Drone {self.id}] ARMING FAILED: not armed after {ARM_TIMEOUT_S:.0f}s")
+            return False
+        self.phases.mark("armed")
 
-        await asyncio.sleep(2) # 3. Wait for motors to spin up (The "Lag" fix)
-        
         # 4. Takeoff
         print(f"[Drone {self.id}] Taking off to {target_altitude}m...")
         try:
@@ -53,37 +99,128 @@ class DroneAgent:
             await self.drone.action.takeoff()
         except ActionError as e:
             print(f"[Drone {self.id}] TAKEOFF FAILED: {e}")
+            return False
+        self.phases.mark("takeoff")
+
+        # 5. Monitor altitude (print progress every few seconds to reduce spam)
+        full_climb = target_altitude * 0.99
+        wait_altitude = full_climb if wait_altitude is None else min(wait_altitude, full_climb)
+        while True:
+            try:
+                await self.telemetry.wait_until_altitude(wait_altitude, timeout=3)
+                break
+            except asyncio.TimeoutError:
+                alt = self.telemetry.snapshot()["rel_alt"] or 0.0
+                print(f"[Drone {self.id}] Climbing... Alt: {alt:.1f}m")
+        if wait_altitude < full_climb:
+            print(f"[Drone {self.id}] Passed safe altitude ({wait_altitude:.1f}m), still climbing.")
+            # Still stamp "target_altitude" when the climb actually finishes
+            self._climb_watch = asyncio.ensure_future(self._mark_climbed(full_climb))
+        else:
+            self.phases.mark("target_altitude")
+            print(f"[Drone {self.id}] Reached Target Altitude!")
+        return True
+
+    async def _mark_climbed(self, altitude, timeout=120.0):
+        try:
+            await self.telemetry.wait_until_altitude(altitude, timeout=timeout)
+        except asyncio.TimeoutError:
             return
+        except RuntimeError as e:
+            print(f"[Drone {self.id}] Climb not followed to the end: {e}")
+            return
+        self.phases.mark("target_altitude")
+
+    def _stop_climb_watch(self):
+        """Cancels the background "target_altitude" watch of the last takeoff, if still running."""
+        watch, self._climb_watch = self._climb_watch, None
+        if watch is not None and not watch.done():
+            watch.cancel()
 
-        # 5. Monitor altitude
-        async for position in self.drone.telemetry.position():
-            alt = position.relative_altitude_m
-            
-            if int(alt) % 5 == 0:  # Print every 5 meters roughly to reduce spam
-                 print(f"[Drone {self.id}] Climbing... Alt: {alt:.1f}m")
-            
-            if alt >= target_altitude * 0.99:
-                print(f"[Drone {self.id}] Reached Target Altitude!")
-                break 
-            
     async def land(self):
+        self._stop_climb_watch()
+        if not self.telemetry.armed and not self.telemetry.in_air:
+            # Never took off (e.g. no target for it): nothing to land, and disarm() would fail
+            print(f"[Drone {self.id}] On the ground and disarmed, nothing to land.")
+            return
         print(f"[Drone {self.id}] Landing...")
         await self.drone.action.land()
-        async for in_air in self.drone.telemetry.in_air():
-            if not in_air:
-                print(f"[Drone {self.id}] -- Landed confirmed")
-                break
+        await self.telemetry.wait_for_in_air(False)
+        self.phases.mark("landed")
+        print(f"[Drone {self.id}] -- Landed confirmed")
         await self.drone.action.disarm()
+        self.phases.mark("disarmed")
+        self.phases.end("sortie")
         print(f"[Drone {self.id}] -- Disarmed")
 
-    async def fly_to_gps(self, lat, lon, altitude, yaw): 
-        """Commands the drone to fly to a specific GPS coordinate."""
-       
-        await self.arm_and_takeoff(altitude)  # This calls the robust arm_and_takeoff function defined above
-        
+    async def hold(self):
+        """Stops the drone where it is (e.g. its mission was cancelled)."""
+        try:
+            await self.drone.action.hold()
+        except ActionError as e:
+            print(f"[Drone {self.id}] HOLD FAILED: {e}")
+            return
+        print(f"[Drone {self.id}] Holding position.")
+
+    async def fly_to_gps(self, lat, lon, altitude, yaw=0, safe_altitude=SAFE_TRANSIT_ALT_M):
+        """
+        Commands the drone to fly to a specific GPS coordinate.
+
+        Args:
+            altitude (float): Cruise altitude, relative to home (m). Give every drone
+                of a swarm launch its own layer, see altitude_layer().
+            safe_altitude (float): Start the transit once this high (pipelined launch);
+                None waits for the full takeoff altitude first.
+        """
+        # Time-to-station is measured from here ("transit" is stamped on arrival)
+        self.phases.begin("sortie")
+
+        # Already flying (e.g. re-tasked by a new mission): go straight to the new target
+        if not self.telemetry.in_air:
+            if not await self.arm_and_takeoff(altitude, wait_altitude=safe_altitude):
+                return
+
         print(f"[Drone {self.id}] Moving to Lat:{lat:.6f}, Lon:{lon:.6f}...")
-        
+
+        # goto_location expects AMSL: add the relative cruise altitude to the home altitude
+        pos = self.telemetry.position
+        target_alt = altitude
+        if pos is not None:
+            target_alt = pos.absolute_altitude_m - pos.relative_altitude_m + altitude
+
         try:
-            await self.drone.action.goto_location(lat, lon, altitude, yaw) # yaw_deg=0 means face North
+            await self.drone.action.goto_location(lat, lon, target_alt, yaw) # yaw_deg=0 means face North
         except ActionError as e:
-            print(f"[Drone {self.id}] MOVE FAILED: {e}")
\ No newline at end of file
+            print(f"[Drone {self.id}] MOVE FAILED: {e}")
+
+    async def upload_mission(self, mission_plan):
+        """Uploads a whole waypoint mission in one go. Returns False on failure."""
+        try:
+            await self.drone.mission.set_return_to_launch_after_mission(False)
+            await self.drone.mission.upload_mission(mission_plan)
+        except MissionError as e:
+            print(f"[Drone {self.id}] MISSION UPLOAD FAILED: {e}")
+            return False
+        print(f"[Drone {self.id}] Mission uploaded ({len(mission_plan.mission_items)} waypoints).")
+        return True
+
+    async def fly_mission(self, altitude, safe_altitude=SAFE_TRANSIT_ALT_M):
+        """Takes off (if needed) and starts the uploaded mission. Returns False on failure."""
+        self.phases.begin("sortie")
+        if not self.telemetry.in_air:
+            if not await self.arm_and_takeoff(altitude, wait_altitude=safe_altitude):
+                return False
+        try:
+            await self.drone.mission.start_mission()
+        except MissionError as e:
+            print(f"[Drone {self.id}] MISSION START FAILED: {e}")
+            return False
+        print(f"[Drone {self.id}] Mission started.")
+        return True
+
+    async def wait_mission_finished(self):
+        """Waits until the last waypoint of the running mission is reached."""
+        async for progress in self.drone.mission.mission_progress():
+            if progress.total and progress.current >= progress.total:
+                break
+        print(f"[Drone {self.id}] Mission finished.")
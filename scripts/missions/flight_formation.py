@@ -1,5 +1,10 @@
 import asyncio
 from mavsdk import System
+from swarm_roster import generate_roster, build_swarm, connect_swarm
+
+# Formation layers: the last drone flies lowest, each one above it +20m (2 drones -> 50m / 30m)
+FORMATION_BASE_ALT = 30.0
+FORMATION_LAYER_M = 20.0
 
     
 
@@ -36,8 +41,11 @@ class DroneAgent:
 
         print(f"[Drone {self.id}] Arming...")
         await self.drone.action.arm()
-        
-        await asyncio.sleep(2)
+
+        # Take off as soon as the vehicle reports armed (no fixed spin-up sleep)
+        async for armed in self.drone.telemetry.armed():
+            if armed:
+                break
         
         print(f"[Drone {self.id}] Taking off to {target_altitude}m...")
         await self.drone.action.set_takeoff_altitude(target_altitude)
@@ -73,23 +81,20 @@ class DroneAgent:
         await self.drone.action.goto_location(lat, lon, altitude, 0)
 
 
-async def main():
+async def main(count=2):
     # 1. Define Swarm with UDP ports AND unique MAVSDK server ports
-    swarm = [
-        # Drone 1: Listens on UDP 14540, uses internal Server Port 50051
-        DroneAgent(drone_id=1, address="udpin://127.0.0.1:14540", mavsdk_port=50051),
-        
-        # Drone 2: Listens on UDP 14550, uses internal Server Port 50052 (NO CONFLICT!)
-        DroneAgent(drone_id=2, address="udpin://127.0.0.1:14550", mavsdk_port=50052)
-    ]
+    #    Drone i listens on UDP 14540+i and uses internal Server Port 50051+i (NO CONFLICT!)
+    swarm = build_swarm(generate_roster(count), agent_cls=DroneAgent)
     
     print("--- Swarm Connecting ---")
-    await asyncio.gather(*[agent.connect() for agent in swarm])
+    swarm, failed = await connect_swarm(swarm)
+    if not swarm:
+        return
     
     print("\n--- Starting Formation Takeoff ---")
     tasks = [
-        swarm[0].arm_and_takeoff(50.0),
-        swarm[1].arm_and_takeoff(30.0)
+        agent.arm_and_takeoff(FORMATION_BASE_ALT + FORMATION_LAYER_M * (len(swarm) - 1 - i))
+        for i, agent in enumerate(swarm)
     ]
     await asyncio.gather(*tasks)
     
@@ -97,11 +102,7 @@ async def main():
     await asyncio.sleep(10)
 
     print("\n--- Landing Swarm ---")
-    endTask = [
-        swarm[0].land(),
-        swarm[1].land()
-    ]
-    await asyncio.gather(*endTask)
+    await asyncio.gather(*[agent.land() for agent in swarm])
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+Opt-in profiling of the asyncio loop that runs the whole swarm.
+
+Every drone's coroutines share one loop, so one slow callback (a planner,
+a big print, a blocking call) delays telemetry and commands for ALL drones.
+LoopProfiler measures:
+    - loop lag: how late a periodic sleep wakes up (p50 / p99 / max)
+    - per-task wall and CPU time spent running on the loop, grouped by
+      coroutine (e.g. "DroneAgent.land", "TelemetryHub._follow")
+    - slow callbacks: any single step longer than slow_callback_s, printed
+      as it happens
+
+It is off unless SWARM_PROFILE=1 is set (or a LoopProfiler is started by
+hand), and adds one timer pair per loop callback while it runs:
+
+    SWARM_PROFILE=1 python scripts/missions/center_sector_mission/main_mession.py
+"""
+import asyncio
+import os
+import threading
+import time
+from asyncio import events
+from collections import deque
+
+import numpy as np
+
+PROFILE_ENV = "SWARM_PROFILE"
+
+# The one un-patched Handle._run (several profilers may come and go)
+_original_run = events.Handle._run
+_active = []
+
+
+def _profiled_run(handle):
+    if not _active:
+        return _original_run(handle)
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        return _original_run(handle)
+    finally:
+        wall = time.perf_counter() - wall
+        cpu = time.thread_time() - cpu
+        for profiler in _active:
+            if profiler.thread_id == threading.get_ident():
+                profiler._record(handle, wall, cpu)
+
+
+def _callback_name(handle):
+    """Coroutine qualname for task steps, callback repr for plain callbacks."""
+    owner = getattr(handle._callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        return getattr(coro, "__qualname__", None) or owner.get_name()
+    callback = handle._callback
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+def enabled():
+    return os.environ.get(PROFILE_ENV, "").lower() not in ("", "0", "false", "no")
+
+
+class LoopProfiler:
+    """Loop lag, per-coroutine time and slow-callback warnings for the running loop."""
+
+    def __init__(self, interval_s=0.05, slow_callback_s=0.1, report_every_s=30.0, max_samples=20000):
+        """
+        Args:
+            interval_s (float): How often the lag probe wakes up.
+            slow_callback_s (float): Warn about any single loop step longer than this.
+            report_every_s (float): Print a summary this often while running (None = only at the end).
+        """
+        self.interval_s = interval_s
+        self.slow_callback_s = slow_callback_s
+        self.report_every_s = report_every_s
+        self.lag = deque(maxlen=max_samples)  # seconds late per probe wake-up
+        self.tasks = {}                       # name -> [steps, wall_s, cpu_s, max_step_s]
+        self.slow = deque(maxlen=100)         # (monotonic, name, seconds)
+        self.thread_id = None
+        self.started = None
+        self._probe = None
+        self._reporter = None
+
+    # --- LIFECYCLE ---
+    def start(self):
+        """Starts profiling the running loop (call from inside it)."""
+        if self._probe is not None:
+            return
+        self.thread_id = threading.get_ident()
+        self.started = time.monotonic()
+        events.Handle._run = _profiled_run
+        _active.append(self)
+        self._probe = asyncio.ensure_future(self._probe_lag())
+        if self.report_every_s:
+            self._reporter = asyncio.ensure_future(self._report_periodically())
+
+    async def stop(self):
+        if self._probe is None:
+            return
+        for task in (self._probe, self._reporter):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*[t for t in (self._probe, self._reporter) if t is not None],
+                             return_exceptions=True)
+        self._probe = self._reporter = None
+        _active.remove(self)
+        if not _active:
+            events.Handle._run = _original_run
+
+    async def _probe_lag(self):
+        while True:
+            expected = time.perf_counter() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            self.lag.append(max(0.0, time.perf_counter() - expected))
+
+    async def _report_periodically(self):
+        while True:
+            await asyncio.sleep(self.report_every_s)
+            self.report(top=5)
+
+    def _record(self, handle, wall, cpu):
+        name = _callback_name(handle)
+        entry = self.tasks.get(name)
+        if entry is None:
+            entry = self.tasks[name] = [0, 0.0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += wall
+        entry[2] += cpu
+        if wall > entry[3]:
+            entry[3] = wall
+        if wall > self.slow_callback_s:
+            self.slow.append((time.monotonic(), name, wall))
+            print(f"[Profile] SLOW callback {name}: {wall * 1000:.0f} ms "
+                  f"({cpu * 1000:.0f} ms CPU) blocked the loop")
+
+    # --- READING ---
+    def summary(self, top=10):
+        """Plain dict for prints and the GCS /status."""
+        lag = np.array(self.lag) if self.lag else np.zeros(1)
+        busy = sorted(self.tasks.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "running_s": round(time.monotonic() - self.started, 1) if self.started else 0.0,
+            "lag_ms": {
+                "p50": round(float(np.percentile(lag, 50)) * 1000, 1),
+                "p99": round(float(np.percentile(lag, 99)) * 1000, 1),
+                "max": round(float(lag.max()) * 1000, 1),
+            },
+            "slow_callbacks": len(self.slow),
+            "tasks": [
+                {"name": name, "steps": steps, "wall_ms": round(wall * 1000, 1),
+                 "cpu_ms": round(cpu * 1000, 1), "max_step_ms": round(max_step * 1000, 1)}
+                for name, (steps, wall, cpu, max_step) in busy[:top]
+            ],
+        }
+
+    def report(self, top=10):
+        s = self.summary(top)
+        lag = s["lag_ms"]
+        print(f"[Profile] {s['running_s']:.0f}s: loop lag p50 {lag['p50']:.1f} ms, p99 {lag['p99']:.1f} ms, "
+              f"max {lag['max']:.1f} ms, {s['slow_callbacks']} slow callbacks")
+        for t in s["tasks"]:
+            print(f"[Profile]   {t['name']:40s} {t['steps']:7d} steps {t['wall_ms']:9.1f} ms wall "
+                  f"{t['cpu_ms']:9.1f} ms CPU  max {t['max_step_ms']:.1f} ms")
+
+
+async def profiled(coro, **kwargs):
+    """
+    Awaits coro, profiling the loop around it when SWARM_PROFILE is set
+    (prints the final report at the end):
+
+        asyncio.run(profiled(run_sky_guards_mission()))
+    """
+    if not enabled():
+        return await coro
+    profiler = LoopProfiler(**kwargs)
+    profiler.start()
+    try:
+        return await coro
+    finally:
+        await profiler.stop()
+        print("[Profile] --- Mission end ---")
+        profiler.report()
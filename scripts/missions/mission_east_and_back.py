@@ -1,21 +1,7 @@
 import asyncio
-import math
 from mavsdk import System
-
-# --- Simple helpers (kept minimal) ---
-R_EARTH_M = 6378137.0
-
-def meters_east_to_lon_delta_deg(east_m: float, lat_deg: float) -> float:
-    lat_rad = math.radians(lat_deg)
-    return (east_m / (R_EARTH_M * math.cos(lat_rad))) * (180.0 / math.pi)
-
-def distance_m(lat1, lon1, lat2, lon2) -> float:
-    # Haversine (small and sufficient)
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = phi2 - phi1
-    dl = math.radians(lon2 - lon1)
-    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dl / 2) ** 2
-    return R_EARTH_M * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+from geodesy import meters_east_to_lon_delta_deg
+from telemetry_hub import TelemetryHub
 
 
 async def run():
@@ -24,26 +10,28 @@ async def run():
     # Connect to SITL (your current setup: sim_vehicle ... --out=udp:127.0.0.1:14540)
     await drone.connect(system_address="udpin://127.0.0.1:14540")
 
+    # Open every telemetry stream once and reuse the cached values below
+    telemetry = TelemetryHub(drone)
+    telemetry.start()
+
     # Wait until we have global + home position (needed for goto_location reliability)
     print("Waiting for global position + home position...")
-    async for health in drone.telemetry.health():
-        if health.is_global_position_ok and health.is_home_position_ok:
-            print("-- Position OK")
-            break
+    await telemetry.wait_for_gps()
+    print("-- Position OK")
 
     # Read home position once
     print("Reading home (from current position)...")
-    async for pos in drone.telemetry.position():
-        home_lat = pos.latitude_deg
-        home_lon = pos.longitude_deg
-        home_abs_alt = pos.absolute_altitude_m
-        print(f"Home: {home_lat:.7f}, {home_lon:.7f}, abs_alt={home_abs_alt:.1f} m")
-        break
+    await telemetry.wait_for(lambda t: t.position is not None)
+    pos = telemetry.position
+    home_lat = pos.latitude_deg
+    home_lon = pos.longitude_deg
+    home_abs_alt = pos.absolute_altitude_m
+    print(f"Home: {home_lat:.7f}, {home_lon:.7f}, abs_alt={home_abs_alt:.1f} m")
 
     # Arm
     print("-- Arming")
     await drone.action.arm()
-    await asyncio.sleep(2)
+    await telemetry.wait_for_armed(True, timeout=10)
 
     # Takeoff
     takeoff_alt_rel = 5.0
@@ -51,8 +39,8 @@ async def run():
     await drone.action.set_takeoff_altitude(takeoff_alt_rel)
     await drone.action.takeoff()
 
-    # Wait a bit for climb (simple style)
-    await asyncio.sleep(8)
+    # Start the transit once a safe altitude is passed; goto_location finishes the climb
+    await telemetry.wait_until_altitude(takeoff_alt_rel * 0.8)
 
     # Go 100m East (same altitude, using absolute altitude for goto_location)
     east_m = 100.0
@@ -63,12 +51,9 @@ async def run():
     print("-- Going 100m East")
     await drone.action.goto_location(target_lat, target_lon, target_abs_alt, yaw_deg=0.0)
 
-    # Wait until close to target (simple loop, no extra structure)
-    async for pos in drone.telemetry.position():
-        d = distance_m(pos.latitude_deg, pos.longitude_deg, target_lat, target_lon)
-        if d <= 3.0:
-            print(f"-- Reached East point (error {d:.2f} m)")
-            break
+    # Wait until close to target
+    await telemetry.wait_until_near(target_lat, target_lon, radius_m=3.0)
+    print(f"-- Reached East point (error {telemetry.distance_to(target_lat, target_lon):.2f} m)")
 
     await asyncio.sleep(3)
 
@@ -76,11 +61,8 @@ async def run():
     print("-- Returning Home")
     await drone.action.goto_location(home_lat, home_lon, target_abs_alt, yaw_deg=0.0)
 
-    async for pos in drone.telemetry.position():
-        d = distance_m(pos.latitude_deg, pos.longitude_deg, home_lat, home_lon)
-        if d <= 3.0:
-            print(f"-- Reached Home (error {d:.2f} m)")
-            break
+    await telemetry.wait_until_near(home_lat, home_lon, radius_m=3.0)
+    print(f"-- Reached Home (error {telemetry.distance_to(home_lat, home_lon):.2f} m)")
 
     await asyncio.sleep(2)
 
@@ -89,14 +71,13 @@ async def run():
     await drone.action.land()
 
     # Wait until landed
-    async for in_air in drone.telemetry.in_air():
-        if not in_air:
-            print("-- Landed confirmed")
-            break
+    await telemetry.wait_for_in_air(False)
+    print("-- Landed confirmed")
 
     # Disarm
     print("-- Disarming")
     await drone.action.disarm()
+    await telemetry.stop()
 
 
 if __name__ == "__main__":
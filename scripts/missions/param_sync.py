@@ -0,0 +1,276 @@
+"""
+Delta-only parameter sync for the whole swarm.
+
+Loads a baseline .parm file (same "NAME   value" format as mav.parm), fetches
+every drone's parameters concurrently, and pushes ONLY the values that
+differ. What each vehicle was left with is kept in a local content-hashed
+cache, so a vehicle that already matches the baseline is skipped without
+fetching its parameters. Snapshots are keyed by what the vehicle reports
+(board UID, firmware, SYSID_THISMAV), not just its port, so another airframe
+attached to the same port is always fetched:
+
+    python scripts/missions/param_sync.py mav.parm              # sync the roster
+    python scripts/missions/param_sync.py mav.parm --dry-run    # only show the deltas
+    python scripts/missions/param_sync.py mav.parm --force      # ignore the cache
+
+The cache only knows what THIS tool pushed: use --force after changing
+parameters some other way (e.g. from QGroundControl).
+"""
+import argparse
+import asyncio
+import fnmatch
+import hashlib
+import json
+import os
+import time
+
+from mavsdk.info import InfoError
+from mavsdk.param import ParamError
+
+from swarm_roster import load_roster, build_swarm, connect_swarm
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(current_dir)), ".param_cache")
+
+# Per-vehicle identity, calibration and runtime state: never copied from a baseline
+DEFAULT_EXCLUDE = (
+    "SYSID_THISMAV", "MAV_SYSID", "STAT_*", "FORMAT_VERSION", "MIS_TOTAL",
+    "BARO*_GND_PRESS", "COMPASS_DEC", "INS_ACC*_CALTEMP", "INS_GYR*_CALTEMP",
+    "*_DEVID", "*_DEV_ID*", "INS_ACC*_ID", "INS_GYR*_ID", "COMPASS_PRIO*_ID",
+    "INS_ACC*OFFS_*", "INS_ACC*SCAL_*", "INS_GYR*OFFS_*", "COMPASS_OFS*", "COMPASS_DIA*", "COMPASS_ODI*",
+)
+
+# .parm files keep 6 decimals and the vehicle stores float32
+REL_TOLERANCE = 1e-6
+
+
+def load_parm(path):
+    """Reads a .parm file into {name: float}. Blank lines and '#' comments are skipped."""
+    params = {}
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = line.replace(",", " ").split()
+            if len(parts) != 2:
+                raise ValueError(f"{path}:{line_no}: expected 'NAME value', got {line!r}")
+            params[parts[0]] = float(parts[1])
+    return params
+
+
+def save_parm(params, path):
+    with open(path, "w") as f:
+        for name in sorted(params):
+            value = params[name]
+            text = f"{int(value)}" if float(value).is_integer() else f"{value:.6f}"
+            f.write(f"{name:<16} {text}\n")
+
+
+def params_hash(params):
+    """Content hash of a parameter set (order-independent, .parm precision)."""
+    digest = hashlib.sha256()
+    for name in sorted(params):
+        digest.update(f"{name}={params[name]:.6g}\n".encode())
+    return digest.hexdigest()
+
+
+def is_excluded(name, exclude=DEFAULT_EXCLUDE):
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in exclude)
+
+
+def same_value(a, b):
+    return abs(a - b) <= REL_TOLERANCE * max(1.0, abs(a), abs(b))
+
+
+def diff_params(baseline, current, exclude=DEFAULT_EXCLUDE):
+    """
+    Compares a vehicle's parameters with the baseline.
+
+    Returns:
+        (changes, missing): {name: baseline value} for every differing parameter,
+        and the baseline names the vehicle does not have (e.g. other firmware).
+    """
+    changes, missing = {}, []
+    for name, value in baseline.items():
+        if is_excluded(name, exclude):
+            continue
+        if name not in current:
+            missing.append(name)
+        elif not same_value(current[name], value):
+            changes[name] = value
+    return changes, missing
+
+
+class ParamCache:
+    """
+    Content-addressed snapshots (<hash>.parm) plus an index of which snapshot
+    each vehicle was last left with.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        try:
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def snapshot_hash(self, vehicle_key):
+        entry = self.index.get(vehicle_key)
+        return entry["hash"] if entry else None
+
+    def load_snapshot(self, vehicle_key):
+        digest = self.snapshot_hash(vehicle_key)
+        path = os.path.join(self.cache_dir, f"{digest}.parm")
+        if digest is None or not os.path.exists(path):
+            return None
+        return load_parm(path)
+
+    def store(self, vehicle_key, params):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        digest = params_hash(params)
+        path = os.path.join(self.cache_dir, f"{digest}.parm")
+        if not os.path.exists(path):
+            save_parm(params, path)
+        self.index[vehicle_key] = {"hash": digest, "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        with open(self.index_path, "w") as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+        return digest
+
+
+# --- VEHICLE SIDE ---
+async def fetch_params(agent):
+    """All parameters of one drone as ({name: value}, {name: 'int' or 'float'})."""
+    all_params = await agent.drone.param.get_all_params()
+    values, types = {}, {}
+    for p in all_params.int_params:
+        values[p.name], types[p.name] = float(p.value), "int"
+    for p in all_params.float_params:
+        values[p.name], types[p.name] = float(p.value), "float"
+    return values, types
+
+
+async def push_params(agent, changes, types):
+    """Sets only the changed parameters. Returns the names that failed."""
+    failed = []
+    for name, value in changes.items():
+        try:
+            if types.get(name) == "int":
+                await agent.drone.param.set_param_int(name, int(round(value)))
+            else:
+                await agent.drone.param.set_param_float(name, float(value))
+        except ParamError as e:
+            print(f"[Params] Drone {agent.id}: {name} FAILED: {e}")
+            failed.append(name)
+    return failed
+
+
+async def vehicle_identity(agent):
+    """Board UID + firmware (AUTOPILOT_VERSION) and SYSID_THISMAV of the vehicle behind the port."""
+    parts = []
+    try:
+        identification = await agent.drone.info.get_identification()
+        version = await agent.drone.info.get_version()
+        parts += [identification.hardware_uid, identification.legacy_uid,
+                  version.flight_sw_git_hash, version.flight_sw_major, version.flight_sw_minor,
+                  version.flight_sw_patch]
+    except InfoError:
+        parts += [None] * 6
+    try:
+        parts.append(await agent.drone.param.get_param_int("SYSID_THISMAV"))
+    except ParamError:
+        try:
+            parts.append(int(await agent.drone.param.get_param_float("SYSID_THISMAV")))
+        except ParamError:
+            parts.append(None)
+    return parts
+
+
+def vehicle_key(agent, identity):
+    digest = hashlib.sha256(json.dumps(identity, default=str).encode()).hexdigest()[:16]
+    return f"{agent.id}@{agent.address}#{digest}"
+
+
+async def sync_vehicle(agent, baseline, cache, exclude=DEFAULT_EXCLUDE, dry_run=False, force=False):
+    """
+    Brings one drone to the baseline. Returns a summary dict.
+    """
+    key = vehicle_key(agent, await vehicle_identity(agent))
+    cached = None if force else cache.load_snapshot(key)
+    if cached is not None:
+        changes, _ = diff_params(baseline, cached, exclude)
+        if not changes:
+            return {"id": agent.id, "status": "skipped (cache)", "changed": 0}
+
+    started = time.monotonic()
+    current, types = await fetch_params(agent)
+    changes, missing = diff_params(baseline, current, exclude)
+    fetch_s = time.monotonic() - started
+
+    if dry_run:
+        for name, value in sorted(changes.items()):
+            print(f"[Params] Drone {agent.id}: {name} {current[name]:g} -> {value:g}")
+        return {"id": agent.id, "status": "dry run", "changed": len(changes), "missing": len(missing)}
+
+    failed = await push_params(agent, changes, types) if changes else []
+    for name, value in changes.items():
+        if name not in failed:
+            current[name] = value
+    cache.store(key, current)
+    return {
+        "id": agent.id,
+        "status": "ok" if not failed else f"{len(failed)} failed",
+        "changed": len(changes) - len(failed),
+        "missing": len(missing),
+        "fetch_s": round(fetch_s, 2),
+        "total_s": round(time.monotonic() - started, 2),
+    }
+
+
+async def sync_swarm(swarm, baseline, cache, max_concurrent=8, **kwargs):
+    """Runs sync_vehicle for every connected drone concurrently (bounded)."""
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def _sync(agent):
+        async with semaphore:
+            try:
+                return await sync_vehicle(agent, baseline, cache, **kwargs)
+            except ParamError as e:
+                return {"id": agent.id, "status": f"ParamError: {e}", "changed": 0}
+
+    return await asyncio.gather(*[_sync(agent) for agent in swarm])
+
+
+async def main(args):
+    baseline = load_parm(args.baseline)
+    exclude = DEFAULT_EXCLUDE + tuple(args.exclude or ())
+    print(f"[Params] Baseline {args.baseline}: {len(baseline)} parameters "
+          f"(hash {params_hash(baseline)[:12]})")
+
+    cache = ParamCache(args.cache_dir)
+    swarm = build_swarm(load_roster(args.roster, count=args.count))
+    swarm, failed = await connect_swarm(swarm, wait_gps=False)
+
+    started = time.monotonic()
+    results = await sync_swarm(swarm, baseline, cache, exclude=exclude, dry_run=args.dry_run, force=args.force)
+    for r in results:
+        extra = f", {r['missing']} not on vehicle" if r.get("missing") else ""
+        print(f"[Params] Drone {r['id']}: {r['status']}, {r['changed']} changed{extra}")
+    print(f"[Params] {len(results)} drones in {time.monotonic() - started:.1f}s")
+
+    for agent in swarm:
+        await agent.telemetry.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Push only the parameter deltas to every drone.")
+    parser.add_argument("baseline", help="Baseline .parm file (e.g. mav.parm)")
+    parser.add_argument("--roster", help="Roster JSON (default: swarm_roster.json / $SWARM_ROSTER)")
+    parser.add_argument("--count", type=int, help="Only the first COUNT drones of the roster")
+    parser.add_argument("--dry-run", action="store_true", help="Fetch and print the deltas, push nothing")
+    parser.add_argument("--force", action="store_true", help="Fetch every drone even if the cache says it matches")
+    parser.add_argument("--exclude", action="append", help="Extra parameter name pattern to leave alone")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    asyncio.run(main(parser.parse_args()))
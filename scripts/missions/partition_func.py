@@ -1,4 +1,4 @@
-import pymap3d as pm
+from geodesy import local_frame
 
 
 def get_sub_sector_centers(area_width=100, area_height=100, n_rows=2, n_cols=2):
@@ -54,6 +54,7 @@ def get_ned_distance(target_lat, target_lon, target_alt, origin_lat, origin_lon,
     
     Args:
         target_lat, target_lon, target_alt: Coordinates of the point you want to measure.
+            Scalars, or NumPy arrays to convert many points in one call.
         origin_lat, origin_lon, origin_alt: Coordinates of your 'Home' (0,0,0).
         
     Returns:
@@ -61,12 +62,10 @@ def get_ned_distance(target_lat, target_lon, target_alt, origin_lat, origin_lon,
         east_m: Distance East in meters (Y axis).
     """
     
-    # geodetic2ned converts Geodetic (lat/lon/alt) to North-East-Down (meters)
-    # Observer/Origin is the second set of arguments
-    north_m, east_m, down_m = pm.geodetic2ned(
-        target_lat, target_lon, target_alt,
-        origin_lat, origin_lon, origin_alt
-    )
+    # The local frame (ECEF origin + rotation) is cached per Home,
+    # so only the target points are converted here
+    frame = local_frame(origin_lat, origin_lon, origin_alt)
+    north_m, east_m, down_m = frame.geodetic2ned(target_lat, target_lon, target_alt)
     
     return north_m, east_m
 
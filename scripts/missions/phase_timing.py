@@ -0,0 +1,177 @@
+"""
+Per-phase latency marks for the DroneAgent lifecycle.
+
+Every DroneAgent owns a PhaseTimer that stamps time.monotonic() when a
+phase completes. The stamps of the whole swarm go into one in-memory ring
+buffer (PHASE_LOG), so a mark costs one clock read and one deque append:
+
+    link:   connect -> heartbeat -> gps_lock           (from connect())
+    sortie: armable -> armed -> takeoff -> target_altitude
+            -> transit (on station) -> landed -> disarmed
+
+Each record keeps the time since its segment started ("elapsed", e.g.
+time-to-armable, time-to-station) and since the previous mark ("step").
+Export after a flight, then summarise many flights at once:
+
+    PHASE_LOG.export(default_log_path())
+    python scripts/missions/phase_timing.py .phase_logs/*.csv
+"""
+import argparse
+import csv
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(current_dir)), ".phase_logs")
+
+LINK_PHASES = ("connect", "heartbeat", "gps_lock")
+SORTIE_PHASES = ("armable", "armed", "takeoff", "target_altitude", "transit", "landed", "disarmed")
+PHASES = LINK_PHASES + SORTIE_PHASES
+
+FIELDS = ("drone", "sortie", "phase", "t", "elapsed_s", "step_s")
+
+
+def default_log_path():
+    return os.path.join(DEFAULT_LOG_DIR, time.strftime("phases_%Y%m%d_%H%M%S.csv"))
+
+
+class PhaseLog:
+    """Ring buffer of phase marks for a whole swarm, with percentile summaries."""
+
+    def __init__(self, maxlen=50000):
+        # (drone, sortie, phase, t, elapsed_s, step_s)
+        self.records = deque(maxlen=maxlen)
+
+    def add(self, drone_id, sortie, phase, t, elapsed_s, step_s):
+        self.records.append((drone_id, sortie, phase, t, elapsed_s, step_s))
+
+    def clear(self):
+        self.records.clear()
+
+    def samples(self, phase, kind="elapsed"):
+        """All durations (s) recorded for one phase: kind is "elapsed" or "step"."""
+        column = 4 if kind == "elapsed" else 5
+        return np.array([r[column] for r in self.records if r[2] == phase], dtype=float)
+
+    def summary(self, kind="elapsed", percentiles=(50, 90, 99)):
+        """{phase: {"count", "p50", "p90", "p99", "max"}} across every drone and sortie."""
+        result = {}
+        for phase in PHASES:
+            values = self.samples(phase, kind)
+            if not len(values):
+                continue
+            stats = {"count": len(values)}
+            for p, v in zip(percentiles, np.percentile(values, percentiles)):
+                stats[f"p{p}"] = round(float(v), 3)
+            stats["max"] = round(float(values.max()), 3)
+            result[phase] = stats
+        return result
+
+    def histogram(self, phase, bins=10, kind="elapsed"):
+        """(counts, bin edges in s) of one phase's durations."""
+        return np.histogram(self.samples(phase, kind), bins=bins)
+
+    def print_summary(self):
+        elapsed, step = self.summary("elapsed"), self.summary("step")
+        if not elapsed:
+            print("[Phases] No phase marks recorded.")
+            return
+        print(f"[Phases] {'phase':16s} {'n':>5s} {'since start p50/p99':>22s} {'step p50/p99':>18s}")
+        for phase, e in elapsed.items():
+            s = step[phase]
+            print(f"[Phases] {phase:16s} {e['count']:5d} {e['p50']:10.2f}s /{e['p99']:8.2f}s "
+                  f"{s['p50']:8.2f}s /{s['p99']:7.2f}s")
+
+    # --- FILES ---
+    def export(self, path, since=None, skip_empty=False):
+        """
+        Writes the buffered records as CSV. Returns the path.
+
+        Args:
+            since (float): Only records stamped after this time.monotonic() value
+                (e.g. one file per mission from a long-lived process).
+            skip_empty (bool): Write nothing (and return None) when there are no records.
+        """
+        records = [r for r in self.records if since is None or r[3] > since]
+        if skip_empty and not records:
+            print("[Phases] No marks to write")
+            return None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            for drone_id, sortie, phase, t, elapsed_s, step_s in records:
+                writer.writerow((drone_id, sortie, phase, f"{t:.6f}", f"{elapsed_s:.6f}", f"{step_s:.6f}"))
+        print(f"[Phases] {len(records)} marks written to {path}")
+        return path
+
+    @classmethod
+    def load(cls, paths, maxlen=None):
+        """Merges exported CSV files (e.g. many flights) into one log."""
+        log = cls(maxlen=maxlen)
+        for path in paths:
+            with open(path, newline="") as f:
+                for row in csv.DictReader(f):
+                    log.add(row["drone"], int(row["sortie"]), row["phase"], float(row["t"]),
+                            float(row["elapsed_s"]), float(row["step_s"]))
+        return log
+
+
+# Shared by every DroneAgent in the process
+PHASE_LOG = PhaseLog()
+
+
+class PhaseTimer:
+    """Phase marks of one drone. A segment ("link" / "sortie") starts with begin()."""
+
+    def __init__(self, drone_id, log=PHASE_LOG):
+        self.id = drone_id
+        self.log = log
+        self.sortie = 0
+        self._start = {}  # segment -> monotonic start
+        self._last = {}   # segment -> monotonic time of the previous mark
+
+    def begin(self, segment, restart=True):
+        """
+        Starts timing a segment. restart=False keeps a segment that is already
+        running (e.g. arm_and_takeoff() inside fly_to_gps()).
+        """
+        if not restart and segment in self._start:
+            return
+        if segment == "sortie":
+            self.sortie += 1
+        self._start[segment] = self._last[segment] = time.monotonic()
+
+    def end(self, segment):
+        self._start.pop(segment, None)
+        self._last.pop(segment, None)
+
+    def mark(self, phase):
+        """Records that `phase` just completed."""
+        now = time.monotonic()
+        segment = "link" if phase in LINK_PHASES else "sortie"
+        if segment not in self._start:
+            self.begin(segment)
+        self.log.add(self.id, self.sortie if segment == "sortie" else 0, phase, now,
+                     now - self._start[segment], now - self._last[segment])
+        self._last[segment] = now
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="p50/p99 of every lifecycle phase over exported flights.")
+    parser.add_argument("files", nargs="+", help="CSV files written by PhaseLog.export()")
+    parser.add_argument("--histogram", choices=PHASES, help="Also print a histogram of this phase")
+    parser.add_argument("--bins", type=int, default=10)
+    args = parser.parse_args()
+
+    merged = PhaseLog.load(args.files)
+    print(f"[Phases] {len(merged.records)} marks from {len(args.files)} file(s)")
+    merged.print_summary()
+    if args.histogram:
+        counts, edges = merged.histogram(args.histogram, bins=args.bins)
+        width = max(1, int(counts.max())) if len(counts) else 1
+        for count, lo, hi in zip(counts, edges[:-1], edges[1:]):
+            print(f"[Phases] {lo:8.2f}-{hi:8.2f}s {count:5d} {'#' * int(40 * count / width)}")
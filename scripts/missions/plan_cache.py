@@ -0,0 +1,188 @@
+"""
+Memoized mission plans.
+
+Operators re-deploy the same protected areas over and over, so a computed
+plan (sectors, targets, sweeps, terrain offsets) is cached under a key made
+from everything it depends on: the normalised polygon, home, drone count
+and planner settings. The same area drawn from another corner or the other
+way round gives the same key. Plans live in an in-memory LRU and, by
+default, also as JSON files in .plan_cache/ so they survive a GCS restart:
+
+    key = plan_key("partition", polygon=locations, home=home, drones=len(swarm))
+    sectors = PLAN_CACHE.get_or_compute(key, lambda: partition_gps(locations, len(swarm), home))
+
+Cached plans are plain JSON data (tuples come back as lists) and shared
+between callers: treat them as read-only.
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.environ.get(
+    "PLAN_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(current_dir)), ".plan_cache"))
+
+# Bump when a planner changes its output, so old plans are not reused
+PLAN_CACHE_VERSION = 2
+
+# 1e-7 deg is ~1 cm: GCS clicks that land on the same spot give the same key
+COORD_DECIMALS = 7
+
+
+def normalize_polygon(polygon_gps, decimals=COORD_DECIMALS):
+    """
+    Canonical form of a [(lat, lon), ...] polygon: rounded, no closing vertex,
+    counter-clockwise, starting at its smallest vertex.
+    """
+    import numpy as np  # only here: reading cache stats must not load NumPy (GCS web thread)
+
+    pts = np.round(np.asarray(polygon_gps, dtype=float).reshape(-1, 2), decimals)
+    if len(pts) > 1 and np.array_equal(pts[0], pts[-1]):
+        pts = pts[:-1]
+    lat, lon = pts[:, 0], pts[:, 1]
+    signed_area = np.sum(lon * np.roll(lat, -1) - np.roll(lon, -1) * lat)  # x = lon, y = lat
+    if signed_area < 0:
+        pts = pts[::-1]
+    start = np.lexsort((pts[:, 1], pts[:, 0]))[0]
+    return [tuple(p) for p in np.roll(pts, -start, axis=0).tolist()]
+
+
+def _canonical(value):
+    """JSON-ready copy of a plan or key part (arrays -> lists, floats rounded for keys)."""
+    np = sys.modules.get("numpy")  # no NumPy loaded -> no NumPy values to convert
+    if np is not None and isinstance(value, np.ndarray):
+        return value.tolist()
+    if np is not None and isinstance(value, (np.floating, np.integer)):
+        return value.item()
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def plan_key(kind, polygon=None, home=None, **settings):
+    """
+    Cache key of one kind of plan ("partition", "sweeps", ...).
+
+    Args:
+        polygon: [(lat, lon), ...] area (normalised, so vertex order does not matter).
+        home: (lat, lon) origin of the local frame.
+        **settings: Everything else the plan depends on (drones=..., spacing_m=...).
+    """
+    parts = {
+        "version": PLAN_CACHE_VERSION,
+        "kind": kind,
+        "polygon": normalize_polygon(polygon) if polygon is not None else None,
+        "home": [round(float(c), COORD_DECIMALS) for c in home] if home is not None else None,
+        "settings": _canonical(settings),
+    }
+    text = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return f"{kind}-{hashlib.sha256(text.encode()).hexdigest()[:32]}"
+
+
+class PlanCache:
+    """In-memory LRU of plans with an optional on-disk JSON layer."""
+
+    def __init__(self, max_entries=64, cache_dir=DEFAULT_CACHE_DIR, max_disk_entries=500):
+        """
+        Args:
+            max_entries (int): Plans kept in memory.
+            cache_dir (str): Folder of the on-disk layer (None = memory only).
+            max_disk_entries (int): Oldest files beyond this are deleted.
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self._plans = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """The cached plan, or None."""
+        plan = self._plans.get(key)
+        if plan is not None:
+            self._plans.move_to_end(key)
+            self.hits += 1
+            return plan
+        if self.cache_dir is not None:
+            try:
+                with open(self._path(key)) as f:
+                    plan = json.load(f)
+            except (OSError, ValueError):
+                plan = None
+            if plan is not None:
+                self.disk_hits += 1
+                try:
+                    os.utime(self._path(key))  # pruning drops the least recently USED files
+                except OSError:
+                    pass
+                self._remember(key, plan)
+                return plan
+        return None
+
+    def put(self, key, plan):
+        """Stores a plan (as plain JSON data, which is also what get() returns)."""
+        plan = _canonical(plan)
+        self._remember(key, plan)
+        if self.cache_dir is not None:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp = self._path(key) + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump(plan, f, separators=(",", ":"))
+                os.replace(tmp, self._path(key))
+                self._prune_disk()
+            except OSError as e:
+                print(f"[PlanCache] Could not write {key}: {e}")
+        return plan
+
+    def get_or_compute(self, key, compute):
+        """get(key), or compute() + put() on a miss."""
+        plan = self.get(key)
+        if plan is not None:
+            return plan
+        self.misses += 1
+        started = time.perf_counter()
+        plan = self.put(key, compute())
+        print(f"[PlanCache] {key.split('-')[0]} plan computed in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return plan
+
+    def _remember(self, key, plan):
+        self._plans[key] = plan
+        self._plans.move_to_end(key)
+        while len(self._plans) > self.max_entries:
+            self._plans.popitem(last=False)
+
+    def _prune_disk(self):
+        files = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                 if name.endswith(".json")]
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self, disk=False):
+        self._plans.clear()
+        if disk and self.cache_dir is not None and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def stats(self):
+        return {"entries": len(self._plans), "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+
+# Shared by the missions and the GCS runtime
+PLAN_CACHE = PlanCache()
@@ -0,0 +1,298 @@
+"""
+Equal-area partitioning of any simple polygon (e.g. the Leaflet draw output) for N drones.
+
+The polygon is rotated onto its long axis, cut into strips, and every strip is
+cut again across, so each drone gets a sector of area/N with a compact,
+roughly square shape. All cut positions are solved in closed form from the
+polygon's area function (no bisection), and clipping is vectorized with NumPy,
+so 50 sectors take a few milliseconds.
+
+Coordinates are local meters (x = East, y = North); partition_gps() does the
+GPS <-> local conversion with the cached geodesy frame.
+"""
+import math
+
+import numpy as np
+
+from geodesy import local_frame
+
+
+# --- BASIC POLYGON MATH ---
+def polygon_area(poly):
+    """Signed area (shoelace): > 0 for counter-clockwise vertices."""
+    x, y = poly[:, 0], poly[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def polygon_centroid(poly):
+    """Area centroid (x, y) of a simple polygon."""
+    x, y = poly[:, 0], poly[:, 1]
+    xn, yn = np.roll(x, -1), np.roll(y, -1)
+    cross = x * yn - xn * y
+    area = 0.5 * cross.sum()
+    if abs(area) < 1e-12:
+        return float(x.mean()), float(y.mean())
+    return float(((x + xn) * cross).sum() / (6 * area)), float(((y + yn) * cross).sum() / (6 * area))
+
+
+def _crossings(poly, y0):
+    """x of every edge crossing the horizontal line y = y0 (half-open rule, so vertices count once)."""
+    x1, y1 = poly[:, 0], poly[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    hit = (y1 <= y0) != (y2 <= y0)
+    return np.sort(x1[hit] + (y0 - y1[hit]) * (x2[hit] - x1[hit]) / (y2[hit] - y1[hit]))
+
+
+def point_in_polygon(poly, point):
+    """Even-odd test; zero-width bridges left by clip_halfplane() do not count as inside."""
+    poly = np.asarray(poly, dtype=float).reshape(-1, 2)
+    xs = _crossings(poly, point[1])
+    return bool(np.count_nonzero(xs > point[0]) % 2)
+
+
+def interior_point(poly, hint=None):
+    """
+    A point inside the polygon, as close to `hint` (default: the centroid) as possible.
+
+    The centroid of a concave or multi-piece sector can fall outside it (e.g.
+    in the notch of a U), which would send the drone outside its area. Then the
+    polygon is scanned with horizontal lines between its vertex heights, and the
+    middle of the inside interval nearest to the hint is used.
+    """
+    poly = np.asarray(poly, dtype=float).reshape(-1, 2)
+    hint = polygon_centroid(poly) if hint is None else hint
+    if point_in_polygon(poly, hint):
+        return float(hint[0]), float(hint[1])
+
+    ys = np.unique(poly[:, 1])
+    lines = np.concatenate([[hint[1]], 0.5 * (ys[:-1] + ys[1:])])
+    best, best_d = None, math.inf
+    for y0 in lines:
+        xs = _crossings(poly, y0)
+        left, right = xs[0::2], xs[1::2]
+        wide = right - left > 1e-9
+        if not wide.any():
+            continue
+        mids = 0.5 * (left[wide] + right[wide])
+        d = np.hypot(mids - hint[0], y0 - hint[1])
+        i = int(np.argmin(d))
+        if d[i] < best_d:
+            best, best_d = (float(mids[i]), float(y0)), d[i]
+    return best if best is not None else (float(hint[0]), float(hint[1]))
+
+
+def _as_ccw(poly):
+    poly = np.asarray(poly, dtype=float).reshape(-1, 2)
+    if len(poly) > 1 and np.allclose(poly[0], poly[-1]):
+        poly = poly[:-1]  # drop a repeated closing vertex
+    return poly if polygon_area(poly) >= 0 else poly[::-1]
+
+
+def clip_halfplane(poly, axis, value, keep_below):
+    """
+    Sutherland-Hodgman clip against one axis-aligned half-plane, vectorized over edges.
+
+    Keeps the part with poly[:, axis] <= value (keep_below) or >= value.
+    A concave polygon may come back with zero-width bridges, which do not
+    change its area or centroid.
+    """
+    if len(poly) == 0:
+        return poly
+    s = poly[:, axis] - value
+    if not keep_below:
+        s = -s
+    inside = s <= 0
+
+    nxt = np.roll(poly, -1, axis=0)
+    s_nxt = np.roll(s, -1)
+    crosses = (s <= 0) != (s_nxt <= 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(crosses, s / (s - s_nxt), 0.0)
+    cross_pts = poly + t[:, None] * (nxt - poly)
+    cross_pts[:, axis] = value  # exact, avoids drift across many cuts
+
+    # For every edge: [current vertex if inside] + [intersection if it crosses]
+    pts = np.stack([poly, cross_pts], axis=1).reshape(-1, 2)
+    keep = np.stack([inside, crosses], axis=1).ravel()
+    return pts[keep]
+
+
+def area_left_of(poly, cuts):
+    """
+    Area of the CCW polygon with x <= c, for every c in `cuts` at once.
+
+    The vertical cross-section length L(x) of a polygon is a sum of one linear
+    term per edge (bottom edges count -y, top edges +y), so the area is the
+    exact integral of those terms: an (n_cuts x n_edges) array operation.
+    """
+    cuts = np.asarray(cuts, dtype=float).reshape(-1, 1)
+    x1, y1 = poly[:, 0], poly[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    dx = x2 - x1
+    vertical = dx == 0
+    a = np.minimum(x1, x2)
+    b = np.maximum(x1, x2)
+    slope = np.where(vertical, 0.0, (y2 - y1) / np.where(vertical, 1.0, dx))
+    ya = np.where(x1 <= x2, y1, y2)  # y at x = a
+
+    t = np.clip(cuts, a, b)
+    integral = (t - a) * (ya + 0.5 * slope * (t - a))  # integral of y(x) from a to t
+    return -(np.sign(dx) * integral).sum(axis=1)
+
+
+def cut_positions(poly, fractions):
+    """
+    x positions where the area to the left equals each fraction of the total.
+
+    A(x) is quadratic between vertex x-coordinates, so it is sampled at the
+    breakpoints and mid-points and each target is solved in closed form.
+    """
+    fractions = np.asarray(fractions, dtype=float)
+    xs = np.unique(poly[:, 0])
+    if len(xs) < 2:
+        return np.full(len(fractions), xs[0] if len(xs) else 0.0)
+
+    mids = 0.5 * (xs[:-1] + xs[1:])
+    samples = area_left_of(poly, np.concatenate([xs, mids]))
+    a_break, a_mid = samples[:len(xs)], samples[len(xs):]
+    targets = fractions * a_break[-1]
+
+    seg = np.clip(np.searchsorted(a_break, targets, side="right") - 1, 0, len(xs) - 2)
+    h = xs[seg + 1] - xs[seg]
+    a0, am, a1 = a_break[seg], a_mid[seg], a_break[seg + 1]
+    # A(x0 + u) = a0 + p*u + q*u^2 through the three samples
+    q = 2 * (a1 - 2 * am + a0) / h ** 2
+    p = (4 * am - 3 * a0 - a1) / h
+    need = targets - a0
+    disc = np.sqrt(np.maximum(p ** 2 + 4 * q * need, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = np.where(p + disc > 0, 2 * need / (p + disc), 0.0)  # stable root, also for q -> 0
+    return xs[seg] + np.clip(u, 0.0, h)
+
+
+def principal_angle(poly):
+    """Angle (rad) of the polygon's long axis, from its area second moments."""
+    cx, cy = polygon_centroid(poly)
+    x, y = poly[:, 0] - cx, poly[:, 1] - cy
+    xn, yn = np.roll(x, -1), np.roll(y, -1)
+    cross = x * yn - xn * y
+    ixx = ((x ** 2 + x * xn + xn ** 2) * cross).sum()
+    iyy = ((y ** 2 + y * yn + yn ** 2) * cross).sum()
+    ixy = ((x * yn + 2 * x * y + 2 * xn * yn + xn * y) * cross).sum()
+    return 0.5 * math.atan2(ixy, ixx - iyy)
+
+
+def _split(poly, axis, n):
+    """Cuts a CCW polygon into n equal-area slices along one axis."""
+    if n <= 1:
+        return [poly]
+    view = poly if axis == 0 else _as_ccw(poly[:, ::-1])
+    cuts = cut_positions(view, np.arange(1, n) / n)
+    pieces = []
+    lower = None
+    for c in list(cuts) + [None]:
+        piece = poly
+        if lower is not None:
+            piece = clip_halfplane(piece, axis, lower, keep_below=False)
+        if c is not None:
+            piece = clip_halfplane(piece, axis, c, keep_below=True)
+        pieces.append(piece)
+        lower = c
+    return pieces
+
+
+# --- PARTITIONING ---
+def partition_polygon(polygon_xy, n):
+    """
+    Splits a simple polygon into n sectors of equal area.
+
+    Args:
+        polygon_xy: (M, 2) vertices in local meters (x = East, y = North).
+        n (int): Number of sectors (drones).
+
+    Returns:
+        list of dicts (one per sector, strip by strip):
+            {"center": (x, y), "outline": (K, 2) array, "area": m^2}
+        The center is the sector centroid, moved inside the sector when the
+        sector is concave or in pieces (see interior_point()).
+    """
+    poly = _as_ccw(polygon_xy)
+    if len(poly) < 3 or abs(polygon_area(poly)) < 1e-9:
+        raise ValueError("Need a polygon with at least 3 non-collinear points")
+    n = int(n)
+    if n < 1:
+        raise ValueError("Need at least one sector")
+
+    # 1. Rotate so the long axis is x
+    angle = principal_angle(poly)
+    cos_a, sin_a = math.cos(angle), math.sin(angle)
+    to_local = np.array([[cos_a, sin_a], [-sin_a, cos_a]])
+    rot = poly @ to_local.T
+
+    # 2. Number of strips along x so that sectors come out roughly square
+    width = np.ptp(rot[:, 0])
+    height = max(np.ptp(rot[:, 1]), 1e-9)
+    n_strips = int(min(n, max(1, round(math.sqrt(n * width / height)))))
+    per_strip = [n // n_strips + (1 if i < n % n_strips else 0) for i in range(n_strips)]
+
+    # 3. Strip boundaries sized by how many drones each strip gets
+    fractions = np.cumsum(per_strip)[:-1] / n
+    cuts = list(cut_positions(rot, fractions))
+    bounds = [None] + cuts + [None]
+
+    sectors = []
+    for i, k in enumerate(per_strip):
+        strip = rot
+        if bounds[i] is not None:
+            strip = clip_halfplane(strip, 0, bounds[i], keep_below=False)
+        if bounds[i + 1] is not None:
+            strip = clip_halfplane(strip, 0, bounds[i + 1], keep_below=True)
+
+        # 4. Cut each strip across into its k sectors
+        for piece in _split(strip, 1, k):
+            outline = piece @ to_local  # rotate back
+            sectors.append({
+                "center": interior_point(outline),
+                "outline": outline,
+                "area": abs(polygon_area(outline)),
+            })
+    return sectors
+
+
+def partition_gps(polygon_gps, n, home=None, frame=None):
+    """
+    partition_polygon() for [(lat, lon), ...] input (GCS / mission format).
+
+    Args:
+        polygon_gps: Polygon vertices as (lat, lon).
+        n (int): Number of sectors.
+        home: (lat, lon) origin of the local frame (default: first vertex).
+        frame: geodesy.local_frame() to work in instead (e.g. one with the home altitude).
+
+    Returns:
+        list of dicts: {"center": (lat, lon), "outline": [(lat, lon), ...], "area": m^2,
+        "local_outline": the outline in local meters (East, North) of that frame}
+    """
+    pts = np.asarray(polygon_gps, dtype=float).reshape(-1, 2)
+    if frame is None:
+        origin = tuple(home) if home is not None else (pts[0, 0], pts[0, 1])
+        frame = local_frame(float(origin[0]), float(origin[1]), 0.0)
+
+    east, north, _ = frame.geodetic2enu(pts[:, 0], pts[:, 1], 0.0)
+    sectors = partition_polygon(np.column_stack([east, north]), n)
+
+    # Convert all centers and outline vertices back to GPS in one batch
+    centers = np.array([s["center"] for s in sectors])
+    outlines = [s["outline"] for s in sectors]
+    sizes = [len(o) for o in outlines]
+    every_xy = np.vstack([centers] + outlines)
+    lat, lon, _ = frame.enu2geodetic(every_xy[:, 0], every_xy[:, 1], 0.0)
+
+    result = []
+    pos = len(sectors)
+    for i, sector in enumerate(sectors):
+        outline = list(zip(lat[pos:pos + sizes[i]].tolist(), lon[pos:pos + sizes[i]].tolist()))
+        pos += sizes[i]
+        result.append({"center": (float(lat[i]), float(lon[i])), "outline": outline, "area": sector["area"],
+                       "local_outline": sector["outline"]})
+    return result
@@ -0,0 +1,192 @@
+"""
+Drone-to-drone separation monitor.
+
+Every tick the cached positions of the whole swarm are put in local NED
+and hashed into a uniform grid of min_separation_m cells. Only drones in
+the same or a neighbouring cell can be too close, so the check costs about
+O(N log N) (one sort) instead of comparing every pair:
+
+    separation = SeparationMonitor(swarm, min_separation_m=5.0)
+    separation.start()
+    ...
+    separation.conflicts   # {(id_a, id_b): distance_m} right now
+"""
+import asyncio
+import itertools
+import time
+
+import numpy as np
+
+from geodesy import local_frame
+
+# Half of the 26 neighbouring cells (+ the cell itself): every neighbouring pair of cells once
+_NEIGHBOURS = np.array([
+    offset for offset in itertools.product((-1, 0, 1), repeat=3)
+    if offset > (0, 0, 0)
+], dtype=np.int64)
+_KEY_BITS = 21  # per axis, offset to non-negative: +-1M cells (plenty for a mission area)
+# Above this relative altitude a drone counts as airborne even before it reports in_air
+AIRBORNE_ALT_M = 1.0
+
+
+def _cell_keys(cells):
+    shifted = cells + (1 << (_KEY_BITS - 1))
+    return (shifted[:, 0] << (2 * _KEY_BITS)) | (shifted[:, 1] << _KEY_BITS) | shifted[:, 2]
+
+
+def close_pairs(points, radius):
+    """
+    Every pair of points closer than radius, with a uniform grid hash.
+
+    Args:
+        points: (N, 3) positions in meters (any Cartesian frame, e.g. local NED).
+        radius (float): Separation threshold (m).
+
+    Returns:
+        (i, j, distance): arrays with i < j.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+    if len(points) < 2:
+        return empty
+
+    # 1. Sort the points by cell
+    cells = np.floor(points / radius).astype(np.int64)
+    keys = _cell_keys(cells)
+    order = np.argsort(keys, kind="stable")
+    cell_keys, first, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    cell_coords = cells[order[first]]
+
+    # 2. Occupied (cell, neighbour cell) pairs: the cell itself + 13 half-neighbours
+    pair_a = [np.arange(len(cell_keys))]
+    pair_b = [np.arange(len(cell_keys))]
+    for offset in _NEIGHBOURS:
+        wanted = _cell_keys(cell_coords + offset)
+        pos = np.minimum(np.searchsorted(cell_keys, wanted), len(cell_keys) - 1)
+        hit = cell_keys[pos] == wanted
+        pair_a.append(np.flatnonzero(hit))
+        pair_b.append(pos[hit])
+    a = np.concatenate(pair_a)
+    b = np.concatenate(pair_b)
+
+    # 3. Expand every cell pair into its point pairs (count_a x count_b each)
+    sizes = counts[a] * counts[b]
+    if not sizes.sum():
+        return empty
+    owner = np.repeat(np.arange(len(a)), sizes)
+    k = np.arange(len(owner)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    i = order[first[a[owner]] + k // counts[b[owner]]]
+    j = order[first[b[owner]] + k % counts[b[owner]]]
+
+    same_cell = a[owner] == b[owner]
+    keep = ~same_cell | (i < j)       # inside one cell: each unordered pair once
+    i, j = i[keep], j[keep]
+    distance = np.linalg.norm(points[i] - points[j], axis=1)
+    close = distance < radius
+    i, j, distance = i[close], j[close], distance[close]
+    swap = i > j
+    i[swap], j[swap] = j[swap], i[swap]
+    return i, j, distance
+
+
+class SeparationMonitor:
+    """Reports drone pairs closer than min_separation_m, a few times per second."""
+
+    def __init__(self, swarm, min_separation_m=5.0, rate_hz=10.0, origin=None,
+                 ignore_on_ground=True, on_conflict=None):
+        """
+        Args:
+            swarm (list): DroneAgents (anything with .id and .telemetry.position / .in_air).
+            min_separation_m (float): 3D distance below which a pair is reported.
+            rate_hz (float): Checks per second.
+            origin (tuple): (lat, lon, alt AMSL) of the local NED frame; default: the
+                first position seen.
+            ignore_on_ground (bool): Only check drones that are airborne (in_air, or
+                higher than AIRBORNE_ALT_M): parked drones often sit closer together
+                than min_separation_m, or even share one home point in SITL.
+            on_conflict (callable): Called with (agent_a, agent_b, distance_m) when a pair
+                gets too close.
+        """
+        self.agents = list(swarm)
+        self.min_separation_m = min_separation_m
+        self.period = 1.0 / rate_hz
+        self.origin = origin
+        self.ignore_on_ground = ignore_on_ground
+        self.on_conflict = on_conflict
+
+        self.conflicts = {}      # (id_a, id_b) -> distance (m), pairs too close right now
+        self.conflict_count = 0  # conflicts started since the monitor was created
+        self.tick_s = 0.0        # duration of the last tick
+        self._task = None
+
+    # --- LIFECYCLE ---
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            self.tick()
+            await asyncio.sleep(self.period)
+
+    # --- ONE CHECK FOR THE WHOLE SWARM ---
+    def positions_ned(self):
+        """(agents, (K, 3) NED positions) of the drones that take part in the check."""
+        agents, lat, lon, alt = [], [], [], []
+        for agent in self.agents:
+            p = agent.telemetry.position
+            if p is None or (self.ignore_on_ground and not self._airborne(agent, p)):
+                continue
+            agents.append(agent)
+            lat.append(p.latitude_deg)
+            lon.append(p.longitude_deg)
+            alt.append(p.absolute_altitude_m)
+        if not agents:
+            return agents, np.zeros((0, 3))
+        if self.origin is None:
+            self.origin = (lat[0], lon[0], alt[0])
+        north, east, down = local_frame(*self.origin).geodetic2ned(np.array(lat), np.array(lon), np.array(alt))
+        return agents, np.column_stack([north, east, down])
+
+    @staticmethod
+    def _airborne(agent, position):
+        if agent.telemetry.in_air:
+            return True
+        rel_alt = position.relative_altitude_m
+        return rel_alt is not None and rel_alt > AIRBORNE_ALT_M
+
+    def tick(self):
+        """Updates self.conflicts; prints pairs that just got too close or separated again."""
+        started = time.perf_counter()
+        agents, ned = self.positions_ned()
+        i, j, distance = close_pairs(ned, self.min_separation_m)
+
+        current = {}
+        for a, b, d in zip(i.tolist(), j.tolist(), distance.tolist()):
+            key = tuple(sorted((agents[a].id, agents[b].id), key=str))
+            current[key] = d
+            if key not in self.conflicts:
+                self.conflict_count += 1
+                print(f"[Separation] Drones {key[0]} and {key[1]} only {d:.1f} m apart "
+                      f"(min {self.min_separation_m:.1f} m)")
+                if self.on_conflict is not None:
+                    self.on_conflict(agents[a], agents[b], d)
+        for key in self.conflicts.keys() - current.keys():
+            print(f"[Separation] Drones {key[0]} and {key[1]} separated again")
+        self.conflicts = current
+        self.tick_s = time.perf_counter() - started
+
+    def status(self):
+        """Plain dict for prints and the GCS."""
+        return {
+            "min_separation_m": self.min_separation_m,
+            "conflicts": [{"ids": list(key), "distance_m": round(d, 1)} for key, d in self.conflicts.items()],
+            "conflicts_total": self.conflict_count,
+            "tick_ms": round(self.tick_s * 1000, 2),
+        }
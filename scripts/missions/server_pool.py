@@ -0,0 +1,178 @@
+"""
+Pool of pre-started mavsdk_server processes.
+
+By default every DroneAgent's System(port=...) launches its own embedded
+mavsdk_server inside connect(), one drone after another under the connect
+semaphore. The pool starts one server per roster drone up front (e.g. while
+the GCS web UI comes up). Each server starts discovering its vehicle right
+away, and the agents then only attach to the gRPC port:
+
+    pool = MavsdkServerPool()
+    roster = pool.start(load_roster())   # spawns, marks each entry with "mavsdk_server"
+    swarm = build_swarm(roster)          # agents use System(mavsdk_server_address=...)
+
+Only the standard library is imported here (the mavsdk package is located,
+not loaded), so the servers can be spawned before any heavy import.
+"""
+import atexit
+import importlib.util
+import os
+import socket
+import subprocess
+import time
+
+POOL_ENV = "SWARM_SERVER_POOL"
+SERVER_HOST = "127.0.0.1"
+# Same ids as the embedded server started by mavsdk.System()
+SERVER_SYSID = 245
+SERVER_COMPID = 190
+
+
+def enabled():
+    return os.environ.get(POOL_ENV, "1").lower() not in ("", "0", "false", "no")
+
+
+def find_server_binary():
+    """Path of the mavsdk_server shipped with the mavsdk package (None if missing)."""
+    spec = importlib.util.find_spec("mavsdk")
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    name = "mavsdk_server.exe" if os.name == "nt" else "mavsdk_server"
+    path = os.path.join(list(spec.submodule_search_locations)[0], "bin", name)
+    return path if os.path.isfile(path) else None
+
+
+def port_open(port, host=SERVER_HOST, timeout=0.2):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        return s.connect_ex((host, port)) == 0
+
+
+class MavsdkServerPool:
+    """One long-lived mavsdk_server per roster drone, restarted if it dies."""
+
+    def __init__(self, binary=None, host=SERVER_HOST, log_dir=None, max_restarts=3):
+        """
+        Args:
+            binary (str): mavsdk_server to run (default: the one in the mavsdk package).
+            log_dir (str): Write each server's output to <log_dir>/mavsdk_server_<id>.log
+                (None = discard it).
+            max_restarts (int): Respawns per drone before it falls back to an embedded server.
+        """
+        self.binary = binary or find_server_binary()
+        self.host = host
+        self.log_dir = log_dir
+        self.max_restarts = max_restarts
+        self.servers = {}   # drone id -> {"entry", "process", "started", "restarts"}
+        atexit.register(self.stop)
+
+    # --- SPAWNING ---
+    def start(self, roster):
+        """
+        Spawns a server for every roster entry that has none yet.
+
+        Returns:
+            The roster (copies of the entries); drones with a running server
+            carry "mavsdk_server": host, which build_swarm() hands to the agent.
+        """
+        if self.binary is None:
+            print("[ServerPool] No mavsdk_server binary found: drones start their own")
+            return [dict(d) for d in roster]
+        started = time.perf_counter()
+        for d in roster:
+            if d["id"] not in self.servers:
+                self.servers[d["id"]] = {"entry": dict(d), "process": None, "started": None, "restarts": 0}
+                self._spawn(d["id"])
+        self.check()
+        print(f"[ServerPool] {len(self.servers)} mavsdk_server processes up in "
+              f"{(time.perf_counter() - started) * 1000:.0f} ms")
+        return self.assign(roster)
+
+    def _spawn(self, drone_id):
+        server = self.servers[drone_id]
+        entry = server["entry"]
+        output = subprocess.DEVNULL
+        if self.log_dir is not None:
+            os.makedirs(self.log_dir, exist_ok=True)
+            output = open(os.path.join(self.log_dir, f"mavsdk_server_{drone_id}.log"), "ab")
+        try:
+            server["process"] = subprocess.Popen(
+                [self.binary, "-p", str(entry["mavsdk_port"]), "--sysid", str(SERVER_SYSID),
+                 "--compid", str(SERVER_COMPID), entry["address"]],
+                stdout=output, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+            server["started"] = time.monotonic()
+        except OSError as e:
+            print(f"[ServerPool] Could not start mavsdk_server for drone {drone_id}: {e}")
+            server["process"] = None
+        finally:
+            if output is not subprocess.DEVNULL:
+                output.close()
+
+    # --- HEALTH ---
+    def alive(self, drone_id):
+        server = self.servers.get(drone_id)
+        return server is not None and server["process"] is not None and server["process"].poll() is None
+
+    def check(self):
+        """Respawns dead servers (up to max_restarts each). Returns the ids that are running."""
+        self.restart_dead()
+        return [drone_id for drone_id in self.servers if self.alive(drone_id)]
+
+    def restart_dead(self):
+        """
+        Respawns dead servers (up to max_restarts each). Call it periodically: the
+        agents of the returned drone ids have to reconnect to their new server.
+        """
+        respawned = []
+        for drone_id, server in self.servers.items():
+            if self.alive(drone_id) or server["restarts"] >= self.max_restarts:
+                continue
+            process = server["process"]
+            if process is not None:
+                server["restarts"] += 1
+                print(f"[ServerPool] mavsdk_server of drone {drone_id} exited "
+                      f"(code {process.returncode}), restart {server['restarts']}/{self.max_restarts}")
+            self._spawn(drone_id)
+            if self.alive(drone_id):
+                respawned.append(drone_id)
+        return respawned
+
+    def assign(self, roster):
+        """Roster copies; entries whose server runs get "mavsdk_server", the others start their own."""
+        running = set(self.check())
+        result = []
+        for d in roster:
+            d = dict(d)
+            if d["id"] in running:
+                d["mavsdk_server"] = self.host
+            else:
+                d.pop("mavsdk_server", None)
+            result.append(d)
+        return result
+
+    def status(self):
+        """Per drone: pid, whether the process runs and whether it serves gRPC yet
+        (mavsdk_server opens its port once it has discovered the vehicle)."""
+        return [
+            {
+                "id": drone_id,
+                "pid": server["process"].pid if server["process"] is not None else None,
+                "alive": self.alive(drone_id),
+                "serving": self.alive(drone_id) and port_open(server["entry"]["mavsdk_port"], self.host),
+                "restarts": server["restarts"],
+            }
+            for drone_id, server in self.servers.items()
+        ]
+
+    # --- SHUTDOWN ---
+    def stop(self):
+        for server in self.servers.values():
+            if server["process"] is not None and server["process"].poll() is None:
+                server["process"].terminate()
+        for server in self.servers.values():
+            if server["process"] is not None:
+                try:
+                    server["process"].wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    server["process"].kill()
+        self.servers.clear()
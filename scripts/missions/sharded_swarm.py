@@ -0,0 +1,447 @@
+"""
+Multi-process (sharded) swarm runtime.
+
+The roster is split into shards and every shard runs in its own worker
+process, with its own asyncio loop, DroneAgents and mavsdk_server ports
+(from the roster as usual), so telemetry decoding and command traffic for
+100+ drones spread over all cores. The parent keeps one RemoteAgent per
+drone. RemoteAgent has the same mission methods as DroneAgent (forwarded to
+the worker) and a telemetry cache fed by the workers' state batches, so
+the existing missions, ArrivalMonitor, SeparationMonitor and assign_swarm
+work on it unchanged:
+
+    sharded = ShardedSwarm(load_roster(count=100), shards=8)
+    swarm, failed = await sharded.start()
+    await run_sky_guards_mission(area, swarm=swarm)
+    await sharded.stop()
+
+    python scripts/missions/sharded_swarm.py --count 100 --shards 8
+"""
+import argparse
+import asyncio
+import itertools
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from mavsdk.telemetry import Position
+
+from geodesy import distance_m
+
+# Methods of DroneAgent a RemoteAgent forwards to its worker
+REMOTE_METHODS = ("arm_and_takeoff", "fly_to_gps", "land", "hold", "upload_mission", "fly_mission",
+                  "wait_mission_finished")
+
+
+def shard_roster(roster, shards):
+    """Splits the roster into `shards` contiguous, near-equal blocks (empty ones dropped)."""
+    shards = max(1, min(shards, len(roster)))
+    size, extra = divmod(len(roster), shards)
+    blocks, start = [], 0
+    for k in range(shards):
+        end = start + size + (1 if k < extra else 0)
+        blocks.append(roster[start:end])
+        start = end
+    return [block for block in blocks if block]
+
+
+# --- WORKER PROCESS ---
+def _worker(shard, roster, commands, events, state_rate_hz, wait_gps, store_name):
+    try:
+        asyncio.run(_worker_main(shard, roster, commands, events, state_rate_hz, wait_gps, store_name))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _worker_main(shard, roster, commands, events, state_rate_hz, wait_gps, store_name):
+    from swarm_roster import build_swarm, connect_swarm
+    from state_store import SwarmStateStore
+
+    swarm = build_swarm(roster)
+    store = SwarmStateStore.attach(store_name) if store_name else None
+    if store is not None:
+        # Every hub writes its drone's row of the parent's shared-memory store directly
+        for agent in swarm:
+            agent.telemetry.attach_store(store)
+
+    built = {agent.id: agent for agent in swarm}
+    swarm, failed = await connect_swarm(swarm, wait_gps=wait_gps)
+    agents = {agent.id: agent for agent in swarm}
+    events.put(("ready", shard, list(agents), [(agent.id, reason) for agent, reason in failed]))
+
+    publisher = asyncio.ensure_future(_publish_state(shard, swarm, events, 1.0 / state_rate_hz))
+    loop = asyncio.get_running_loop()
+    running = {}  # call_id -> task
+    while True:
+        # Blocking queue read in a thread, so the loop keeps serving the drones
+        message = await loop.run_in_executor(None, commands.get)
+        if message is None:
+            break
+        if message[0] == "cancel":
+            # The parent stopped waiting (e.g. its mission was cancelled): stop the call here too
+            task = running.get(message[1])
+            if task is not None:
+                task.cancel()
+            continue
+        call_id, drone_id, method, args, kwargs = message
+        if method == "reconnect":
+            task = asyncio.ensure_future(
+                _reconnect(built, agents, swarm, events, call_id, drone_id, *args, wait_gps=wait_gps, **kwargs))
+        else:
+            task = asyncio.ensure_future(_execute(agents, events, *message))
+        running[call_id] = task
+        task.add_done_callback(lambda _, call_id=call_id: running.pop(call_id, None))
+
+    running = list(running.values())
+    for task in running + [publisher]:
+        task.cancel()
+    await asyncio.gather(*running, publisher, return_exceptions=True)
+    for agent in swarm:
+        await agent.telemetry.stop()
+    if store is not None:
+        store.close()
+    events.put(("stopped", shard))
+
+
+async def _execute(agents, events, call_id, drone_id, method, args, kwargs):
+    try:
+        if method not in REMOTE_METHODS:
+            raise ValueError(f"{method} cannot be called remotely")
+        result = await getattr(agents[drone_id], method)(*args, **kwargs)
+        events.put(("result", call_id, result, None))
+    except asyncio.CancelledError:
+        events.put(("result", call_id, None, "cancelled"))
+        raise
+    except Exception as e:
+        events.put(("result", call_id, None, f"{type(e).__name__}: {e}"))
+
+
+async def _reconnect(built, agents, swarm, events, call_id, drone_id, timeout, wait_gps=True, force=False):
+    """
+    Retries a drone that failed to connect; once up it joins the shard's agents and
+    state batches. force=True reconnects a connected drone (its server was respawned)
+    and drops it from them if that fails.
+    """
+    from swarm_roster import connect_swarm
+
+    try:
+        reason = None
+        agent = built[drone_id]
+        if force and drone_id in agents:
+            await agent.telemetry.stop()  # its streams died with the old server
+            del agents[drone_id]
+            swarm.remove(agent)
+        if drone_id not in agents:
+            connected, failed = await connect_swarm([agent], timeout=timeout, wait_gps=wait_gps)
+            for agent in connected:
+                agents[agent.id] = agent
+                swarm.append(agent)
+            if failed:
+                reason = failed[0][1]
+        events.put(("result", call_id, reason, None))
+    except asyncio.CancelledError:
+        events.put(("result", call_id, None, "cancelled"))
+        raise
+    except Exception as e:
+        events.put(("result", call_id, None, f"{type(e).__name__}: {e}"))
+
+
+async def _publish_state(shard, swarm, events, period):
+    """One batch of TelemetryHub snapshots for the whole shard per period."""
+    while True:
+        events.put(("state", shard, [agent.telemetry.snapshot() for agent in swarm]))
+        await asyncio.sleep(period)
+
+
+# --- PARENT PROCESS ---
+class RemoteTelemetry:
+    """Latest state of a drone that lives in a worker (the TelemetryHub fields the missions read)."""
+
+    def __init__(self, drone_id):
+        self.id = drone_id
+        self.position = None
+        self.in_air = None
+        self.armed = None
+        self.flight_mode = None
+        self.last_update = {}
+        self._snapshot = None
+
+    def update(self, snapshot, received):
+        self._snapshot = snapshot
+        if snapshot["lat"] is not None:
+            self.position = Position(snapshot["lat"], snapshot["lon"], snapshot["abs_alt"], snapshot["rel_alt"])
+            self.last_update["position"] = received - (snapshot["age_s"] or 0.0)
+        self.in_air = snapshot["in_air"]
+        self.armed = snapshot["armed"]
+        self.flight_mode = snapshot["flight_mode"]
+
+    def distance_to(self, lat, lon):
+        """Horizontal distance (m) from the last known position, inf if unknown."""
+        if self.position is None:
+            return math.inf
+        return distance_m(self.position.latitude_deg, self.position.longitude_deg, lat, lon)
+
+    def snapshot(self):
+        """Same dict as TelemetryHub.snapshot(), as last reported by the worker."""
+        if self._snapshot is None:
+            return {"id": self.id, "lat": None, "lon": None, "abs_alt": None, "rel_alt": None,
+                    "in_air": None, "armed": None, "flight_mode": None, "gps_ok": False,
+                    "armable": False, "age_s": None}
+        result = dict(self._snapshot)
+        if "position" in self.last_update:
+            result["age_s"] = time.monotonic() - self.last_update["position"]
+        return result
+
+
+class RemoteAgent:
+    """Parent-side stand-in for a DroneAgent running in a worker process."""
+
+    def __init__(self, runtime, shard, drone_id, address, mavsdk_port):
+        self.id = drone_id
+        self.address = address
+        self.mavsdk_port = mavsdk_port
+        self.shard = shard
+        self.telemetry = RemoteTelemetry(drone_id)
+        self._runtime = runtime
+
+    async def arm_and_takeoff(self, *args, **kwargs):
+        return await self._runtime.call(self, "arm_and_takeoff", args, kwargs)
+
+    async def fly_to_gps(self, *args, **kwargs):
+        return await self._runtime.call(self, "fly_to_gps", args, kwargs)
+
+    async def land(self, *args, **kwargs):
+        return await self._runtime.call(self, "land", args, kwargs)
+
+    async def hold(self, *args, **kwargs):
+        return await self._runtime.call(self, "hold", args, kwargs)
+
+    async def upload_mission(self, *args, **kwargs):
+        return await self._runtime.call(self, "upload_mission", args, kwargs)
+
+    async def fly_mission(self, *args, **kwargs):
+        return await self._runtime.call(self, "fly_mission", args, kwargs)
+
+    async def wait_mission_finished(self, *args, **kwargs):
+        return await self._runtime.call(self, "wait_mission_finished", args, kwargs)
+
+
+class ShardedSwarm:
+    """Parent side: starts the workers, routes commands and aggregates their state."""
+
+    def __init__(self, roster, shards=None, state_rate_hz=5.0, wait_gps=True, store_name=None):
+        """
+        Args:
+            roster (list): Roster entries (swarm_roster.load_roster()).
+            shards (int): Worker processes (default: one per CPU core, at most one per drone).
+            state_rate_hz (float): How often every worker sends its drones' telemetry.
+            store_name (str): Shared-memory name of a state_store.SwarmStateStore (with a row
+                per roster drone) the workers mirror every telemetry message into.
+        """
+        self.roster = list(roster)
+        self.blocks = shard_roster(self.roster, shards or os.cpu_count() or 1)
+        self.state_rate_hz = state_rate_hz
+        self.wait_gps = wait_gps
+        self.store_name = store_name
+
+        self.agents = {}
+        for shard, block in enumerate(self.blocks):
+            for d in block:
+                self.agents[d["id"]] = RemoteAgent(self, shard, d["id"], d["address"], d["mavsdk_port"])
+
+        self._context = multiprocessing.get_context("spawn")  # never fork a process running gRPC
+        self._events = self._context.Queue()
+        self._commands = [self._context.Queue() for _ in self.blocks]
+        self._processes = []
+        self._pending = {}      # call_id -> Future
+        self._call_ids = itertools.count()
+        self._ready = {}        # shard -> (connected ids, failed)
+        self._ready_event = None
+        self._stopped = set()
+        self._reader = None
+        self.loop = None
+
+    # --- LIFECYCLE ---
+    async def start(self, timeout=300):
+        """
+        Starts every worker and waits until they have connected their drones.
+
+        Returns:
+            (connected, failed): RemoteAgents in roster order, and (agent, reason) pairs.
+        """
+        self.loop = asyncio.get_running_loop()
+        self._ready_event = asyncio.Event()
+        self._reader = threading.Thread(target=self._read_events, name="shard-events", daemon=True)
+        self._reader.start()
+
+        print(f"[Shards] Starting {len(self.blocks)} workers for {len(self.roster)} drones "
+              f"({', '.join(str(len(b)) for b in self.blocks)})")
+        for shard, block in enumerate(self.blocks):
+            process = self._context.Process(
+                target=_worker, name=f"swarm-shard-{shard}",
+                args=(shard, block, self._commands[shard], self._events, self.state_rate_hz, self.wait_gps,
+                      self.store_name),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+        # Wait for every worker's connect phase (a worker that died never reports)
+        deadline = time.monotonic() + timeout
+        while not self._ready_event.is_set():
+            waiting = [p for shard, p in enumerate(self._processes) if shard not in self._ready]
+            if not any(p.is_alive() for p in waiting) or time.monotonic() > deadline:
+                print(f"[Shards] Only {len(self._ready)}/{len(self.blocks)} workers ready "
+                      f"({sum(not p.is_alive() for p in waiting)} exited)")
+                break
+            try:
+                await asyncio.wait_for(self._ready_event.wait(), 0.5)
+            except asyncio.TimeoutError:
+                pass
+
+        connected_ids = set()
+        failed = []
+        for shard, block in enumerate(self.blocks):
+            ids, shard_failed = self._ready.get(shard, ([], [(d["id"], "worker not ready") for d in block]))
+            connected_ids.update(ids)
+            failed += [(self.agents[drone_id], reason) for drone_id, reason in shard_failed]
+        connected = [self.agents[d["id"]] for d in self.roster if d["id"] in connected_ids]
+        print(f"[Shards] {len(connected)}/{len(self.roster)} drones connected.")
+        return connected, failed
+
+    async def stop(self, timeout=10):
+        """Asks every worker to stop its drones' streams and exit."""
+        for commands in self._commands:
+            commands.put(None)
+        deadline = time.monotonic() + timeout
+        while len(self._stopped) < len(self._processes) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        for process in self._processes:
+            process.join(timeout=max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("sharded swarm stopped"))
+        self._pending.clear()
+        if self._reader is not None:
+            self._events.put(None)  # ends the reader thread
+            await self.loop.run_in_executor(None, self._reader.join, timeout)
+            self._reader = None
+        for queue in self._commands + [self._events]:
+            queue.close()
+            queue.join_thread()
+
+    # --- COMMANDS ---
+    async def call(self, agent, method, args=(), kwargs=None):
+        """Runs agent.<method>(*args, **kwargs) in the drone's worker and returns its result."""
+        call_id = next(self._call_ids)
+        future = self.loop.create_future()
+        self._pending[call_id] = future
+        self._commands[agent.shard].put((call_id, agent.id, method, tuple(args), dict(kwargs or {})))
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if self._pending.pop(call_id, None) is not None:
+                self._commands[agent.shard].put(("cancel", call_id))
+            raise
+
+    async def reconnect(self, agents, timeout=60, force=False):
+        """
+        Retries the connect of drones that failed it (in their workers). With
+        force=True connected drones reconnect too (their mavsdk_server was respawned).
+
+        Returns:
+            (connected, failed): the RemoteAgents that came up, and (agent, reason) pairs.
+        """
+        async def _one(agent):
+            try:
+                return await asyncio.wait_for(self.call(agent, "reconnect", (timeout,), {"force": force}),
+                                              timeout + 10)
+            except asyncio.TimeoutError:
+                return f"timed out after {timeout}s"
+            except RuntimeError as e:
+                return str(e)
+
+        reasons = await asyncio.gather(*[_one(agent) for agent in agents])
+        connected = [agent for agent, reason in zip(agents, reasons) if reason is None]
+        failed = [(agent, reason) for agent, reason in zip(agents, reasons) if reason is not None]
+        return connected, failed
+
+    # --- EVENTS FROM THE WORKERS ---
+    def _read_events(self):
+        while True:
+            try:
+                message = self._events.get()
+            except (EOFError, OSError):
+                return  # queue closed under us (interpreter shutdown)
+            if message is None or self.loop.is_closed():
+                return
+            try:
+                self.loop.call_soon_threadsafe(self._handle, message, time.monotonic())
+            except RuntimeError:
+                return  # the loop closed since the check: drop the message
+
+    def _handle(self, message, received):
+        kind = message[0]
+        if kind == "state":
+            for snapshot in message[2]:
+                agent = self.agents.get(snapshot["id"])
+                if agent is not None:
+                    agent.telemetry.update(snapshot, received)
+        elif kind == "result":
+            _, call_id, result, error = message
+            future = self._pending.pop(call_id, None)
+            if future is None or future.done():
+                return
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(error))
+        elif kind == "ready":
+            _, shard, ids, failed = message
+            self._ready[shard] = (ids, failed)
+            if len(self._ready) == len(self.blocks):
+                self._ready_event.set()
+        elif kind == "stopped":
+            self._stopped.add(message[1])
+
+    def status(self):
+        return {
+            "shards": [
+                {"shard": shard, "pid": process.pid, "alive": process.is_alive(),
+                 "drones": [d["id"] for d in self.blocks[shard]]}
+                for shard, process in enumerate(self._processes)
+            ],
+            "pending_commands": len(self._pending),
+        }
+
+
+async def main(args):
+    from swarm_roster import load_roster
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "drawn_polygon_mission"))
+    from main_mission import run_sky_guards_mission
+
+    area = [
+        (26.308079, 50.146278),
+        (26.308642, 50.147220),
+        (26.309173, 50.146842),
+        (26.308620, 50.145891),
+    ]
+    sharded = ShardedSwarm(load_roster(args.roster, count=args.count), shards=args.shards)
+    swarm, failed = await sharded.start()
+    try:
+        await run_sky_guards_mission(area, swarm=swarm)
+    finally:
+        await sharded.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fly the KFUPM area mission with the drones split over worker processes.")
+    parser.add_argument("--roster", help="Roster JSON (default: swarm_roster.json / $SWARM_ROSTER)")
+    parser.add_argument("--count", type=int, help="Only the first COUNT drones of the roster")
+    parser.add_argument("--shards", type=int, help="Worker processes (default: CPU cores)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,194 @@
+"""
+Shared-memory swarm state store (struct of arrays).
+
+One row per drone, one NumPy array per field, all in a single
+multiprocessing.shared_memory block. The TelemetryHubs write their row on
+every telemetry message; any thread, or any process that attaches by name
+(the GCS, sharded workers, a planner), reads whole columns without copies,
+locks or per-drone dicts:
+
+    store = SwarmStateStore.create([d["id"] for d in roster])
+    agent.telemetry.attach_store(store)          # writer side, per drone
+    ...
+    reader = SwarmStateStore.attach(store.name)  # any process
+    lat, lon = reader.lat, reader.lon            # (N,) views of shared memory
+    state = reader.snapshot()                    # consistent copy of every column
+
+Every row has a sequence counter (odd while it is being written), so
+snapshot() never mixes two updates of the same drone. Times are
+time.monotonic() (system-wide, so comparable across processes).
+"""
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+from mavsdk.telemetry import FlightMode
+
+# (field, dtype, value of an empty row)
+FIELDS = (
+    ("id", np.int64, -1),
+    ("seq", np.uint64, 0),
+    ("lat", np.float64, np.nan),
+    ("lon", np.float64, np.nan),
+    ("abs_alt", np.float64, np.nan),
+    ("rel_alt", np.float64, np.nan),
+    ("vn", np.float64, np.nan),           # velocity NED (m/s)
+    ("ve", np.float64, np.nan),
+    ("vd", np.float64, np.nan),
+    ("armed", np.int8, -1),               # 1 / 0, -1 = unknown
+    ("in_air", np.int8, -1),
+    ("flight_mode", np.int16, -1),        # FlightMode value, -1 = unknown
+    ("updated", np.float64, np.nan),      # time.monotonic() of the last write
+    ("position_updated", np.float64, np.nan),
+)
+_HEADER_BYTES = 64  # int64 drone count, then padding so every column stays 8-byte aligned
+
+FLIGHT_MODE_NAMES = {mode.value: mode.name for mode in FlightMode}
+_FLIGHT_MODE_VALUES = {mode.name: mode.value for mode in FlightMode}
+
+
+def _layout(n):
+    """(field, dtype, byte offset) of every column and the total size for n drones."""
+    offset, layout = _HEADER_BYTES, []
+    for name, dtype, _ in FIELDS:
+        layout.append((name, np.dtype(dtype), offset))
+        offset += -(-n * np.dtype(dtype).itemsize // 8) * 8
+    return layout, offset
+
+
+def flight_mode_code(mode):
+    """FlightMode (or its name) -> int code for the store; -1 if unknown."""
+    if mode is None:
+        return -1
+    value = getattr(mode, "value", None)
+    if isinstance(value, int):
+        return value
+    return _FLIGHT_MODE_VALUES.get(str(mode).upper(), -1)
+
+
+class SwarmStateStore:
+    """Fixed-size table of drone state in shared memory; columns are NumPy views."""
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.n = int(np.ndarray((1,), dtype=np.int64, buffer=shm.buf)[0])
+        layout, _ = _layout(self.n)
+        self.columns = {}
+        for name, dtype, offset in layout:
+            column = np.ndarray((self.n,), dtype=dtype, buffer=shm.buf, offset=offset)
+            self.columns[name] = column
+            setattr(self, name, column)
+        self._rows = {int(drone_id): row for row, drone_id in enumerate(self.id)}
+
+    # --- CREATE / ATTACH ---
+    @classmethod
+    def create(cls, drone_ids, name=None):
+        """New store with one row per drone id (in this order)."""
+        n = len(drone_ids)
+        _, size = _layout(n)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        np.ndarray((1,), dtype=np.int64, buffer=shm.buf)[0] = n
+        store = cls(shm, owner=True)
+        for field, _, empty in FIELDS:
+            store.columns[field][:] = empty
+        store.id[:] = drone_ids
+        store._rows = {int(drone_id): row for row, drone_id in enumerate(drone_ids)}
+        return store
+
+    @classmethod
+    def attach(cls, name):
+        """Opens a store created by another process (or thread) by its shared-memory name."""
+        # Only the creator may unlink it: this process' resource tracker must not do it at exit
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+        except TypeError:
+            # A spawned child shares its parent's tracker, which the creator cleans up
+            shared_tracker = resource_tracker._resource_tracker._fd is not None
+            shm = shared_memory.SharedMemory(name=name)
+            if not shared_tracker:
+                resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name if self.shm is not None else None
+
+    def close(self):
+        """Detaches; the creating side also frees the shared memory. Safe to call twice."""
+        if self.shm is None:
+            return
+        shm, self.shm = self.shm, None
+        self.columns.clear()
+        for name, _, _ in FIELDS:
+            setattr(self, name, None)
+        try:
+            shm.close()
+        except BufferError:
+            pass  # a reader still holds a column view; the mapping goes away with the process
+        if self.owner:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    # --- WRITER SIDE (one writer per row) ---
+    def row(self, drone_id):
+        return self._rows[int(drone_id)]
+
+    def write(self, row, **values):
+        """Updates some fields of one row (seqlock: readers retry while seq is odd)."""
+        self.seq[row] += 1
+        for field, value in values.items():
+            self.columns[field][row] = value
+        self.updated[row] = time.monotonic()
+        self.seq[row] += 1
+
+    def write_telemetry(self, row, stream, value):
+        """Writes one TelemetryHub stream message into its columns."""
+        if stream == "position":
+            self.write(row, lat=value.latitude_deg, lon=value.longitude_deg, abs_alt=value.absolute_altitude_m,
+                       rel_alt=value.relative_altitude_m, position_updated=time.monotonic())
+        elif stream == "velocity_ned":
+            self.write(row, vn=value.north_m_s, ve=value.east_m_s, vd=value.down_m_s)
+        elif stream in ("armed", "in_air"):
+            self.write(row, **{stream: -1 if value is None else int(bool(value))})
+        elif stream == "flight_mode":
+            self.write(row, flight_mode=flight_mode_code(value))
+
+    # --- READER SIDE ---
+    def snapshot(self, retries=100):
+        """
+        Consistent copy of every column ({field: (N,) array}). Rows that were being
+        written during the copy are read again (up to `retries` times; telemetry
+        rates are far below what that can keep up with).
+        """
+        state = {field: column.copy() for field, column in self.columns.items()}
+        for _ in range(retries):
+            torn = (state["seq"] % 2 == 1) | (state["seq"] != self.seq)
+            if not torn.any():
+                break
+            rows = np.flatnonzero(torn)
+            for field, column in self.columns.items():
+                state[field][rows] = column[rows]
+        return state
+
+    def to_dicts(self, state=None):
+        """Per-drone dicts with the TelemetryHub.snapshot() keys (for JSON / the GCS)."""
+        state = self.snapshot() if state is None else state
+        now = time.monotonic()
+        result = []
+        for i in range(self.n):
+            has_position = not np.isnan(state["lat"][i])
+            result.append({
+                "id": int(state["id"][i]),
+                "lat": float(state["lat"][i]) if has_position else None,
+                "lon": float(state["lon"][i]) if has_position else None,
+                "abs_alt": float(state["abs_alt"][i]) if has_position else None,
+                "rel_alt": float(state["rel_alt"][i]) if has_position else None,
+                "in_air": None if state["in_air"][i] < 0 else bool(state["in_air"][i]),
+                "armed": None if state["armed"][i] < 0 else bool(state["armed"][i]),
+                "flight_mode": FLIGHT_MODE_NAMES.get(int(state["flight_mode"][i])),
+                "age_s": now - float(state["position_updated"][i]) if has_position else None,
+            })
+        return result
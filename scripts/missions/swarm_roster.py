@@ -0,0 +1,130 @@
+import asyncio
+import json
+import os
+
+# Default roster file (next to this script)
+DEFAULT_ROSTER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "swarm_roster.json")
+
+# Same port layout as commands/start_swarm.sh (drone i -> base + i)
+DEFAULT_HOST = "127.0.0.1"
+BASE_UDP_PORT = 14540
+BASE_MAVSDK_PORT = 50051
+
+
+def generate_roster(count, base_udp_port=BASE_UDP_PORT, base_mavsdk_port=BASE_MAVSDK_PORT,
+                    host=DEFAULT_HOST, first_id=1):
+    """
+    Builds a roster of `count` drones with consecutive ports.
+
+    Returns:
+        list of dicts: [{"id": 1, "address": "udpin://127.0.0.1:14540", "mavsdk_port": 50051}, ...]
+    """
+    return [
+        {
+            "id": first_id + i,
+            "address": f"udpin://{host}:{base_udp_port + i}",
+            "mavsdk_port": base_mavsdk_port + i,
+        }
+        for i in range(count)
+    ]
+
+
+def load_roster(path=None, count=None):
+    """
+    Loads the swarm roster.
+
+    The file is JSON and may either list the drones explicitly:
+        {"drones": [{"id": 1, "address": "udpin://127.0.0.1:14540", "mavsdk_port": 50051}, ...]}
+    or describe them by count and base ports:
+        {"count": 4, "base_udp_port": 14540, "base_mavsdk_port": 50051, "host": "127.0.0.1"}
+
+    Args:
+        path (str): Roster file. Defaults to $SWARM_ROSTER, then swarm_roster.json.
+        count (int): Overrides the number of drones (explicit lists are truncated).
+    """
+    path = path or os.environ.get("SWARM_ROSTER") or DEFAULT_ROSTER_PATH
+    with open(path) as f:
+        spec = json.load(f)
+
+    if "drones" in spec:
+        roster = [dict(d) for d in spec["drones"]]
+        if count is not None:
+            if count > len(roster):
+                raise ValueError(f"Roster {path} lists {len(roster)} drones, {count} requested")
+            roster = roster[:count]
+    else:
+        roster = generate_roster(
+            count if count is not None else spec.get("count", 4),
+            base_udp_port=spec.get("base_udp_port", BASE_UDP_PORT),
+            base_mavsdk_port=spec.get("base_mavsdk_port", BASE_MAVSDK_PORT),
+            host=spec.get("host", DEFAULT_HOST),
+        )
+
+    _check_roster(roster)
+    return roster
+
+
+def _check_roster(roster):
+    """Two drones sharing an id, address or mavsdk port would silently steal each other's link."""
+    for key in ("id", "address", "mavsdk_port"):
+        values = [d[key] for d in roster]
+        if len(values) != len(set(values)):
+            raise ValueError(f"Duplicate '{key}' in swarm roster: {values}")
+
+
+def build_swarm(roster, agent_cls=None):
+    """Creates one agent per roster entry (attached to its pooled mavsdk_server, if any)."""
+    if agent_cls is None:
+        # Imported here: loading a roster (e.g. to pre-start servers) must not pull in mavsdk
+        from drone_agent import DroneAgent as agent_cls
+    swarm = []
+    for d in roster:
+        if d.get("mavsdk_server"):
+            swarm.append(agent_cls(d["id"], d["address"], mavsdk_port=d["mavsdk_port"],
+                                   mavsdk_server_address=d["mavsdk_server"]))
+        else:
+            swarm.append(agent_cls(d["id"], d["address"], mavsdk_port=d["mavsdk_port"]))
+    return swarm
+
+
+async def connect_swarm(swarm, max_concurrent=8, timeout=60, wait_gps=True):
+    """
+    Connects every agent with at most `max_concurrent` handshakes in flight
+    and a per-drone timeout, so one dead drone cannot hang the whole startup.
+    wait_gps=False only waits for the link (e.g. for parameter work on the bench).
+
+    Returns:
+        (connected, failed): connected agents (roster order) and a list of
+        (agent, reason) for the drones that did not come up.
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def _connect(agent):
+        async with semaphore:
+            try:
+                connecting = agent.connect() if wait_gps else agent.connect(wait_gps=False)
+                await asyncio.wait_for(connecting, timeout)
+                return None
+            except asyncio.TimeoutError:
+                return f"timed out after {timeout}s"
+            except Exception as e:
+                return f"{type(e).__name__}: {e}"
+
+    results = await asyncio.gather(*[_connect(agent) for agent in swarm])
+
+    connected, failed = [], []
+    for agent, error in zip(swarm, results):
+        if error is None:
+            connected.append(agent)
+        else:
+            failed.append((agent, error))
+            # Don't leave telemetry streams running for a drone we are giving up on
+            hub = getattr(agent, "telemetry", None)
+            if hub is not None and getattr(hub, "running", False):
+                await hub.stop()
+
+    print(f"\n[Swarm] {len(connected)}/{len(swarm)} drones connected.")
+    for agent, error in failed:
+        print(f"[Swarm] Drone {agent.id} ({agent.address}) FAILED: {error}")
+
+    return connected, failed
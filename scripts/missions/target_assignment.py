@@ -0,0 +1,194 @@
+"""
+Drone -> target assignment from the drones' CURRENT positions.
+
+Instead of swarm[i] -> targets[i], the matching minimizes either the total
+distance flown ("sum") or the longest single transit ("max", i.e. the time
+until the whole area is covered, ties broken by total distance). It is cheap
+enough (dozens of drones in a few milliseconds) to re-solve mid-mission
+whenever a drone drops out or the targets change:
+
+    for drone, j in assign_swarm(swarm, targets_gps, objective="max"):
+        tasks.append(drone.fly_to_gps(*targets_gps[j], altitude=25))
+"""
+import numpy as np
+
+from geodesy import distance_matrix_m
+
+OBJECTIVES = ("sum", "max")
+
+
+def solve_min_sum(cost):
+    """
+    Minimum-total-cost assignment (Hungarian / shortest augmenting path, O(n^2 m)).
+
+    Args:
+        cost: (n_rows, n_cols) array.
+
+    Returns:
+        np.ndarray of length n_rows: the column assigned to each row, or -1
+        when there are more rows than columns and the row is left out.
+    """
+    cost = np.asarray(cost, dtype=float)
+    n, m = cost.shape
+    if n == 0 or m == 0:
+        return np.full(n, -1, dtype=int)
+    if n > m:
+        # Solve the transposed problem so every column is used once
+        col_for_row = solve_min_sum(cost.T)
+        result = np.full(n, -1, dtype=int)
+        result[col_for_row] = np.arange(m)
+        return result
+
+    # Potentials u (rows), v (cols); column 0 is a virtual start column
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    row_of_col = np.zeros(m + 1, dtype=int)  # 0 = free, else row index + 1
+    way = np.zeros(m + 1, dtype=int)
+    big = np.inf
+
+    for row in range(1, n + 1):
+        row_of_col[0] = row
+        col = 0
+        min_slack = np.full(m + 1, big)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[col] = True
+            r = row_of_col[col]
+            # Relax every free column at once
+            slack = cost[r - 1] - u[r] - v[1:]
+            free = ~used[1:]
+            better = free & (slack < min_slack[1:])
+            min_slack[1:][better] = slack[better]
+            way[1:][better] = col
+
+            candidates = np.where(free, min_slack[1:], big)
+            nxt = int(np.argmin(candidates)) + 1
+            delta = candidates[nxt - 1]
+
+            u[row_of_col[used]] += delta
+            v[used] -= delta
+            min_slack[~used] -= delta
+            col = nxt
+            if row_of_col[col] == 0:
+                break
+        # Flip the augmenting path
+        while col:
+            prev = way[col]
+            row_of_col[col] = row_of_col[prev]
+            col = prev
+
+    result = np.full(n, -1, dtype=int)
+    assigned = row_of_col[1:] > 0
+    result[row_of_col[1:][assigned] - 1] = np.flatnonzero(assigned)
+    return result
+
+
+def _matching_size(allowed):
+    """Size of a maximum bipartite matching on a boolean (rows x cols) matrix (Kuhn)."""
+    n, m = allowed.shape
+    row_of_col = np.full(m, -1, dtype=int)
+    neighbours = [np.flatnonzero(allowed[r]) for r in range(n)]
+
+    def augment(r, seen):
+        for c in neighbours[r]:
+            if not seen[c]:
+                seen[c] = True
+                if row_of_col[c] < 0 or augment(row_of_col[c], seen):
+                    row_of_col[c] = r
+                    return True
+        return False
+
+    return sum(augment(r, np.zeros(m, dtype=bool)) for r in range(n))
+
+
+def solve_min_max(cost):
+    """
+    Bottleneck assignment: minimizes the largest cost used, then the total.
+
+    Binary search over the distinct costs for the smallest threshold that still
+    allows a full matching, then a min-sum solve restricted to that threshold.
+    """
+    cost = np.asarray(cost, dtype=float)
+    n, m = cost.shape
+    if n == 0 or m == 0:
+        return np.full(n, -1, dtype=int)
+
+    size = min(n, m)
+    levels = np.unique(cost)
+    lo, hi = 0, len(levels) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _matching_size(cost <= levels[mid]) == size:
+            hi = mid
+        else:
+            lo = mid + 1
+
+    # Min total distance among the assignments that respect the bottleneck
+    penalty = cost.sum() + 1.0
+    return solve_min_sum(np.where(cost > levels[lo], cost + penalty, cost))
+
+
+def assign_targets(positions, targets, objective="sum"):
+    """
+    Matches drones to targets by great-circle distance.
+
+    Args:
+        positions: [(lat, lon), ...] per drone; None for a drone with no fix yet
+            (it gets whatever target is left after the others are matched).
+        targets: [(lat, lon), ...].
+        objective (str): "sum" (least total distance) or "max" (shortest slowest transit).
+
+    Returns:
+        list: target index per drone, -1 if the drone has no target (more drones than targets).
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}, not {objective!r}")
+    if not len(positions) or not len(targets):
+        return [-1] * len(positions)
+
+    known = np.flatnonzero([p is not None for p in positions])
+    unknown = np.flatnonzero([p is None for p in positions])
+    pos = np.asarray([positions[i] for i in known], dtype=float).reshape(-1, 2)
+    tgt = np.asarray(targets, dtype=float).reshape(-1, 2)
+
+    # 1. Drones with a position get the optimal matching
+    cost = distance_matrix_m(pos[:, 0], pos[:, 1], tgt[:, 0], tgt[:, 1])
+    solver = solve_min_sum if objective == "sum" else solve_min_max
+    result = np.full(len(positions), -1, dtype=int)
+    result[known] = solver(cost)
+
+    # 2. Drones without a fix take the targets that are left, in order
+    taken = set(result[known].tolist())
+    left = [j for j in range(len(tgt)) if j not in taken]
+    for i, j in zip(unknown, left):
+        result[i] = j
+    return result.tolist()
+
+
+def swarm_positions(swarm):
+    """Current (lat, lon) of every DroneAgent from its telemetry hub, None if unknown."""
+    positions = []
+    for agent in swarm:
+        pos = agent.telemetry.position
+        positions.append(None if pos is None else (pos.latitude_deg, pos.longitude_deg))
+    return positions
+
+
+def assign_swarm(swarm, targets, objective="sum"):
+    """
+    Pairs every connected DroneAgent with a target from where it is right now.
+
+    Returns:
+        list of (agent, target index), only for the drones that got a target.
+        Call again at any time (e.g. after a drone fails) to re-plan.
+    """
+    positions = swarm_positions(swarm)
+    assignment = assign_targets(positions, targets, objective)
+
+    pairs = [(agent, j) for agent, j in zip(swarm, assignment) if j >= 0]
+    lengths = [agent.telemetry.distance_to(*targets[j]) for agent, j in pairs]
+    known = [d for d in lengths if d != float("inf")]
+    if known:
+        print(f"[Assign] {len(pairs)} drones -> targets ({objective}): "
+              f"total {sum(known):.0f} m, longest {max(known):.0f} m")
+    return pairs
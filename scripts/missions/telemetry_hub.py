@@ -0,0 +1,176 @@
+import asyncio
+import math
+import time
+
+from geodesy import distance_m
+
+
+class TelemetryHub:
+    """
+    Long-lived telemetry cache for a single drone.
+
+    Subscribes ONCE to each MAVSDK telemetry stream (health, position, velocity,
+    in_air, armed, flight_mode) and keeps the latest value of each. Any number of
+    coroutines can then read the current state for free, or await a condition
+    on it with wait_for() instead of opening their own gRPC stream.
+    """
+
+    STREAMS = ("health", "position", "velocity_ned", "in_air", "armed", "flight_mode")
+
+    def __init__(self, drone, drone_id=None):
+        """
+        Args:
+            drone (mavsdk.System): The (already connected) system to follow.
+            drone_id: Only used to label the log lines.
+        """
+        self.drone = drone
+        self.id = drone_id
+
+        # Latest value of every stream (None until the first message arrives)
+        self.health = None
+        self.position = None
+        self.velocity_ned = None
+        self.in_air = None
+        self.armed = None
+        self.flight_mode = None
+
+        # time.monotonic() of the last message per stream
+        self.last_update = {}
+        # Exception of every stream that stopped (its value will not change anymore)
+        self.errors = {}
+
+        self._changed = asyncio.Condition()
+        self._tasks = []
+
+        # Optional shared-memory row this hub mirrors every message into
+        self.store = None
+        self.store_row = None
+
+    # --- LIFECYCLE ---
+    def start(self):
+        """Starts one background task per stream. Safe to call more than once."""
+        if self._tasks:
+            return
+        self.errors = {}
+        for name in self.STREAMS:
+            self._tasks.append(asyncio.ensure_future(self._follow(name)))
+
+    async def stop(self):
+        """Cancels the stream tasks (e.g. before the drone object is dropped)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def running(self):
+        return bool(self._tasks)
+
+    def attach_store(self, store):
+        """Mirrors every message into this drone's row of a state_store.SwarmStateStore."""
+        self.store = store
+        self.store_row = store.row(self.id)
+        for name in self.STREAMS:
+            value = getattr(self, name)
+            if value is not None:
+                store.write_telemetry(self.store_row, name, value)
+
+    async def _follow(self, name):
+        stream = getattr(self.drone.telemetry, name)
+        try:
+            async for value in stream():
+                setattr(self, name, value)
+                self.last_update[name] = time.monotonic()
+                if self.store is not None:
+                    self.store.write_telemetry(self.store_row, name, value)
+                async with self._changed:
+                    self._changed.notify_all()
+            error = RuntimeError("stream ended")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e
+        print(f"[Drone {self.id}] Telemetry stream '{name}' stopped: {error}")
+        # Wake every waiter: it fails now instead of waiting for a value that never comes
+        self.errors[name] = error
+        async with self._changed:
+            self._changed.notify_all()
+
+    # --- WAITING ---
+    async def wait_for(self, predicate, timeout=None):
+        """
+        Waits until predicate(hub) is True. The predicate is re-checked on
+        every telemetry update, so it should be cheap.
+
+        Args:
+            predicate (callable): Takes this hub, returns a bool.
+            timeout (float): Seconds before asyncio.TimeoutError (None = forever).
+
+        Raises:
+            RuntimeError: A telemetry stream stopped before the predicate came true.
+        """
+        async def _wait():
+            async with self._changed:
+                await self._changed.wait_for(lambda: predicate(self) or self.errors)
+
+        if predicate(self):
+            return
+        if not self.errors:
+            await asyncio.wait_for(_wait(), timeout)
+        if self.errors and not predicate(self):
+            name, error = next(iter(self.errors.items()))
+            raise RuntimeError(f"Drone {self.id}: telemetry stream '{name}' stopped: {error}") from error
+
+    async def wait_for_gps(self, timeout=None):
+        await self.wait_for(
+            lambda t: t.health is not None
+            and t.health.is_global_position_ok
+            and t.health.is_home_position_ok,
+            timeout,
+        )
+
+    async def wait_until_armable(self, timeout=None):
+        await self.wait_for(lambda t: t.health is not None and t.health.is_armable, timeout)
+
+    async def wait_for_armed(self, armed=True, timeout=None):
+        await self.wait_for(lambda t: t.armed is armed, timeout)
+
+    async def wait_until_altitude(self, altitude, timeout=None):
+        """Waits until the relative altitude is >= altitude (meters)."""
+        await self.wait_for(
+            lambda t: t.position is not None and t.position.relative_altitude_m >= altitude,
+            timeout,
+        )
+
+    async def wait_for_in_air(self, in_air, timeout=None):
+        await self.wait_for(lambda t: t.in_air is in_air, timeout)
+
+    async def wait_until_near(self, lat, lon, radius_m=3.0, timeout=None):
+        """Waits until the drone is within radius_m (horizontal) of lat/lon."""
+        await self.wait_for(lambda t: t.distance_to(lat, lon) <= radius_m, timeout)
+
+    # --- READING ---
+    def distance_to(self, lat, lon):
+        """Horizontal distance (m) from the last known position, inf if unknown."""
+        if self.position is None:
+            return math.inf
+        return distance_m(self.position.latitude_deg, self.position.longitude_deg, lat, lon)
+
+    def snapshot(self):
+        """Returns the current cached state as a plain dict (no MAVSDK calls)."""
+        pos = self.position
+        health = self.health
+        now = time.monotonic()
+        return {
+            "id": self.id,
+            "lat": pos.latitude_deg if pos else None,
+            "lon": pos.longitude_deg if pos else None,
+            "abs_alt": pos.absolute_altitude_m if pos else None,
+            "rel_alt": pos.relative_altitude_m if pos else None,
+            "in_air": self.in_air,
+            "armed": self.armed,
+            "flight_mode": str(self.flight_mode) if self.flight_mode is not None else None,
+            "gps_ok": bool(health and health.is_global_position_ok and health.is_home_position_ok),
+            "armable": bool(health and health.is_armable),
+            "age_s": now - self.last_update["position"] if "position" in self.last_update else None,
+        }
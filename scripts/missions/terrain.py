@@ -0,0 +1,202 @@
+"""
+Ground elevation from ArduPilot terrain tiles (terrain/N26E050.DAT, ...).
+
+A .DAT tile covers one degree of lat/lon as 2048-byte grid blocks (28 x 32
+heights in meters AMSL, 24 x 28 spacing steps apart so neighbouring blocks
+overlap). The tiles are memory-mapped, only the block headers are indexed,
+and decoded blocks live in a small LRU, so a whole sweep's worth of points
+costs a handful of block reads:
+
+    terrain = TerrainDatabase()
+    ground = terrain.elevation(lats, lons)          # NaN where no data
+    rel_alt = terrain.relative_altitudes(lats, lons, agl=25, home=(lat, lon))
+
+The indexing and bilinear interpolation follow AP_Terrain, so the heights
+match what the autopilot itself uses.
+"""
+import math
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TERRAIN_DIR = os.path.join(os.path.dirname(os.path.dirname(current_dir)), "terrain")
+
+GRID_BLOCK_SIZE_X = 28       # heights per block, north
+GRID_BLOCK_SIZE_Y = 32       # heights per block, east
+GRID_BLOCK_SPACING_X = 24    # grid steps between block origins, north
+GRID_BLOCK_SPACING_Y = 28    # grid steps between block origins, east
+BLOCK_BYTES = 2048
+FULL_BITMAP = (1 << 56) - 1  # all 7 x 8 sub-grids present
+
+# AP_Math: meters per 1e-7 degree of latitude
+LOCATION_SCALING_FACTOR = 0.011131884502145034
+
+GRID_BLOCK_DTYPE = np.dtype([
+    ("bitmap", "<u8"),
+    ("lat", "<i4"),           # SW corner, 1e-7 deg
+    ("lon", "<i4"),
+    ("crc", "<u2"),
+    ("version", "<u2"),
+    ("spacing", "<u2"),       # meters between heights
+    ("height", "<i2", (GRID_BLOCK_SIZE_X, GRID_BLOCK_SIZE_Y)),
+    ("grid_idx_x", "<u2"),
+    ("grid_idx_y", "<u2"),
+    ("lon_degrees", "<i2"),
+    ("lat_degrees", "i1"),
+    ("pad", f"V{BLOCK_BYTES - 1821}"),
+])
+
+
+def tile_name(lat_degrees, lon_degrees):
+    """File name of the tile whose SW corner is (lat_degrees, lon_degrees), e.g. N26E050.DAT."""
+    return (f"{'N' if lat_degrees >= 0 else 'S'}{abs(lat_degrees):02d}"
+            f"{'E' if lon_degrees >= 0 else 'W'}{abs(lon_degrees):03d}.DAT")
+
+
+class TerrainTile:
+    """One memory-mapped .DAT file with a (grid_idx_x, grid_idx_y) -> block lookup table."""
+
+    def __init__(self, path):
+        self.path = path
+        self.blocks = np.memmap(path, dtype=GRID_BLOCK_DTYPE, mode="r")
+        header = self.blocks[["bitmap", "spacing", "grid_idx_x", "grid_idx_y"]]
+        valid = np.flatnonzero(header["bitmap"] == FULL_BITMAP)
+        self.spacing = int(header["spacing"][valid[0]]) if len(valid) else 100
+
+        gx = header["grid_idx_x"][valid].astype(np.int64)
+        gy = header["grid_idx_y"][valid].astype(np.int64)
+        shape = (int(gx.max()) + 1 if len(gx) else 0, int(gy.max()) + 1 if len(gy) else 0)
+        self.lookup = np.full(shape, -1, dtype=np.int64)
+        self.lookup[gx, gy] = valid
+
+    def block_numbers(self, grid_x, grid_y):
+        """File block for every (grid_idx_x, grid_idx_y), -1 where the tile has no data."""
+        inside = (grid_x >= 0) & (grid_y >= 0) & (grid_x < self.lookup.shape[0]) & (grid_y < self.lookup.shape[1])
+        result = np.full(len(grid_x), -1, dtype=np.int64)
+        result[inside] = self.lookup[grid_x[inside], grid_y[inside]]
+        return result
+
+
+class TerrainDatabase:
+    """Batch ground-elevation queries over every tile in a terrain folder."""
+
+    def __init__(self, terrain_dir=DEFAULT_TERRAIN_DIR, max_blocks=256):
+        """
+        Args:
+            terrain_dir (str): Folder with the .DAT tiles.
+            max_blocks (int): Decoded blocks kept in the LRU (7 KB each as float64).
+        """
+        self.terrain_dir = terrain_dir
+        self.max_blocks = max_blocks
+        self._tiles = {}
+        self._blocks = OrderedDict()  # (tile, block number) -> (28, 32) float heights
+        self.hits = 0
+        self.misses = 0
+
+    def tiles_version(self):
+        """
+        [(name, size, mtime_ns), ...] of the .DAT tiles on disk: part of the key of
+        anything cached from this database, so adding or replacing a tile invalidates it.
+        """
+        try:
+            entries = list(os.scandir(self.terrain_dir))
+        except FileNotFoundError:
+            return []
+        return sorted((e.name, e.stat().st_size, e.stat().st_mtime_ns)
+                      for e in entries if e.name.upper().endswith(".DAT") and e.is_file())
+
+    def _tile(self, lat_degrees, lon_degrees):
+        key = (lat_degrees, lon_degrees)
+        if key not in self._tiles:
+            path = os.path.join(self.terrain_dir, tile_name(lat_degrees, lon_degrees))
+            self._tiles[key] = TerrainTile(path) if os.path.exists(path) else None
+        return self._tiles[key]
+
+    def _block(self, key, tile, number):
+        """Decoded heights of one block, through the LRU."""
+        heights = self._blocks.get((key, number))
+        if heights is not None:
+            self._blocks.move_to_end((key, number))
+            self.hits += 1
+            return heights
+        self.misses += 1
+        heights = tile.blocks["height"][number].astype(float)
+        self._blocks[(key, number)] = heights
+        if len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        return heights
+
+    def elevation(self, lats, lons):
+        """
+        Ground height (m AMSL) for arrays of lat/lon, bilinear between grid points.
+
+        Returns:
+            np.ndarray (same shape as lats), NaN where no tile/block covers the point.
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        shape = np.broadcast(lats, lons).shape
+        lats = np.broadcast_to(lats, shape).ravel()
+        lons = np.broadcast_to(lons, shape).ravel()
+        result = np.full(lats.shape, np.nan)
+
+        # Work tile by tile (almost always a single tile per mission area)
+        lat_deg = np.floor(lats).astype(np.int64)
+        lon_deg = np.floor(lons).astype(np.int64)
+        tile_ids = (lat_deg + 90) * 360 + (lon_deg + 180)
+        for tile_id in np.unique(tile_ids):
+            sel = np.flatnonzero(tile_ids == tile_id)
+            key = (int(lat_deg[sel[0]]), int(lon_deg[sel[0]]))
+            tile = self._tile(*key)
+            if tile is None:
+                continue
+            result[sel] = self._tile_elevation(tile, key, lats[sel], lons[sel])
+        return result.reshape(shape)
+
+    def _tile_elevation(self, tile, key, lats, lons):
+        # Offset from the tile corner in meters (AP Location::get_distance_NE)
+        ref_lat, ref_lon = key
+        north = (lats - ref_lat) * 1e7 * LOCATION_SCALING_FACTOR
+        lon_scale = np.maximum(np.cos(np.radians((lats + ref_lat) / 2)), 0.01)
+        east = (lons - ref_lon) * 1e7 * LOCATION_SCALING_FACTOR * lon_scale
+
+        idx_x = np.floor(north / tile.spacing).astype(np.int64)
+        idx_y = np.floor(east / tile.spacing).astype(np.int64)
+        frac_x = north / tile.spacing - idx_x
+        frac_y = east / tile.spacing - idx_y
+
+        grid_x, in_x = np.divmod(idx_x, GRID_BLOCK_SPACING_X)
+        grid_y, in_y = np.divmod(idx_y, GRID_BLOCK_SPACING_Y)
+        numbers = tile.block_numbers(grid_x, grid_y)
+
+        out = np.full(len(lats), np.nan)
+        have = numbers >= 0
+        if not have.any():
+            return out
+
+        # Decode every needed block once, then gather the 4 corners of every point
+        needed, which = np.unique(numbers[have], return_inverse=True)
+        stack = np.stack([self._block(key, tile, int(n)) for n in needed])
+        which = which.ravel()
+        x, y = in_x[have], in_y[have]
+        fx, fy = frac_x[have], frac_y[have]
+        h00 = stack[which, x, y]
+        h10 = stack[which, x + 1, y]
+        h01 = stack[which, x, y + 1]
+        h11 = stack[which, x + 1, y + 1]
+        out[have] = (1 - fy) * ((1 - fx) * h00 + fx * h10) + fy * ((1 - fx) * h01 + fx * h11)
+        return out
+
+    def relative_altitudes(self, lats, lons, agl, home):
+        """
+        Relative-to-home altitudes that keep `agl` meters above the ground at every point
+        (what a mission item's relative_altitude_m needs for terrain following).
+        Points without terrain data fall back to agl.
+        """
+        ground = self.elevation(lats, lons)
+        home_ground = float(self.elevation(home[0], home[1]))
+        if math.isnan(home_ground):
+            return np.full(np.shape(ground), float(agl))
+        return np.where(np.isnan(ground), agl, agl + ground - home_ground)
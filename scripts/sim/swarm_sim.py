@@ -0,0 +1,603 @@
+"""
+Headless multi-copter simulator speaking MAVLink over UDP.
+
+A light stand-in for one ArduCopter SITL per drone (commands/start_swarm.sh),
+for testing swarm-scale scheduling and GCS throughput: a single process
+models many copters with simple kinematics. Vehicle k sends to
+host:base_port + k, like `sim_vehicle.py --out=udp:127.0.0.1:14540+k`, so the
+roster and DroneAgent connect to it unchanged:
+
+    python scripts/sim/swarm_sim.py --count 100 --write-roster /tmp/sim_roster.json
+    SWARM_ROSTER=/tmp/sim_roster.json python GCS/app.py
+
+Every vehicle reports itself as an ArduCopter (GUIDED / AUTO / LAND ... modes)
+and handles arm/disarm, takeoff, goto (DO_REPOSITION or
+SET_POSITION_TARGET_GLOBAL_INT), hold, land, RTL, mode changes, mission
+upload / download / AUTO, message intervals and parameters (in memory).
+There is no attitude, wind, battery drain or failsafe. Unlike tlog_replay.py,
+the vehicles obey commands.
+
+Needs pymavlink (installed together with MAVProxy / the SITL tools).
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+
+from pymavlink.dialects.v20 import ardupilotmega as mavlink
+
+# Reuse the geodesy constants from scripts/missions
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(os.path.dirname(current_dir), "missions"))
+
+from geodesy import R_EARTH_M
+
+# ArduCopter custom_mode numbers
+MODES = {"STABILIZE": 0, "ALT_HOLD": 2, "AUTO": 3, "GUIDED": 4, "LOITER": 5, "RTL": 6, "LAND": 9,
+         "POSHOLD": 16, "BRAKE": 17}
+MODE_NAMES = {number: name for name, number in MODES.items()}
+
+# Default stream rates (Hz); a GCS changes them with MAV_CMD_SET_MESSAGE_INTERVAL
+DEFAULT_RATES = {
+    mavlink.MAVLINK_MSG_ID_HEARTBEAT: 1.0,
+    mavlink.MAVLINK_MSG_ID_SYS_STATUS: 1.0,
+    mavlink.MAVLINK_MSG_ID_GPS_RAW_INT: 2.0,
+    mavlink.MAVLINK_MSG_ID_GLOBAL_POSITION_INT: 5.0,
+    mavlink.MAVLINK_MSG_ID_EXTENDED_SYS_STATE: 2.0,
+    mavlink.MAVLINK_MSG_ID_HOME_POSITION: 0.5,
+    mavlink.MAVLINK_MSG_ID_MISSION_CURRENT: 1.0,
+}
+
+# Every sensor present, enabled and healthy, pre-arm checks passed
+SENSORS_OK = (mavlink.MAV_SYS_STATUS_SENSOR_3D_GYRO | mavlink.MAV_SYS_STATUS_SENSOR_3D_ACCEL
+              | mavlink.MAV_SYS_STATUS_SENSOR_3D_MAG | mavlink.MAV_SYS_STATUS_SENSOR_ABSOLUTE_PRESSURE
+              | mavlink.MAV_SYS_STATUS_SENSOR_GPS | mavlink.MAV_SYS_STATUS_SENSOR_ANGULAR_RATE_CONTROL
+              | mavlink.MAV_SYS_STATUS_SENSOR_ATTITUDE_STABILIZATION | mavlink.MAV_SYS_STATUS_SENSOR_YAW_POSITION
+              | mavlink.MAV_SYS_STATUS_SENSOR_XY_POSITION_CONTROL | mavlink.MAV_SYS_STATUS_SENSOR_MOTOR_OUTPUTS
+              | mavlink.MAV_SYS_STATUS_AHRS | mavlink.MAV_SYS_STATUS_PREARM_CHECK)
+GPS_ONLY_MISSING = SENSORS_OK & ~mavlink.MAV_SYS_STATUS_SENSOR_GPS & ~mavlink.MAV_SYS_STATUS_PREARM_CHECK
+
+CAPABILITIES = (mavlink.MAV_PROTOCOL_CAPABILITY_MISSION_FLOAT | mavlink.MAV_PROTOCOL_CAPABILITY_PARAM_FLOAT
+                | mavlink.MAV_PROTOCOL_CAPABILITY_MISSION_INT | mavlink.MAV_PROTOCOL_CAPABILITY_COMMAND_INT
+                | mavlink.MAV_PROTOCOL_CAPABILITY_SET_POSITION_TARGET_GLOBAL_INT
+                | mavlink.MAV_PROTOCOL_CAPABILITY_MAVLINK2)
+FIRMWARE_VERSION = (4 << 24) | (5 << 16) | (0 << 8) | 255  # 4.5.0 official
+
+# Global frames -> is the altitude relative to home? (terrain frames are treated as relative)
+FRAMES = {
+    mavlink.MAV_FRAME_GLOBAL: False,
+    mavlink.MAV_FRAME_GLOBAL_INT: False,
+    mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT: True,
+    mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT_INT: True,
+    mavlink.MAV_FRAME_GLOBAL_TERRAIN_ALT: True,
+    mavlink.MAV_FRAME_GLOBAL_TERRAIN_ALT_INT: True,
+}
+
+WP_RADIUS_M = 2.0
+RTL_ALT_M = 15.0
+
+
+class SimCopter:
+    """State, kinematics and MAVLink handling of one simulated copter."""
+
+    def __init__(self, sysid, home, address, speed=10.0, climb_rate=2.5, sink_rate=1.5, gps_delay=0.0):
+        """
+        Args:
+            sysid (int): MAVLink system id.
+            home (tuple): (lat, lon, alt AMSL) where the copter sits at start.
+            address (tuple): (host, port) the telemetry is sent to (the GCS / mavsdk_server).
+            speed, climb_rate, sink_rate (float): m/s horizontal / up / down.
+            gps_delay (float): Seconds after start before the 3D fix.
+        """
+        self.sysid = sysid
+        self.home = home
+        self.address = address
+        self.speed = speed
+        self.climb_rate = climb_rate
+        self.sink_rate = sink_rate
+        self.gps_delay = gps_delay
+        self.mav = mavlink.MAVLink(None, srcSystem=sysid, srcComponent=mavlink.MAV_COMP_ID_AUTOPILOT1)
+        self.mav.robust_parsing = True
+        self.transport = None
+        self.booted = time.monotonic()
+
+        self.lat, self.lon, self.rel_alt = home[0], home[1], 0.0
+        self.velocity = (0.0, 0.0, 0.0)
+        self.armed = False
+        self.mode = "STABILIZE"
+        self.landed_state = mavlink.MAV_LANDED_STATE_ON_GROUND
+        self.goal = None  # (lat, lon, rel_alt) the copter flies to; None = stay
+        self.rtl_stage = None  # "climb" / "return" while in RTL
+
+        self.mission = []  # MISSION_ITEM_INT messages, seq 0 = home (ArduPilot)
+        self.mission_current = 0
+        self.mission_state = mavlink.MISSION_STATE_NO_MISSION
+        self._upload = None  # (expected count, items received) during an upload
+        self.params = {"WPNAV_SPEED": speed * 100, "PILOT_SPEED_UP": climb_rate * 100,
+                       "LAND_SPEED": sink_rate * 100, "RTL_ALT": RTL_ALT_M * 100, "SYSID_THISMAV": sysid}
+
+        self.periods = {msg_id: 1.0 / rate for msg_id, rate in DEFAULT_RATES.items()}
+        self.next_due = {msg_id: 0.0 for msg_id in self.periods}
+        self.sent = 0
+        self.received = 0
+
+    # --- SENDING ---
+    def send(self, message):
+        if self.transport is None:
+            return
+        self.transport.sendto(message.pack(self.mav), self.address)
+        self.sent += 1
+
+    def gps_ok(self):
+        return time.monotonic() - self.booted >= self.gps_delay
+
+    def send_stream(self, msg_id):
+        """One message of a telemetry stream (the ones DEFAULT_RATES lists)."""
+        m = self.mav
+        now = time.monotonic()
+        if msg_id == mavlink.MAVLINK_MSG_ID_HEARTBEAT:
+            base_mode = mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED | mavlink.MAV_MODE_FLAG_STABILIZE_ENABLED
+            if self.mode in ("GUIDED", "AUTO", "RTL"):
+                base_mode |= mavlink.MAV_MODE_FLAG_GUIDED_ENABLED
+            if self.armed:
+                base_mode |= mavlink.MAV_MODE_FLAG_SAFETY_ARMED
+            self.send(m.heartbeat_encode(
+                mavlink.MAV_TYPE_QUADROTOR, mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA, base_mode, MODES[self.mode],
+                mavlink.MAV_STATE_ACTIVE if self.armed else mavlink.MAV_STATE_STANDBY))
+        elif msg_id == mavlink.MAVLINK_MSG_ID_SYS_STATUS:
+            health = SENSORS_OK if self.gps_ok() else GPS_ONLY_MISSING
+            self.send(m.sys_status_encode(SENSORS_OK, SENSORS_OK, health, 100, 12600, -1, 100, 0, 0, 0, 0, 0, 0))
+        elif msg_id == mavlink.MAVLINK_MSG_ID_GPS_RAW_INT:
+            fix = mavlink.GPS_FIX_TYPE_3D_FIX if self.gps_ok() else mavlink.GPS_FIX_TYPE_NO_FIX
+            vn, ve, _ = self.velocity
+            self.send(m.gps_raw_int_encode(
+                int((now - self.booted) * 1e6), fix, int(self.lat * 1e7), int(self.lon * 1e7),
+                int((self.home[2] + self.rel_alt) * 1000), 70, 100, int(math.hypot(vn, ve) * 100),
+                int(math.degrees(math.atan2(ve, vn)) % 360 * 100), 12 if fix else 0))
+        elif msg_id == mavlink.MAVLINK_MSG_ID_GLOBAL_POSITION_INT:
+            if not self.gps_ok():
+                return
+            vn, ve, vd = self.velocity
+            heading = int(math.degrees(math.atan2(ve, vn)) % 360 * 100) if math.hypot(vn, ve) > 0.1 else 0
+            self.send(m.global_position_int_encode(
+                int((now - self.booted) * 1000) & 0xFFFFFFFF, int(self.lat * 1e7), int(self.lon * 1e7),
+                int((self.home[2] + self.rel_alt) * 1000), int(self.rel_alt * 1000),
+                int(vn * 100), int(ve * 100), int(vd * 100), heading))
+        elif msg_id == mavlink.MAVLINK_MSG_ID_EXTENDED_SYS_STATE:
+            self.send(m.extended_sys_state_encode(mavlink.MAV_VTOL_STATE_UNDEFINED, self.landed_state))
+        elif msg_id == mavlink.MAVLINK_MSG_ID_HOME_POSITION:
+            if not self.gps_ok():
+                return
+            self.send(m.home_position_encode(int(self.home[0] * 1e7), int(self.home[1] * 1e7),
+                                             int(self.home[2] * 1000), 0, 0, 0, [1, 0, 0, 0], 0, 0, 0))
+        elif msg_id == mavlink.MAVLINK_MSG_ID_MISSION_CURRENT:
+            self.send(m.mission_current_encode(self.mission_current, len(self.mission), self.mission_state))
+        elif msg_id == mavlink.MAVLINK_MSG_ID_AUTOPILOT_VERSION:
+            self.send(m.autopilot_version_encode(CAPABILITIES, FIRMWARE_VERSION, 0, 0, 0, [0] * 8, [0] * 8,
+                                                 [0] * 8, 0, 0, self.sysid))
+        else:
+            return False
+        return True
+
+    def send_due(self, now):
+        """Sends every stream whose interval has elapsed."""
+        for msg_id, period in self.periods.items():
+            if period is not None and now >= self.next_due[msg_id]:
+                self.send_stream(msg_id)
+                # Keep the phase, but never try to catch up on missed sends
+                self.next_due[msg_id] = max(self.next_due[msg_id] + period, now)
+
+    # --- KINEMATICS ---
+    def step(self, dt):
+        lat, lon, rel_alt = self.lat, self.lon, self.rel_alt
+        self._move(dt)
+        if dt > 0:
+            self.velocity = (math.radians(self.lat - lat) * R_EARTH_M / dt,
+                             math.radians(self.lon - lon) * R_EARTH_M * math.cos(math.radians(lat)) / dt,
+                             (rel_alt - self.rel_alt) / dt)
+
+    def _move(self, dt):
+        if not self.armed or self.goal is None:
+            return
+        g_lat, g_lon, g_alt = self.goal
+        # Vertical
+        if g_alt > self.rel_alt:
+            self.rel_alt = min(g_alt, self.rel_alt + self.climb_rate * dt)
+        else:
+            self.rel_alt = max(g_alt, self.rel_alt - self.sink_rate * dt)
+        # Horizontal (not before the copter is off the ground)
+        north, east = self._offset_to(g_lat, g_lon)
+        dist = math.hypot(north, east)
+        if dist > 1e-3 and self.landed_state != mavlink.MAV_LANDED_STATE_ON_GROUND:
+            step = min(dist, self.speed * dt)
+            self.lat += math.degrees(step * north / dist / R_EARTH_M)
+            self.lon += math.degrees(step * east / dist / (R_EARTH_M * math.cos(math.radians(self.lat))))
+            dist -= step
+
+        # Landed state
+        if self.landed_state == mavlink.MAV_LANDED_STATE_TAKEOFF and self.rel_alt >= 0.95 * g_alt:
+            self.landed_state = mavlink.MAV_LANDED_STATE_IN_AIR
+        elif self.landed_state == mavlink.MAV_LANDED_STATE_ON_GROUND and g_alt > 0 and self.rel_alt > 0:
+            self.landed_state = mavlink.MAV_LANDED_STATE_TAKEOFF
+        if self.rel_alt <= 0.0 and g_alt <= 0.0 and self.landed_state != mavlink.MAV_LANDED_STATE_ON_GROUND:
+            self._touch_down()
+            return
+
+        if dist <= WP_RADIUS_M and abs(g_alt - self.rel_alt) < 1.0:
+            self._reached()
+
+    def _offset_to(self, lat, lon):
+        north = math.radians(lat - self.lat) * R_EARTH_M
+        east = math.radians(lon - self.lon) * R_EARTH_M * math.cos(math.radians(self.lat))
+        return north, east
+
+    def _touch_down(self):
+        # ArduCopter disarms by itself once landed in LAND / RTL / AUTO
+        print(f"[Sim {self.sysid}] Landed")
+        self.rel_alt = 0.0
+        self.landed_state = mavlink.MAV_LANDED_STATE_ON_GROUND
+        self.goal = None
+        self.rtl_stage = None
+        self.armed = False
+
+    def _reached(self):
+        if self.mode == "RTL" and self.rtl_stage == "climb":
+            self.rtl_stage = "return"
+            self.goal = (self.home[0], self.home[1], self.rel_alt)
+        elif self.mode == "RTL" and self.rtl_stage == "return":
+            self._land_here()
+        elif self.mode == "AUTO" and 0 < self.mission_current < len(self.mission):
+            item = self.mission[self.mission_current]
+            if item.command in (mavlink.MAV_CMD_NAV_WAYPOINT, mavlink.MAV_CMD_NAV_TAKEOFF):
+                self.send(self.mav.mission_item_reached_encode(self.mission_current))
+                self._run_mission(self.mission_current + 1)
+
+    def _hold_here(self):
+        self.goal = (self.lat, self.lon, self.rel_alt) if self.landed_state != mavlink.MAV_LANDED_STATE_ON_GROUND else None
+
+    def _land_here(self):
+        self.goal = (self.lat, self.lon, 0.0)
+        if self.landed_state != mavlink.MAV_LANDED_STATE_ON_GROUND:
+            self.landed_state = mavlink.MAV_LANDED_STATE_LANDING
+
+    # --- MODES ---
+    def set_mode(self, name):
+        if name not in MODES:
+            return False
+        self.mode = name
+        self.rtl_stage = None
+        if name == "LAND":
+            self._land_here()
+        elif name == "RTL":
+            self.rtl_stage = "climb"
+            self.goal = (self.lat, self.lon, max(self.rel_alt, self.params["RTL_ALT"] / 100))
+        elif name == "AUTO":
+            self._run_mission(max(1, self.mission_current))
+        else:  # GUIDED and the pilot modes hold where they are until told otherwise
+            self._hold_here()
+        return True
+
+    def _run_mission(self, seq):
+        """Executes mission items from seq on until the next NAV item to fly to."""
+        while seq < len(self.mission):
+            item = self.mission[seq]
+            self.mission_current = seq
+            self.mission_state = mavlink.MISSION_STATE_ACTIVE
+            self.send(self.mav.mission_current_encode(seq, len(self.mission), self.mission_state))
+            if item.command == mavlink.MAV_CMD_NAV_WAYPOINT:
+                self.goal = self._item_position(item)
+                return
+            if item.command == mavlink.MAV_CMD_NAV_TAKEOFF:
+                self.goal = (self.lat, self.lon, item.z)
+                return
+            if item.command == mavlink.MAV_CMD_NAV_LAND:
+                self._land_here()
+                return
+            if item.command == mavlink.MAV_CMD_NAV_RETURN_TO_LAUNCH:
+                self.set_mode("RTL")
+                return
+            if item.command == mavlink.MAV_CMD_DO_CHANGE_SPEED and item.param2 > 0:
+                self.speed = item.param2
+            seq += 1  # other DO_ / unsupported items are skipped
+        # Mission complete: report the last item reached and hold at the last waypoint
+        if self.mission:
+            self.mission_current = len(self.mission) - 1
+            self.mission_state = mavlink.MISSION_STATE_COMPLETE
+            self.send(self.mav.mission_item_reached_encode(self.mission_current))
+            self.send(self.mav.mission_current_encode(self.mission_current, len(self.mission), self.mission_state))
+        self._hold_here()
+
+    def _item_position(self, item):
+        relative = FRAMES.get(item.frame, True)
+        lat, lon = item.x / 1e7, item.y / 1e7
+        if lat == 0 and lon == 0:
+            lat, lon = self.lat, self.lon
+        return lat, lon, item.z if relative else item.z - self.home[2]
+
+    # --- RECEIVING ---
+    def handle(self, msg):
+        self.received += 1
+        target = getattr(msg, "target_system", 0)
+        if target not in (0, self.sysid):
+            return
+        kind = msg.get_type()
+        src = (msg.get_srcSystem(), msg.get_srcComponent())
+        if kind == "COMMAND_LONG":
+            self._command(msg.command, [msg.param1, msg.param2, msg.param3, msg.param4,
+                                        msg.param5, msg.param6, msg.param7], src)
+        elif kind == "COMMAND_INT":
+            self._command(msg.command, [msg.param1, msg.param2, msg.param3, msg.param4,
+                                        msg.x / 1e7, msg.y / 1e7, msg.z], src, frame=msg.frame)
+        elif kind == "SET_MODE":
+            self.set_mode(MODE_NAMES.get(msg.custom_mode))
+        elif kind == "SET_POSITION_TARGET_GLOBAL_INT":
+            if self.mode == "GUIDED" and self.landed_state != mavlink.MAV_LANDED_STATE_ON_GROUND:
+                relative = FRAMES.get(msg.coordinate_frame, True)
+                self.goal = (msg.lat_int / 1e7, msg.lon_int / 1e7, msg.alt if relative else msg.alt - self.home[2])
+        elif kind in ("PARAM_REQUEST_READ", "PARAM_REQUEST_LIST", "PARAM_SET"):
+            self._param(kind, msg)
+        elif kind.startswith("MISSION_"):
+            self._mission_protocol(kind, msg, src)
+
+    def _command(self, command, p, src, frame=mavlink.MAV_FRAME_GLOBAL_INT):
+        result = self._run_command(command, p, frame)
+        self.send(self.mav.command_ack_encode(command, result, 0, 0, src[0], src[1]))
+
+    def _run_command(self, command, p, frame):
+        accepted, denied = mavlink.MAV_RESULT_ACCEPTED, mavlink.MAV_RESULT_DENIED
+        on_ground = self.landed_state == mavlink.MAV_LANDED_STATE_ON_GROUND
+        if command == mavlink.MAV_CMD_COMPONENT_ARM_DISARM:
+            if p[0] >= 0.5:
+                if not self.gps_ok():
+                    return denied
+                self.armed = True
+                self.home = (self.lat, self.lon, self.home[2])
+                print(f"[Sim {self.sysid}] Armed")
+                return accepted
+            if not on_ground and p[1] != 21196:  # 21196 = force disarm
+                return mavlink.MAV_RESULT_FAILED
+            self.armed = False
+            self.goal = None
+            print(f"[Sim {self.sysid}] Disarmed")
+            return accepted
+        if command == mavlink.MAV_CMD_DO_SET_MODE:
+            return accepted if self.set_mode(MODE_NAMES.get(int(p[1]))) else denied
+        if command == mavlink.MAV_CMD_NAV_TAKEOFF:
+            if not self.armed or self.mode != "GUIDED" or not on_ground:
+                return denied
+            self.goal = (self.lat, self.lon, max(p[6], 1.0))
+            self.landed_state = mavlink.MAV_LANDED_STATE_TAKEOFF
+            return accepted
+        if command == mavlink.MAV_CMD_DO_REPOSITION:
+            if not self.armed or on_ground:
+                return denied
+            if self.mode != "GUIDED":
+                self.set_mode("GUIDED")
+            relative = FRAMES.get(frame, True) if frame is not None else True
+            alt = p[6] if relative else p[6] - self.home[2]
+            self.goal = (p[4], p[5], alt if not math.isnan(alt) else self.rel_alt)
+            if p[0] > 0:
+                self.speed = p[0]
+            return accepted
+        if command == mavlink.MAV_CMD_NAV_LAND:
+            self.set_mode("LAND")
+            return accepted
+        if command == mavlink.MAV_CMD_NAV_RETURN_TO_LAUNCH:
+            self.set_mode("RTL")
+            return accepted
+        if command == mavlink.MAV_CMD_MISSION_START:
+            if not self.armed or len(self.mission) < 2:
+                return denied
+            self.mission_current = max(1, int(p[0]))
+            self.set_mode("AUTO")
+            return accepted
+        if command == mavlink.MAV_CMD_DO_CHANGE_SPEED:
+            if p[1] > 0:
+                self.speed = p[1]
+            return accepted
+        if command == mavlink.MAV_CMD_SET_MESSAGE_INTERVAL:
+            msg_id, interval_us = int(p[0]), p[1]
+            if interval_us < 0:
+                self.periods[msg_id] = None
+            elif interval_us == 0:
+                rate = DEFAULT_RATES.get(msg_id)
+                self.periods[msg_id] = 1.0 / rate if rate else None
+            else:
+                self.periods[msg_id] = interval_us / 1e6
+            self.next_due.setdefault(msg_id, 0.0)
+            return accepted
+        if command == mavlink.MAV_CMD_REQUEST_MESSAGE:
+            return accepted if self.send_stream(int(p[0])) else mavlink.MAV_RESULT_UNSUPPORTED
+        if command == mavlink.MAV_CMD_REQUEST_AUTOPILOT_CAPABILITIES:
+            self.send_stream(mavlink.MAVLINK_MSG_ID_AUTOPILOT_VERSION)
+            return accepted
+        return mavlink.MAV_RESULT_UNSUPPORTED
+
+    def _param(self, kind, msg):
+        names = list(self.params)
+        if kind == "PARAM_SET":
+            self.params[msg.param_id] = msg.param_value
+            names = list(self.params)
+            wanted = [msg.param_id]
+        elif kind == "PARAM_REQUEST_LIST":
+            wanted = names
+        elif msg.param_index >= 0:
+            wanted = names[msg.param_index:msg.param_index + 1]
+        else:
+            wanted = [msg.param_id] if msg.param_id in self.params else []
+        for name in wanted:
+            self.send(self.mav.param_value_encode(name.encode(), float(self.params[name]),
+                                                  mavlink.MAV_PARAM_TYPE_REAL32, len(names), names.index(name)))
+
+    def _mission_protocol(self, kind, msg, src):
+        m = self.mav
+        mission_type = getattr(msg, "mission_type", 0)
+        if kind == "MISSION_COUNT":
+            if mission_type != mavlink.MAV_MISSION_TYPE_MISSION or msg.count == 0:
+                # Fence / rally points (or an empty mission) are simply accepted
+                if mission_type == mavlink.MAV_MISSION_TYPE_MISSION:
+                    self.mission = []
+                self.send(m.mission_ack_encode(src[0], src[1], mavlink.MAV_MISSION_ACCEPTED, mission_type))
+                return
+            self._upload = (msg.count, [])
+            self.send(m.mission_request_int_encode(src[0], src[1], 0, mission_type))
+        elif kind in ("MISSION_ITEM_INT", "MISSION_ITEM") and self._upload is not None:
+            count, items = self._upload
+            if msg.seq != len(items):
+                self.send(m.mission_request_int_encode(src[0], src[1], len(items), mission_type))
+                return
+            if kind == "MISSION_ITEM":  # float lat/lon: keep everything as MISSION_ITEM_INT
+                msg.x, msg.y = int(msg.x * 1e7), int(msg.y * 1e7)
+            items.append(msg)
+            if len(items) < count:
+                self.send(m.mission_request_int_encode(src[0], src[1], len(items), mission_type))
+                return
+            self.mission = items
+            self.mission_current = 0
+            self.mission_state = mavlink.MISSION_STATE_NOT_STARTED
+            self._upload = None
+            print(f"[Sim {self.sysid}] Mission of {count - 1} items uploaded")
+            self.send(m.mission_ack_encode(src[0], src[1], mavlink.MAV_MISSION_ACCEPTED, mission_type))
+        elif kind == "MISSION_REQUEST_LIST":
+            count = len(self.mission) if mission_type == mavlink.MAV_MISSION_TYPE_MISSION else 0
+            self.send(m.mission_count_encode(src[0], src[1], count, mission_type))
+        elif kind in ("MISSION_REQUEST_INT", "MISSION_REQUEST"):
+            if mission_type == mavlink.MAV_MISSION_TYPE_MISSION and msg.seq < len(self.mission):
+                item = self.mission[msg.seq]
+                self.send(m.mission_item_int_encode(
+                    src[0], src[1], item.seq, item.frame, item.command, int(item.seq == self.mission_current),
+                    item.autocontinue, item.param1, item.param2, item.param3, item.param4,
+                    item.x, item.y, item.z, mission_type))
+        elif kind == "MISSION_CLEAR_ALL":
+            if mission_type in (mavlink.MAV_MISSION_TYPE_MISSION, mavlink.MAV_MISSION_TYPE_ALL):
+                self.mission = []
+                self.mission_current = 0
+                self.mission_state = mavlink.MISSION_STATE_NO_MISSION
+            self.send(m.mission_ack_encode(src[0], src[1], mavlink.MAV_MISSION_ACCEPTED, mission_type))
+        elif kind == "MISSION_SET_CURRENT":
+            if msg.seq < len(self.mission):
+                self.mission_current = msg.seq
+                if self.mode == "AUTO":
+                    self._run_mission(max(1, msg.seq))
+                self.send(m.mission_current_encode(self.mission_current, len(self.mission), self.mission_state))
+
+
+class _VehicleProtocol(asyncio.DatagramProtocol):
+    def __init__(self, vehicle):
+        self.vehicle = vehicle
+
+    def connection_made(self, transport):
+        self.vehicle.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            messages = self.vehicle.mav.parse_buffer(data) or []
+        except mavlink.MAVError:
+            return
+        for msg in messages:
+            if msg.get_type() != "BAD_DATA":
+                self.vehicle.handle(msg)
+
+    def error_received(self, exc):
+        pass  # nobody listening on the GCS port yet (ICMP port unreachable)
+
+
+def grid_homes(count, home, spacing_m):
+    """Start positions on a square grid around home, spacing_m apart (no two copters on one spot)."""
+    lat, lon, alt = home
+    cols = max(1, math.ceil(math.sqrt(count)))
+    homes = []
+    for k in range(count):
+        north = (k // cols - (cols - 1) / 2) * spacing_m
+        east = (k % cols - (cols - 1) / 2) * spacing_m
+        homes.append((lat + math.degrees(north / R_EARTH_M),
+                      lon + math.degrees(east / (R_EARTH_M * math.cos(math.radians(lat)))), alt))
+    return homes
+
+
+class SwarmSimulator:
+    """Runs `count` SimCopters on one asyncio loop, each on its own UDP socket."""
+
+    def __init__(self, count, base_port=14540, host="127.0.0.1", home=(26.308079, 50.146278, 0.0),
+                 spacing_m=5.0, rate_hz=20.0, first_sysid=1, **vehicle_kwargs):
+        """
+        Args:
+            count (int): Number of copters; copter k sends to host:base_port+k, sysid first_sysid+k.
+            home (tuple): (lat, lon, alt AMSL) center of the start grid (default: KFUPM).
+            spacing_m (float): Distance between neighbouring start positions.
+            rate_hz (float): Kinematics / scheduling rate.
+            **vehicle_kwargs: speed, climb_rate, sink_rate, gps_delay for every SimCopter.
+        """
+        self.period = 1.0 / rate_hz
+        self.vehicles = [
+            SimCopter(first_sysid + k, start, (host, base_port + k), **vehicle_kwargs)
+            for k, start in enumerate(grid_homes(count, home, spacing_m))
+        ]
+        self.tick_s = 0.0
+
+    async def run(self, duration=None, report_every_s=10.0):
+        loop = asyncio.get_running_loop()
+        transports = []
+        for vehicle in self.vehicles:
+            # Ephemeral local port: mavsdk_server answers to wherever the packets come from
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda vehicle=vehicle: _VehicleProtocol(vehicle), local_addr=("0.0.0.0", 0))
+            transports.append(transport)
+
+        started = last = last_report = time.monotonic()
+        try:
+            while duration is None or last - started < duration:
+                await asyncio.sleep(self.period)
+                now = time.monotonic()
+                for vehicle in self.vehicles:
+                    vehicle.step(now - last)
+                    vehicle.send_due(now)
+                last = now
+                self.tick_s = time.monotonic() - now
+                if report_every_s and now - last_report >= report_every_s:
+                    last_report = now
+                    self.report()
+        finally:
+            for transport in transports:
+                transport.close()
+
+    def report(self):
+        flying = sum(v.landed_state != mavlink.MAV_LANDED_STATE_ON_GROUND for v in self.vehicles)
+        armed = sum(v.armed for v in self.vehicles)
+        print(f"[Sim] {len(self.vehicles)} copters: {armed} armed, {flying} in the air, "
+              f"{sum(v.sent for v in self.vehicles)} sent / {sum(v.received for v in self.vehicles)} received, "
+              f"tick {self.tick_s * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate N copters speaking MAVLink over UDP.")
+    parser.add_argument("--count", type=int, default=4, help="Number of copters")
+    parser.add_argument("--base-port", type=int, default=14540, help="UDP port copter 1 sends to")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--home", default="26.308079,50.146278,0", help="lat,lon,alt of the start grid (KFUPM)")
+    parser.add_argument("--spacing", type=float, default=5.0, help="Meters between start positions")
+    parser.add_argument("--speed", type=float, default=10.0, help="Horizontal speed (m/s)")
+    parser.add_argument("--rate", type=float, default=20.0, help="Simulation rate (Hz)")
+    parser.add_argument("--gps-delay", type=float, default=0.0, help="Seconds before the GPS fix")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds")
+    parser.add_argument("--write-roster", help="Write a swarm roster JSON for these copters")
+    parser.add_argument("--base-mavsdk-port", type=int, default=50051, help="mavsdk_server port of drone 1 (roster)")
+    args = parser.parse_args()
+
+    home = tuple(float(v) for v in args.home.split(","))
+    sim = SwarmSimulator(args.count, base_port=args.base_port, host=args.host, home=home,
+                         spacing_m=args.spacing, rate_hz=args.rate, speed=args.speed, gps_delay=args.gps_delay)
+    if args.write_roster:
+        with open(args.write_roster, "w") as f:
+            json.dump({"count": args.count, "base_udp_port": args.base_port,
+                       "base_mavsdk_port": args.base_mavsdk_port, "host": args.host}, f, indent=2)
+        print(f"[Sim] Roster written to {args.write_roster} (use SWARM_ROSTER={args.write_roster})")
+    print(f"[Sim] {args.count} copters -> {args.host}:{args.base_port}..{args.base_port + args.count - 1}")
+    try:
+        asyncio.run(sim.run(duration=args.duration))
+    except KeyboardInterrupt:
+        pass
+    sim.report()
@@ -0,0 +1,165 @@
+"""
+Replays a recorded mav.tlog over UDP as one or many virtual vehicles.
+
+A light stand-in for SITL when working on DroneAgent / the GCS telemetry path:
+each virtual vehicle k gets the recorded vehicle packets on port base_port + k
+(the same 14540+ ports DroneAgent listens on), at real time or N x speed.
+With --remap-sysid, vehicle k is given sysid k+1 (CRC fixed up), so one
+recording fans out into a whole swarm:
+
+    python scripts/sim/tlog_replay.py mav.tlog --count 50 --speed 4 --remap-sysid --loop
+
+Note: it only PLAYS BACK telemetry. Commands (arm, takeoff, goto) are ignored.
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+from functools import lru_cache
+
+# Reuse the tlog indexer from scripts/analysis
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(os.path.dirname(current_dir), "analysis"))
+
+from tlog_index import TlogIndex, MAVLINK_V2_STX
+
+GCS_SYSID = 255
+
+
+def x25_crc(data, crc=0xFFFF):
+    """MAVLink CRC-16/MCRF4XX."""
+    for byte in data:
+        tmp = byte ^ (crc & 0xFF)
+        tmp = (tmp ^ (tmp << 4)) & 0xFF
+        crc = ((crc >> 8) ^ (tmp << 8) ^ (tmp << 3) ^ (tmp >> 4)) & 0xFFFF
+    return crc
+
+
+@lru_cache(maxsize=None)
+def _crc_delta(xor, bytes_after):
+    """
+    CRC change caused by XOR-ing one byte that is followed by `bytes_after` bytes.
+
+    The CRC is affine, so crc(a) ^ crc(b) == crc0(a ^ b) for equal lengths. That
+    means changing the sysid never needs the message's CRC_EXTRA or a full
+    recompute, just old_crc ^ this delta.
+    """
+    return x25_crc(bytes([xor]) + bytes(bytes_after), crc=0)
+
+
+def remap_sysid(packet, sysid):
+    """Returns a copy of a MAVLink packet with a new sysid and a fixed-up CRC."""
+    pkt = bytearray(packet)
+    is_v2 = pkt[0] == MAVLINK_V2_STX
+    sys_pos = 5 if is_v2 else 3
+    old = pkt[sys_pos]
+    if old == sysid:
+        return bytes(pkt)
+
+    payload_len = pkt[1]
+    crc_pos = (10 if is_v2 else 6) + payload_len
+    # CRC covers bytes 1 .. crc_pos-1 plus the CRC_EXTRA byte
+    bytes_after = crc_pos - sys_pos - 1 + 1
+    pkt[sys_pos] = sysid
+    crc = int.from_bytes(pkt[crc_pos:crc_pos + 2], "little") ^ _crc_delta(old ^ sysid, bytes_after)
+    pkt[crc_pos:crc_pos + 2] = crc.to_bytes(2, "little")
+    return bytes(pkt[:crc_pos + 2])  # a signature would no longer match, so drop it
+
+
+class TlogReplayer:
+    """Streams the recorded vehicle packets to `count` UDP ports."""
+
+    def __init__(self, tlog_path, count=1, base_port=14540, host="127.0.0.1",
+                 speed=1.0, remap=False, loop=False, sysid=None):
+        """
+        Args:
+            tlog_path (str): Recorded .tlog.
+            count (int): Number of virtual vehicles (ports base_port .. base_port+count-1).
+            speed (float): Playback speed (1 = real time, 0 = as fast as possible).
+            remap (bool): Give vehicle k sysid k+1 instead of the recorded one.
+            loop (bool): Start over at the end of the recording.
+            sysid (int): Recorded vehicle to replay (default: the busiest non-GCS system).
+        """
+        self.tlog = TlogIndex(tlog_path)
+        self.targets = [(host, base_port + k) for k in range(count)]
+        self.speed = speed
+        self.remap = remap
+        self.loop = loop
+
+        if sysid is None:
+            counts = {s: c for s, c in self.tlog.counts("sysid").items() if s != GCS_SYSID}
+            sysid = max(counts, key=counts.get)
+        self.rows = self.tlog.select(sysid=sysid)
+        self.sent = 0
+        self._stop = threading.Event()
+
+        # Packets are small; keep them (and the remapped copies) in memory for the hot loop
+        packets = [self.tlog.packet(row) for row in self.rows]
+        if remap:
+            self.packets = [[remap_sysid(p, k + 1) for p in packets] for k in range(count)]
+        else:
+            self.packets = [packets] * count
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, duration=None):
+        """Blocks while replaying. duration (s of wall time) limits the run."""
+        times = self.rows["time_us"].astype("int64")
+        if not len(times):
+            print("[Replay] Nothing to replay.")
+            return
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        wall_start = time.monotonic()
+        deadline = None if duration is None else wall_start + duration
+
+        try:
+            while not self._stop.is_set():
+                pass_start = time.monotonic()
+                t_first = times[0]
+                for i, t in enumerate(times):
+                    if self._stop.is_set() or (deadline is not None and time.monotonic() >= deadline):
+                        return
+                    if self.speed > 0:
+                        wait = pass_start + (t - t_first) / 1e6 / self.speed - time.monotonic()
+                        if wait > 0:
+                            time.sleep(wait)
+                    for k, target in enumerate(self.targets):
+                        try:
+                            sock.sendto(self.packets[k][i], target)
+                        except (BlockingIOError, ConnectionRefusedError):
+                            pass  # nobody listening / buffer full: drop, like a radio would
+                    self.sent += len(self.targets)
+                if not self.loop:
+                    return
+        finally:
+            sock.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a .tlog over UDP as N virtual vehicles.")
+    parser.add_argument("tlog", help="Recorded .tlog file (e.g. mav.tlog)")
+    parser.add_argument("--count", type=int, default=1, help="Number of virtual vehicles")
+    parser.add_argument("--base-port", type=int, default=14540, help="UDP port of vehicle 1")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed, 0 = max")
+    parser.add_argument("--remap-sysid", action="store_true", help="Vehicle k gets sysid k+1")
+    parser.add_argument("--loop", action="store_true", help="Repeat the recording")
+    parser.add_argument("--sysid", type=int, help="Recorded system to replay")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds")
+    args = parser.parse_args()
+
+    replayer = TlogReplayer(args.tlog, count=args.count, base_port=args.base_port, host=args.host,
+                            speed=args.speed, remap=args.remap_sysid, loop=args.loop, sysid=args.sysid)
+    print(f"[Replay] {len(replayer.rows)} packets -> {args.count} vehicles on ports "
+          f"{args.base_port}..{args.base_port + args.count - 1} at {args.speed}x")
+    started = time.monotonic()
+    try:
+        replayer.run(duration=args.duration)
+    except KeyboardInterrupt:
+        pass
+    elapsed = time.monotonic() - started
+    print(f"[Replay] Sent {replayer.sent} packets in {elapsed:.1f}s ({replayer.sent / max(elapsed, 1e-9):.0f} pkt/s)")
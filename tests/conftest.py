@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The mission modules import each other by name (like the scripts do)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "scripts", "missions"))
+sys.path.insert(0, os.path.join(ROOT, "GCS"))
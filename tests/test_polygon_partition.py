@@ -0,0 +1,39 @@
+import math
+
+import numpy as np
+
+from polygon_partition import partition_polygon, point_in_polygon, polygon_area
+
+
+def u_shape():
+    # 300 x 300 m U with a 100 m wide, 200 m deep notch from the top
+    return np.array([(0, 0), (300, 0), (300, 300), (200, 300), (200, 100),
+                     (100, 100), (100, 300), (0, 300)], dtype=float)
+
+
+def star(rng, spikes=7):
+    angles = np.sort(rng.uniform(0, 2 * math.pi, spikes * 2))
+    radii = np.where(np.arange(len(angles)) % 2 == 0, rng.uniform(150, 400, len(angles)),
+                     rng.uniform(20, 120, len(angles)))
+    return np.column_stack([radii * np.cos(angles), radii * np.sin(angles)])
+
+
+def check_centers(poly, n):
+    sectors = partition_polygon(poly, n)
+    assert len(sectors) == n
+    total = abs(polygon_area(poly))
+    for s in sectors:
+        assert math.isclose(s["area"], total / n, rel_tol=1e-6)
+        assert point_in_polygon(s["outline"], s["center"]), s["center"]
+        assert point_in_polygon(poly, s["center"]), s["center"]
+
+
+def test_u_shape_centers_stay_inside():
+    for n in range(1, 9):
+        check_centers(u_shape(), n)
+
+
+def test_star_polygon_centers_stay_inside():
+    rng = np.random.default_rng(7)
+    for _ in range(100):
+        check_centers(star(rng), int(rng.integers(2, 25)))
@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+from separation_monitor import SeparationMonitor
+
+HOME = (26.308079, 50.146278)
+
+
+def drone(drone_id, east_m, rel_alt, in_air):
+    position = SimpleNamespace(latitude_deg=HOME[0], longitude_deg=HOME[1] + east_m / 99_700.0,
+                               absolute_altitude_m=rel_alt, relative_altitude_m=rel_alt)
+    return SimpleNamespace(id=drone_id, telemetry=SimpleNamespace(position=position, in_air=in_air))
+
+
+def test_parked_drones_are_not_conflicts():
+    # A row of drones 2 m apart on the ground, in_air reported or not known yet
+    swarm = [drone(k, 2.0 * k, 0.0, in_air=False if k % 2 else None) for k in range(6)]
+    monitor = SeparationMonitor(swarm, min_separation_m=5.0)
+    monitor.tick()
+    assert monitor.conflicts == {}
+
+
+def test_airborne_drones_are_checked():
+    swarm = [drone(1, 0.0, 10.0, in_air=True), drone(2, 2.0, 10.5, in_air=None), drone(3, 3.0, 0.0, in_air=False)]
+    monitor = SeparationMonitor(swarm, min_separation_m=5.0)
+    monitor.tick()
+    assert list(monitor.conflicts) == [(1, 2)]
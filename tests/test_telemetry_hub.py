@@ -0,0 +1,42 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from telemetry_hub import TelemetryHub
+
+
+def fake_drone(fail_after=1):
+    """A drone whose position stream sends fail_after messages and then breaks; the rest stay silent."""
+    async def silent():
+        await asyncio.Event().wait()
+        yield
+
+    async def position():
+        for _ in range(fail_after):
+            yield SimpleNamespace(latitude_deg=0.0, longitude_deg=0.0,
+                                  absolute_altitude_m=0.0, relative_altitude_m=0.0)
+            await asyncio.sleep(0.01)
+        raise ConnectionError("link lost")
+
+    streams = {name: silent for name in TelemetryHub.STREAMS}
+    streams["position"] = position
+    return SimpleNamespace(telemetry=SimpleNamespace(**streams))
+
+
+def test_stream_failure_wakes_waiters():
+    async def run():
+        hub = TelemetryHub(fake_drone(), drone_id=1)
+        hub.start()
+        try:
+            with pytest.raises(RuntimeError, match="position"):
+                await hub.wait_until_altitude(10.0, timeout=5.0)
+            # Waiters that start after the failure fail at once too
+            with pytest.raises(RuntimeError, match="link lost"):
+                await hub.wait_for_in_air(True, timeout=5.0)
+            # A condition that already holds still returns
+            await hub.wait_until_altitude(0.0, timeout=5.0)
+        finally:
+            await hub.stop()
+
+    asyncio.run(run())
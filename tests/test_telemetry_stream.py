@@ -0,0 +1,34 @@
+import threading
+from types import SimpleNamespace
+
+from telemetry_stream import TelemetryBroadcaster
+
+
+def _in_thread(func):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()))
+    thread.start()
+    thread.join(5)
+    return result[0] if result else None
+
+
+def test_keepalive_does_not_hold_the_lock():
+    broadcaster = TelemetryBroadcaster(SimpleNamespace(swarm=[], store=None), keepalive_s=0.1)
+    first = broadcaster.stream()
+    second = broadcaster.stream()
+    try:
+        assert next(first).startswith("event: snapshot")
+        assert next(first) == ": keep-alive\n\n"
+
+        # Client 1 is suspended after its keep-alive: the sampler and other clients go on
+        def acquire():
+            if not broadcaster._cond.acquire(timeout=1):
+                return False
+            broadcaster._cond.release()
+            return True
+        assert _in_thread(acquire)
+        assert _in_thread(lambda: next(second)).startswith("event: snapshot")
+    finally:
+        first.close()
+        second.close()
+    assert broadcaster.client_count == 0